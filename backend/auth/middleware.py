@@ -1,9 +1,11 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
 from .jwt_handler import verify_token
+from .principal_cache import principal_cache
 from supabase import Client
 from database.connection import get_supabase_client
+from database.repository import execute
+from observability.tracing import span
 
 security = HTTPBearer()
 
@@ -20,7 +22,8 @@ async def get_current_user(
     
     try:
         token = credentials.credentials
-        payload = verify_token(token)
+        with span("auth.decode"):
+            payload = verify_token(token)
         
         if payload is None:
             raise credentials_exception
@@ -32,14 +35,21 @@ async def get_current_user(
     except Exception:
         raise credentials_exception
     
-    # Get user from database
+    # Get user from cache or database
     try:
-        result = supabase.table("users").select("*").eq("username", username).execute()
-        
-        if not result.data:
-            raise credentials_exception
+        with span("auth.user_lookup") as lookup:
+            user = principal_cache.get(username)
+            if lookup is not None:
+                lookup.attributes["cache_hit"] = user is not None
             
-        user = result.data[0]
+            if user is None:
+                result = await execute(supabase.table("users").select("*").eq("username", username))
+                
+                if not result.data:
+                    raise credentials_exception
+                    
+                user = result.data[0]
+                principal_cache.set(username, user)
         
         if not user.get("is_active", False):
             raise HTTPException(
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Cache configuration
+PRINCIPAL_CACHE_TTL = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_SIZE", "1024"))
+
+
+class PrincipalCache:
+    """TTL + LRU cache of authenticated users keyed by token subject."""
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_size: int = PRINCIPAL_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return dict(entry[1])
+
+    def set(self, subject: str, user: dict) -> None:
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, dict(user))
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, subject: str) -> None:
+        with self._lock:
+            if self._entries.pop(subject, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_user(username: str) -> None:
+    """Drop a cached user, e.g. after deactivating it or changing its role."""
+    principal_cache.invalidate(username)
+
+
+def clear_principal_cache() -> None:
+    """Drop every cached user."""
+    principal_cache.clear()
+
+
+def get_principal_cache_stats() -> dict:
+    """Return hit/miss counters and size of the principal cache."""
+    return principal_cache.stats()
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la API completa contra un Supabase en memoria
+
+Levanta la app (uvicorn, un worker) en un subproceso servido por
+database.memory.MemoryClient con datos sembrados de forma determinista, y
+la carga con mezclas realistas de tráfico a concurrencia controlada (bucle
+cerrado: cada cliente envía la siguiente request al recibir la respuesta).
+
+Mezclas:
+    publico  catálogo de la landing (la mitad con If-None-Match) y formularios
+    admin    listado (por offset y recorriendo cursores), estadísticas,
+             pendientes, profesionales (con cursor) y login
+    mixto    ambas a la vez
+
+Con --latency-ms/--jitter-ms/--row-cost-ms cada llamada a PostgREST o Storage
+espera esa latencia simulada (misma semilla, mismos retardos), para medir
+cachés, lotes y límites de concurrencia como con la red de por medio.
+
+Por corrida reporta req/s, p50/p95/p99 y el RSS del servidor, y guarda todo
+en JSON (commit incluido) para comparar entre commits con --compare.
+
+Uso:
+    python benchmarks/bench_api.py --mix publico admin --concurrency 1 10 50 --duration 10
+    python benchmarks/bench_api.py --latency-ms 20 --jitter-ms 10 --mix admin
+    python benchmarks/bench_api.py --compare benchmarks/results/api-<commit>-<fecha>.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+TIPOS_SERVICIO = ["curacion", "control-presion", "acompanamiento", "inyecciones", "otros"]
+ESTADOS = ["pendiente", "confirmada", "en_progreso", "completada", "cancelada"]
+
+MIXES = {
+    "publico": [(70, "catalogo"), (30, "formulario")],
+    "admin": [
+        (30, "admin_lista"), (10, "admin_cursor"), (25, "admin_estadisticas"),
+        (10, "admin_pendientes"), (10, "admin_profesionales"), (15, "login"),
+    ],
+    "mixto": [
+        (45, "catalogo"), (15, "formulario"), (10, "admin_lista"), (5, "admin_cursor"),
+        (10, "admin_estadisticas"), (5, "admin_pendientes"), (10, "login"),
+    ],
+}
+
+
+# -- servidor ----------------------------------------------------------------
+
+def seed_tables(solicitudes: int, profesionales: int, seed: int) -> Dict[str, List[dict]]:
+    """Datos deterministas: solicitudes repartidas en los últimos 12 meses."""
+    rng = random.Random(seed)
+    # Anclado al día: la misma semilla siembra las mismas filas en corridas del mismo día
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    filas_solicitudes = []
+    for i in range(solicitudes):
+        fecha = now - timedelta(days=rng.uniform(0, 365))
+        filas_solicitudes.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "nombre": f"Paciente {i}",
+            "telefono": f"+56 9 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+            "email": f"paciente{i}@ejemplo.cl",
+            "direccion": f"Calle {rng.randint(1, 999)}, Santiago",
+            "tipo_servicio": rng.choice(TIPOS_SERVICIO),
+            "fecha_sugerida": (fecha + timedelta(days=3)).date().isoformat(),
+            "hora_sugerida": f"{rng.randint(8, 19):02d}:00:00",
+            "comentarios": "Solicitud de prueba" if rng.random() < 0.5 else None,
+            "estado": rng.choice(ESTADOS),
+            "fecha": fecha.isoformat(),
+            "updated_at": fecha.isoformat(),
+        })
+    filas_profesionales = [
+        {
+            "nombre": f"Profesional {i}",
+            "especialidad": "Enfermería general",
+            "experiencia": rng.randint(1, 30),
+            "descripcion": "Profesional de enfermería con experiencia en atención domiciliaria.",
+            "telefono": f"+56 9 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+            "email": f"profesional{i}@ejemplo.cl",
+            "activo": rng.random() < 0.8,
+            "orden": i,
+            "foto_url": None,
+        }
+        for i in range(profesionales)
+    ]
+    usuarios = [{
+        "username": "admin",
+        "email": "admin@ejemplo.cl",
+        "password_hash": "",
+        "full_name": "Administrador",
+        "role": "admin",
+        "is_active": True,
+    }]
+    return {"solicitudes": filas_solicitudes, "profesionales": filas_profesionales, "users": usuarios}
+
+
+def serve(args) -> None:
+    """Modo subproceso: app real + MemoryClient sembrado."""
+    import uvicorn
+
+    from database.connection import use_supabase_client
+    from database.memory import LatencyModel, MemoryClient
+    from database.rollups import REBUILD_RPC
+    from main import app
+
+    client = MemoryClient(seed_tables(args.seed_solicitudes, args.seed_profesionales, args.seed))
+    client.rpc(REBUILD_RPC, {}).execute()
+    # La siembra no paga latencia; las requests sí
+    client.latency = LatencyModel(args.latency_ms, args.jitter_ms, args.row_cost_ms, seed=args.seed)
+    use_supabase_client(client)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+def start_server(args, port: int, workdir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "bench-secret"),
+        # Todo el tráfico viene de 127.0.0.1: el rate limit lo cortaría
+        "RATE_LIMIT_ENABLED": "false",
+        "JOB_QUEUE_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "PYTHONPATH": BACKEND_DIR,
+    }
+    command = [
+        sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+        "--seed-solicitudes", str(args.seed_solicitudes),
+        "--seed-profesionales", str(args.seed_profesionales), "--seed", str(args.seed),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--row-cost-ms", str(args.row_cost_ms),
+    ]
+    return subprocess.Popen(command, env=env, cwd=workdir)
+
+
+def read_rss_mb(pid: int) -> Dict[str, Optional[float]]:
+    """RSS actual y máximo del proceso (Linux, /proc); None en otros sistemas."""
+    values = {"rss_mb": None, "peak_rss_mb": None}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    values["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                elif line.startswith("VmHWM:"):
+                    values["peak_rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return values
+
+
+# -- operaciones ---------------------------------------------------------------
+
+# Unique email/phone per submitted form, so dedupe doesn't turn inserts into hits
+_FORM_IDS = itertools.count(10_000_000)
+
+
+class Context:
+    def __init__(self, token: str, seed: int):
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.etag: Optional[str] = None
+        # Keyset cursors of the listing each worker is walking (None: first page)
+        self.cursor: Optional[str] = None
+        self.cursor_profesionales: Optional[str] = None
+        self.rng = random.Random(seed)
+
+
+async def op_catalogo(client, ctx: Context):
+    headers = {"If-None-Match": ctx.etag} if ctx.etag and ctx.rng.random() < 0.5 else {}
+    response = await client.get("/api/profesionales/public/activos", headers=headers)
+    ctx.etag = response.headers.get("etag", ctx.etag)
+    return response
+
+
+async def op_formulario(client, ctx: Context):
+    n = str(next(_FORM_IDS))
+    return await client.post("/api/solicitud", headers={"Idempotency-Key": str(uuid.uuid4())}, json={
+        "nombre": "Paciente Benchmark",
+        "telefono": f"+56 9 {n}",
+        "email": f"bench{n}@ejemplo.cl",
+        "direccion": "Calle 123, Santiago",
+        "tipo_servicio": ctx.rng.choice(TIPOS_SERVICIO),
+        "comentarios": "Carga de prueba",
+    })
+
+
+async def op_admin_lista(client, ctx: Context):
+    return await client.get(
+        "/api/admin/solicitudes", params={"limit": 50, "offset": ctx.rng.randrange(0, 500, 50)}, headers=ctx.headers
+    )
+
+
+async def op_admin_cursor(client, ctx: Context):
+    # Sigue X-Next-Cursor página a página y vuelve a empezar al llegar al final
+    params = {"limit": 50, **({"cursor": ctx.cursor} if ctx.cursor else {})}
+    response = await client.get("/api/admin/solicitudes", params=params, headers=ctx.headers)
+    ctx.cursor = response.headers.get("x-next-cursor") if response.status_code == 200 else None
+    return response
+
+
+async def op_admin_profesionales(client, ctx: Context):
+    params = {"limit": 10, **({"cursor": ctx.cursor_profesionales} if ctx.cursor_profesionales else {})}
+    response = await client.get("/api/admin/profesionales", params=params, headers=ctx.headers)
+    ctx.cursor_profesionales = response.json().get("next_cursor") if response.status_code == 200 else None
+    return response
+
+
+async def op_admin_estadisticas(client, ctx: Context):
+    return await client.get("/api/admin/estadisticas", headers=ctx.headers)
+
+
+async def op_admin_pendientes(client, ctx: Context):
+    return await client.get("/api/admin/solicitudes-pendientes", params={"limit": 50}, headers=ctx.headers)
+
+
+async def op_login(client, ctx: Context):
+    return await client.post("/api/auth/login", json={"username": "admin", "password": "admin"})
+
+
+OPERATIONS = {
+    "catalogo": op_catalogo,
+    "formulario": op_formulario,
+    "admin_lista": op_admin_lista,
+    "admin_cursor": op_admin_cursor,
+    "admin_profesionales": op_admin_profesionales,
+    "admin_estadisticas": op_admin_estadisticas,
+    "admin_pendientes": op_admin_pendientes,
+    "login": op_login,
+}
+
+
+# -- carga ---------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return round(sorted_values[index] * 1000, 2)
+
+
+async def run_mix(base_url: str, mix: str, concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    import httpx
+
+    weights, names = zip(*[(weight, name) for weight, name in MIXES[mix]])
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        login = await client.post("/api/auth/login", json={"username": "admin", "password": "admin"})
+        login.raise_for_status()
+        token = login.json()["access_token"]
+
+        samples: Dict[str, List[float]] = {name: [] for name in names}
+        errors: Dict[str, int] = {name: 0 for name in names}
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+
+        async def worker(worker_id: int):
+            ctx = Context(token, seed + worker_id)
+            while True:
+                now = time.perf_counter()
+                if now >= stop_at:
+                    return
+                name = ctx.rng.choices(names, weights)[0]
+                try:
+                    response = await OPERATIONS[name](client, ctx)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                if now >= measure_from:
+                    samples[name].append(time.perf_counter() - now)
+                    errors[name] += failed
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    latencies = sorted(value for values in samples.values() for value in values)
+    total = len(latencies)
+    return {
+        "mix": mix,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "requests": total,
+        "errors": sum(errors.values()),
+        "rps": round(total / duration, 1),
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(latencies[-1] * 1000, 2) if latencies else None,
+        },
+        "operations": {
+            name: {
+                "requests": len(values),
+                "errors": errors[name],
+                "p50_ms": percentile(sorted(values), 50),
+                "p99_ms": percentile(sorted(values), 99),
+            }
+            for name, values in samples.items()
+        },
+    }
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"El servidor terminó con código {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a /health")
+
+
+def git_revision() -> dict:
+    def git(*command):
+        return subprocess.run(
+            ["git", *command], cwd=BACKEND_DIR, capture_output=True, text=True, check=False
+        ).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain"))}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# -- reportes ------------------------------------------------------------------
+
+def print_header() -> None:
+    print(f"{'mezcla':<8} | {'conc':>4} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | "
+          f"{'p99 ms':>8} | {'errores':>7} | {'RSS MB':>7}")
+    print("-" * 83)
+
+
+def print_run(run: dict) -> None:
+    latency = run["latency_ms"]
+    rss = run["rss_mb"] if run["rss_mb"] is not None else "-"
+    print(
+        f"{run['mix']:<8} | {run['concurrency']:>4} | {run['rps']:>8.1f} | {latency['p50'] or 0:>8.2f} | "
+        f"{latency['p95'] or 0:>8.2f} | {latency['p99'] or 0:>8.2f} | {run['errors']:>7} | {rss:>7}"
+    )
+
+
+def compare(previous_path: str, runs: List[dict]) -> None:
+    with open(previous_path) as f:
+        previous = json.load(f)
+    base = {(run["mix"], run["concurrency"]): run for run in previous["runs"]}
+    print(f"\nComparación con {previous.get('commit')} ({previous_path})")
+    print(f"{'mezcla':<8} | {'conc':>4} | {'req/s':>9} | {'p99':>9} | {'RSS':>9}")
+    print("-" * 52)
+
+    def change(old, new):
+        if not old or new is None:
+            return "-"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    for run in runs:
+        old = base.get((run["mix"], run["concurrency"]))
+        if old is None:
+            continue
+        print(
+            f"{run['mix']:<8} | {run['concurrency']:>4} | {change(old['rps'], run['rps']):>9} | "
+            f"{change(old['latency_ms']['p99'], run['latency_ms']['p99']):>9} | "
+            f"{change(old.get('rss_mb'), run.get('rss_mb')):>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", nargs="+", choices=sorted(MIXES), default=["publico", "admin", "mixto"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos medidos por corrida")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Segundos descartados al inicio de cada corrida")
+    parser.add_argument("--seed-solicitudes", type=int, default=5000)
+    parser.add_argument("--seed-profesionales", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia simulada por round-trip a Supabase")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variación uniforme sumada a la latencia")
+    parser.add_argument("--row-cost-ms", type=float, default=0.0, help="Latencia adicional por fila devuelta")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto benchmarks/results/)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="bench_api_") as workdir:
+        server = start_server(args, port, workdir)
+        try:
+            wait_until_ready(base_url, server)
+            runs = []
+            print_header()
+            for mix in args.mix:
+                for concurrency in args.concurrency:
+                    run = asyncio.run(run_mix(base_url, mix, concurrency, args.duration, args.warmup, args.seed))
+                    run.update(read_rss_mb(server.pid))
+                    runs.append(run)
+                    print_run(run)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    revision = git_revision()
+    report = {
+        **revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed_solicitudes": args.seed_solicitudes,
+            "seed_profesionales": args.seed_profesionales,
+            "seed": args.seed,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "row_cost_ms": args.row_cost_ms,
+        },
+        "runs": runs,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"api-{revision['commit'] or 'sin-git'}-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados guardados en {output}")
+
+    if args.compare:
+        compare(args.compare, runs)
+
+
+if __name__ == "__main__":
+    main()
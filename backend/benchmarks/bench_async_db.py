@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latencia p99 vs concurrencia al ejecutar queries de Supabase
+
+Compara ejecutar ``.execute()`` directamente dentro del handler (bloquea el
+event loop) contra ``database.repository.execute`` (offload acotado a hilos).
+Cada "request" hace una query simulada con la latencia indicada.
+
+Uso:
+    python benchmarks/bench_async_db.py --latency-ms 40 --concurrency 1 5 10 20 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.repository import execute  # noqa: E402
+
+
+class SlowQuery:
+    """Query simulada que bloquea como un round-trip real a PostgREST."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return self
+
+
+async def handler_blocking(latency: float):
+    SlowQuery(latency).execute()
+
+
+async def handler_offloaded(latency: float):
+    await execute(SlowQuery(latency))
+
+
+async def run_load(handler, concurrency: int, requests: int, latency: float):
+    """Lanza las requests en oleadas de ``concurrency`` simultáneas.
+
+    La latencia se mide desde que la oleada llega, así que incluye el tiempo
+    que cada request espera a que el event loop quede libre.
+    """
+    latencies = []
+
+    async def one(arrival: float):
+        await handler(latency)
+        latencies.append(time.perf_counter() - arrival)
+
+    start = time.perf_counter()
+    for wave_start in range(0, requests, concurrency):
+        size = min(concurrency, requests - wave_start)
+        arrival = time.perf_counter()
+        await asyncio.gather(*(one(arrival) for _ in range(size)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+        "rps": requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    print(f"{'conc':>5} | {'modo':<10} | {'p50 ms':>8} | {'p99 ms':>8} | {'req/s':>8}")
+    print("-" * 52)
+    for concurrency in args.concurrency:
+        for name, handler in (("blocking", handler_blocking), ("offloaded", handler_offloaded)):
+            result = asyncio.run(run_load(handler, concurrency, args.requests, latency))
+            print(
+                f"{concurrency:>5} | {name:<10} | {result['p50_ms']:>8.1f} | "
+                f"{result['p99_ms']:>8.1f} | {result['rps']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: INSERT por solicitud vs INSERT por lotes (write-behind) bajo concurrencia
+
+Cada "request" inserta una solicitud en database.memory.MemoryClient, cuyo INSERT tarda
+``--latency-ms`` por round-trip más ``--row-cost-ms`` por fila. Sin lotes, cada
+request hace su propio round-trip (limitado por SUPABASE_MAX_CONCURRENCY); con
+database.batching.InsertBatcher las requests concurrentes comparten uno.
+
+Uso:
+    python benchmarks/bench_batched_inserts.py --latency-ms 30 --concurrency 1 10 50 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.batching import InsertBatcher  # noqa: E402
+from database.memory import LatencyModel, MemoryClient  # noqa: E402
+from database.repository import execute  # noqa: E402
+
+
+async def run_load(concurrency: int, requests: int, supabase: MemoryClient, batcher=None):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            row = {"nombre": f"Paciente {i}", "tipo_servicio": "curacion"}
+            if i % 2:
+                # Como el formulario: los campos opcionales solo se envían si vienen
+                row["fecha_sugerida"] = "2025-01-15"
+            if batcher is None:
+                await execute(supabase.table("solicitudes").insert(row))
+            else:
+                await batcher.insert(supabase, row)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+        "round_trips": supabase.latency.round_trips,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--row-cost-ms", type=float, default=0.2)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--batch-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'conc':>5} | {'modo':<8} | {'req/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'round-trips':>11}")
+    print("-" * 63)
+    for concurrency in args.concurrency:
+        modes = (
+            ("unitario", None),
+            ("lotes", InsertBatcher("solicitudes", args.batch_size, args.batch_delay_ms / 1000)),
+        )
+        for name, batcher in modes:
+            supabase = MemoryClient(latency=LatencyModel(args.latency_ms, row_cost_ms=args.row_cost_ms))
+            result = asyncio.run(run_load(concurrency, args.requests, supabase, batcher))
+            print(
+                f"{concurrency:>5} | {name:<8} | {result['rps']:>8.1f} | {result['p50_ms']:>8.1f} | "
+                f"{result['p99_ms']:>8.1f} | {result['round_trips']:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
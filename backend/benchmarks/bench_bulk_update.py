@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: actualizar N solicitudes una por una vs PATCH /solicitudes/bulk
+
+Llama a los handlers reales de routers/admin.py con database.memory.MemoryClient,
+que simula la latencia de cada round-trip a PostgREST. El camino
+por fila hace un SELECT y un UPDATE por solicitud (y una llamada HTTP por
+solicitud desde el panel); el masivo hace un único UPDATE para todo el lote.
+Los contadores del dashboard los mantiene el trigger de la base de datos.
+
+Uso:
+    python benchmarks/bench_bulk_update.py --latency-ms 40 --batch 10 50 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.memory import LatencyModel, MemoryClient  # noqa: E402
+from models.solicitud import SolicitudBulkUpdate, SolicitudUpdate  # noqa: E402
+from routers.admin import bulk_update_solicitudes, update_solicitud_status  # noqa: E402
+
+
+def build_client(count: int, latency_ms: float) -> MemoryClient:
+    rows = [{"estado": "pendiente", "comentarios": None} for _ in range(count)]
+    return MemoryClient({"solicitudes": rows}, LatencyModel(latency_ms))
+
+
+async def per_row(supabase: MemoryClient, ids: list, http_latency: float):
+    for solicitud_id in ids:
+        # El panel espera la respuesta de cada PUT antes de enviar el siguiente
+        await asyncio.sleep(http_latency)
+        await update_solicitud_status(solicitud_id, SolicitudUpdate(estado="completada"), {}, supabase)
+
+
+async def bulk(supabase: MemoryClient, ids: list, http_latency: float):
+    await asyncio.sleep(http_latency)
+    await bulk_update_solicitudes(SolicitudBulkUpdate(ids=ids, estado="completada"), {}, supabase)
+
+
+def run(mode, batch: int, latency_ms: float, http_latency: float):
+    supabase = build_client(batch, latency_ms)
+    rows = supabase.tables["solicitudes"]
+    start = time.perf_counter()
+    asyncio.run(mode(supabase, [row["id"] for row in rows], http_latency))
+    elapsed = time.perf_counter() - start
+    assert all(row["estado"] == "completada" for row in rows)
+    return elapsed, supabase.latency.round_trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Latencia backend -> PostgREST")
+    parser.add_argument("--http-latency-ms", type=float, default=60.0, help="Latencia navegador -> backend")
+    parser.add_argument("--batch", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    http_latency = args.http_latency_ms / 1000
+    print(f"{'lote':>5} | {'modo':<8} | {'total ms':>10} | {'round-trips':>11} | {'ms/solicitud':>12}")
+    print("-" * 59)
+    for batch in args.batch:
+        for name, mode in (("por fila", per_row), ("bulk", bulk)):
+            elapsed, round_trips = run(mode, batch, args.latency_ms, http_latency)
+            print(
+                f"{batch:>5} | {name:<8} | {elapsed * 1000:>10.1f} | "
+                f"{round_trips:>11} | {elapsed * 1000 / batch:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: paginación por offset vs por cursor (keyset) en páginas profundas
+
+Usa una tabla solicitudes en SQLite con el mismo índice compuesto
+(fecha DESC, id DESC) que crea migration_keyset_pagination_indexes.sql.
+Con OFFSET la base recorre todas las filas omitidas; con el cursor hace un
+seek directo en el índice, así que el costo no depende de la profundidad.
+
+Uso:
+    python benchmarks/bench_pagination.py --rows 200000 --page-size 50
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.pagination import SOLICITUDES_CURSOR_KEYS, decode_cursor, encode_cursor  # noqa: E402
+
+
+def build_table(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE solicitudes (id TEXT PRIMARY KEY, nombre TEXT, fecha TEXT)")
+    conn.execute("CREATE INDEX idx_solicitudes_fecha_id ON solicitudes(fecha DESC, id DESC)")
+    rng = random.Random(42)
+    start = datetime(2023, 1, 1)
+    conn.executemany(
+        "INSERT INTO solicitudes VALUES (?, ?, ?)",
+        (
+            (str(uuid.UUID(int=rng.getrandbits(128))), f"Paciente {i}",
+             (start + timedelta(seconds=rng.randint(0, 60 * 86400))).isoformat())
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    return conn
+
+
+def page_offset(conn, offset: int, limit: int):
+    return conn.execute(
+        "SELECT id, nombre, fecha FROM solicitudes ORDER BY fecha DESC, id DESC LIMIT ? OFFSET ?",
+        (limit, offset),
+    ).fetchall()
+
+
+def page_cursor(conn, cursor: str, limit: int):
+    fecha, id_ = decode_cursor(cursor, SOLICITUDES_CURSOR_KEYS)
+    return conn.execute(
+        "SELECT id, nombre, fecha FROM solicitudes "
+        "WHERE fecha <= ? AND (fecha < ? OR (fecha = ? AND id < ?)) "
+        "ORDER BY fecha DESC, id DESC LIMIT ?",
+        (fecha, fecha, fecha, id_, limit),
+    ).fetchall()
+
+
+def timed(fn, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    conn = build_table(args.rows)
+    limit = args.page_size
+    last_page = args.rows // limit - 1
+    depths = [page for page in (0, 100, 1_000, 10_000) if page < last_page] + [last_page]
+
+    print(f"{'página':>7} | {'offset ms':>9} | {'cursor ms':>9} | mismas filas")
+    print("-" * 46)
+    for page in depths:
+        offset = page * limit
+        if offset == 0:
+            print(f"{page:>7} | {timed(lambda: page_offset(conn, 0, limit)):>9.2f} | {'-':>9} | -")
+            continue
+
+        # The cursor for page N is built from the last row of page N-1
+        previous = page_offset(conn, offset - limit, limit)
+        cursor = encode_cursor({"id": previous[-1][0], "fecha": previous[-1][2]}, SOLICITUDES_CURSOR_KEYS)
+
+        by_offset = page_offset(conn, offset, limit)
+        by_cursor = page_cursor(conn, cursor, limit)
+        offset_ms = timed(lambda: page_offset(conn, offset, limit))
+        cursor_ms = timed(lambda: page_cursor(conn, cursor, limit))
+        print(f"{page:>7} | {offset_ms:>9.2f} | {cursor_ms:>9.2f} | {by_offset == by_cursor}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: conversión de filas de solicitudes a SolicitudResponse (filas/seg)
+
+Compara el loop por fila que usaban los endpoints de admin (parseo con
+try/except + validación de Pydantic en cada fila) contra el conversor por
+lotes de models.converters, con y sin re-validación.
+
+Uso:
+    python benchmarks/bench_row_conversion.py --rows 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.converters import solicitudes_from_rows  # noqa: E402
+from models.solicitud import SolicitudResponse  # noqa: E402
+
+
+def legacy_convert(rows):
+    """Copia del loop por fila que tenían los endpoints antes del conversor."""
+    solicitudes = []
+    for solicitud in rows:
+        fecha_sugerida = None
+        if solicitud.get("fecha_sugerida"):
+            try:
+                fecha_sugerida = datetime.fromisoformat(solicitud["fecha_sugerida"]).date()
+            except:
+                fecha_sugerida = None
+
+        hora_sugerida = None
+        if solicitud.get("hora_sugerida"):
+            try:
+                hora_sugerida = datetime.strptime(solicitud["hora_sugerida"], "%H:%M:%S").time()
+            except:
+                hora_sugerida = None
+
+        fecha_creacion = None
+        if solicitud.get("fecha"):
+            try:
+                fecha_creacion = datetime.fromisoformat(solicitud["fecha"].replace('Z', '+00:00'))
+            except:
+                fecha_creacion = datetime.now()
+
+        estado = solicitud.get("estado")
+        if estado is None or estado == "":
+            comentarios = solicitud.get("comentarios", "")
+            estado = "cancelada" if "[CANCELADA]" in comentarios else "pendiente"
+
+        solicitudes.append(SolicitudResponse(
+            id=solicitud["id"],
+            nombre=solicitud["nombre"],
+            telefono=solicitud["telefono"],
+            email=solicitud["email"],
+            direccion=solicitud["direccion"],
+            tipo_servicio=solicitud["tipo_servicio"],
+            fecha_sugerida=fecha_sugerida,
+            hora_sugerida=hora_sugerida,
+            comentarios=solicitud.get("comentarios"),
+            estado=estado,
+            created_at=fecha_creacion,
+            updated_at=solicitud.get("updated_at")
+        ))
+    return solicitudes
+
+
+def synthetic_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    now = datetime(2024, 6, 1, 12, 0, 0)
+    horas = ["09:00:00", "10:30:00", "12:00:00", "15:00:00", "18:30:00"]
+    rows = []
+    for i in range(count):
+        fecha = now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400))
+        rows.append({
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "nombre": "Paciente de Prueba",
+            "telefono": "+56 9 1234 5678",
+            "email": f"paciente{i}@example.com",
+            "direccion": "Av. Siempre Viva 742, Santiago",
+            "tipo_servicio": rng.choice(["curacion", "inyecciones", "otros"]),
+            "fecha_sugerida": (now + timedelta(days=rng.randint(0, 60))).date().isoformat(),
+            "hora_sugerida": rng.choice(horas),
+            "comentarios": rng.choice(["Sin comentarios", "[CANCELADA] Solicitud cancelada", None]),
+            "estado": rng.choice(["pendiente", "completada", "cancelada", None]),
+            "fecha": fecha.isoformat() + "+00:00",
+            "updated_at": fecha.isoformat() + "+00:00",
+        })
+    return rows
+
+
+def rows_per_second(fn, rows, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    # Rows without comentarios would break the legacy loop (None in "in" check)
+    legacy_rows = [dict(r, comentarios=r["comentarios"] or "") for r in rows]
+
+    results = [
+        ("legacy (por fila)", rows_per_second(legacy_convert, legacy_rows)),
+        ("lotes, validado", rows_per_second(lambda r: solicitudes_from_rows(r, trusted=False), rows)),
+        ("lotes, confiable", rows_per_second(solicitudes_from_rows, rows)),
+    ]
+    baseline = results[0][1]
+    print(f"{'modo':<20} | {'filas/seg':>12} | {'speedup':>7}")
+    print("-" * 46)
+    for name, rps in results:
+        print(f"{name:<20} | {rps:>12,.0f} | {rps / baseline:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GET /api/admin/solicitudes de punta a punta (ms por request)
+
+Llama a la app real por ASGI (httpx, sin red) con database.memory.MemoryClient,
+así se mide todo el camino HTTP: dependencias, consulta, conversión y
+serialización. Compara el endpoint actual, que devuelve los SolicitudResponse
+ya construidos como JSON directo, contra una copia que los devuelve como
+modelos y deja que FastAPI los re-valide contra ``response_model`` (como
+hacía antes).
+
+Uso:
+    python benchmarks/bench_solicitudes_endpoint.py --limit 50 200 --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+# Todas las requests vienen del mismo cliente: el rate limit no debe cortarlas
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from fastapi import Depends, Query  # noqa: E402
+
+from auth.middleware import get_current_user, get_manager_or_admin_user  # noqa: E402
+from benchmarks.bench_row_conversion import synthetic_rows  # noqa: E402
+from database.connection import get_supabase_client  # noqa: E402
+from database.memory import MemoryClient  # noqa: E402
+from database.pagination import LIST_MAX_LIMIT, apply_solicitudes_cursor  # noqa: E402
+from database.repository import execute  # noqa: E402
+from main import app  # noqa: E402
+from models.converters import solicitudes_from_rows  # noqa: E402
+from models.solicitud import SolicitudResponse  # noqa: E402
+from observability.tracing import TracedRoute  # noqa: E402
+
+ADMIN = {"id": "bench", "email": "admin@ejemplo.cl", "role": "admin"}
+
+
+def install(supabase: MemoryClient) -> None:
+    app.dependency_overrides[get_supabase_client] = lambda: supabase
+    app.dependency_overrides[get_current_user] = lambda: ADMIN
+
+    async def validado(
+        limit: int = Query(50, ge=1, le=LIST_MAX_LIMIT),
+        offset: int = Query(0, ge=0),
+        current_user: dict = Depends(get_manager_or_admin_user),
+        supabase=Depends(get_supabase_client),
+    ) -> List[SolicitudResponse]:
+        """Copia del endpoint antes del cambio (mismas dependencias): devuelve modelos."""
+        query = apply_solicitudes_cursor(supabase.table("solicitudes").select("*"), None)
+        result = await execute(query.limit(limit).offset(offset))
+        return solicitudes_from_rows(result.data)
+
+    # Misma clase de ruta que el router de admin, para que solo cambie la respuesta
+    app.router.add_api_route(
+        "/bench/solicitudes-validadas", validado,
+        response_model=List[SolicitudResponse], route_class_override=TracedRoute,
+    )
+
+
+async def ms_per_request(client: httpx.AsyncClient, path: str, limit: int, requests: int) -> float:
+    # Calentamiento: cachés de parseo y de vistas ordenadas
+    for _ in range(5):
+        (await client.get(path, params={"limit": limit})).raise_for_status()
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, params={"limit": limit})
+        response.raise_for_status()
+    return (time.perf_counter() - start) * 1000 / requests
+
+
+async def run(args) -> None:
+    supabase = MemoryClient({"solicitudes": synthetic_rows(args.rows)})
+    install(supabase)
+
+    print(f"{'limit':>5} | {'modo':<24} | {'ms/request':>10} | {'speedup':>7}")
+    print("-" * 56)
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        for limit in args.limit:
+            antes = await ms_per_request(client, "/bench/solicitudes-validadas", limit, args.requests)
+            ahora = await ms_per_request(client, "/api/admin/solicitudes", limit, args.requests)
+            print(f"{limit:>5} | {'response_model (antes)':<24} | {antes:>10.3f} | {1:>6.1f}x")
+            print(f"{limit:>5} | {'JSON directo (ahora)':<24} | {ahora:>10.3f} | {antes / ahora:>6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000, help="Solicitudes sembradas")
+    parser.add_argument("--limit", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--requests", type=int, default=200, help="Requests medidas por modo")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tamaño de payload de /api/admin/estadisticas vs filas en solicitudes
+
+Genera solicitudes sintéticas y compara:
+  - legacy: select("*") de toda la tabla + agregación en Python
+  - rpc:    solo las filas (dimension, clave, cantidad) de get_solicitudes_stats
+
+Los bytes "legacy" son los que PostgREST envía para toda la tabla; los bytes
+"rpc" son constantes porque solo dependen de la cantidad de grupos. Antes de
+medir, la respuesta del RPC pasa por el APIResponse de postgrest (el mismo
+parseo que hace el cliente real) y se verifica que produce las mismas
+estadísticas que la agregación en Python.
+
+Uso:
+    python benchmarks/bench_statistics.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from postgrest.base_request_builder import APIResponse  # noqa: E402
+
+from database.statistics import ESTADOS, aggregate_counts, aggregate_rows, build_stats, count_rows  # noqa: E402
+
+TIPOS = ["curacion", "control-presion", "acompanamiento", "inyecciones", "otros"]
+
+
+def synthetic_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for i in range(count):
+        fecha = now - timedelta(days=rng.randint(0, 730), seconds=rng.randint(0, 86400))
+        yield {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "nombre": "Paciente de Prueba",
+            "telefono": "+56 9 1234 5678",
+            "email": f"paciente{i}@example.com",
+            "direccion": "Av. Siempre Viva 742, Santiago",
+            "tipo_servicio": rng.choice(TIPOS),
+            "fecha_sugerida": fecha.date().isoformat(),
+            "hora_sugerida": "10:30:00",
+            "comentarios": "Sin comentarios",
+            "estado": rng.choice(ESTADOS),
+            "fecha": fecha.isoformat() + "+00:00",
+            "updated_at": fecha.isoformat() + "+00:00",
+        }
+
+
+def measure(count: int) -> dict:
+    legacy_bytes = 2  # "[]"
+    rows = []
+    for row in synthetic_rows(count):
+        legacy_bytes += len(json.dumps(row)) + 1
+        rows.append(row)
+
+    start = time.perf_counter()
+    aggregate = aggregate_rows(rows)
+    stats = build_stats(aggregate, datetime.utcnow())
+    python_seconds = time.perf_counter() - start
+
+    rpc_rows = count_rows(aggregate)
+    parsed = APIResponse[dict](data=json.loads(json.dumps(rpc_rows)))
+    assert build_stats(aggregate_counts(parsed.data), datetime.utcnow()) == stats, "El RPC no coincide con Python"
+
+    return {
+        "rows": count,
+        "legacy_payload_bytes": legacy_bytes,
+        "legacy_python_ms": python_seconds * 1000,
+        "rpc_payload_bytes": len(json.dumps(rpc_rows)),
+        "response_bytes": len(json.dumps(stats)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'filas':>9} | {'legacy payload':>15} | {'legacy agg ms':>13} | {'rpc payload':>11} | {'respuesta':>9}")
+    print("-" * 70)
+    for count in args.rows:
+        r = measure(count)
+        print(
+            f"{r['rows']:>9} | {r['legacy_payload_bytes']:>15,} | {r['legacy_python_ms']:>13.1f} | "
+            f"{r['rpc_payload_bytes']:>11,} | {r['response_bytes']:>9,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
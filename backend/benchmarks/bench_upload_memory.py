@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memoria pico con subidas concurrentes de fotos
+
+Lanza N subidas multipart simultáneas de un archivo de X MB contra dos
+versiones del endpoint, a través de la app ASGI real (sin red):
+
+  - legacy: UploadFile + ``await file.read()`` y subida con los bytes
+  - streaming: storage.streaming.receive_image_upload y subida desde el
+    archivo temporal, leída por partes como lo hace httpx
+
+El Storage se reemplaza por un consumidor que lee el archivo de a 64KB.
+La memoria pico se mide con tracemalloc (asignaciones de Python), así que
+refleja lo que cada petición retiene, no el RSS total del proceso (y hace
+que la corrida sea bastante más lenta que sin medición).
+
+Uso:
+    python benchmarks/bench_upload_memory.py --concurrency 50 --size-mb 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile  # noqa: E402
+
+from storage.streaming import UPLOAD_CHUNK_SIZE, UploadError, receive_image_upload  # noqa: E402
+
+BOUNDARY = "benchboundary7d3c"
+MAX_FILE_SIZE = 64 * 1024 * 1024
+
+
+def consume_bytes(content: bytes) -> int:
+    return len(content)
+
+
+def consume_reader(reader) -> int:
+    total = 0
+    while True:
+        chunk = reader.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return total
+        total += len(chunk)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/legacy")
+    async def legacy(file: UploadFile = File(...)):
+        content = await file.read()
+        await asyncio.sleep(0.01)  # simulated storage round-trip while holding the body
+        return {"size": consume_bytes(content)}
+
+    @app.post("/streaming")
+    async def streaming(request: Request):
+        try:
+            upload = await receive_image_upload(request, "file", MAX_FILE_SIZE)
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        try:
+            reader = upload.open_reader()
+            await asyncio.sleep(0.01)
+            try:
+                return {"size": consume_reader(reader)}
+            finally:
+                reader.close()
+        finally:
+            upload.close()
+
+    return app
+
+
+async def multipart_body(size: int):
+    """Genera el cuerpo multipart por partes, para no inflar la memoria del cliente."""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="foto.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode()
+    block = b"\xff\xd8\xff\xe0" + b"\0" * (UPLOAD_CHUNK_SIZE - 4)
+    sent = 0
+    while sent < size:
+        piece = block[: min(UPLOAD_CHUNK_SIZE, size - sent)]
+        sent += len(piece)
+        yield piece
+        await asyncio.sleep(0)  # let the other uploads interleave
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def run(path: str, concurrency: int, size: int):
+    transport = httpx.ASGITransport(app=build_app())
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post(path, content=multipart_body(size), headers=headers)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    ok = sum(1 for r in responses if r.status_code == 200 and r.json()["size"] == size)
+    return peak, elapsed, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--size-mb", type=float, default=5)
+    args = parser.parse_args()
+    size = int(args.size_mb * 1024 * 1024)
+
+    print(f"{args.concurrency} subidas concurrentes de {args.size_mb:g}MB")
+    print(f"{'modo':<10} | {'pico MB':>8} | {'MB/subida':>9} | {'tiempo s':>8} | ok")
+    print("-" * 52)
+    for name, path in (("legacy", "/legacy"), ("streaming", "/streaming")):
+        peak, elapsed, ok = asyncio.run(run(path, args.concurrency, size))
+        peak_mb = peak / (1024 * 1024)
+        print(f"{name:<10} | {peak_mb:>8.1f} | {peak_mb / args.concurrency:>9.2f} | {elapsed:>8.2f} | {ok}/{args.concurrency}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+from postgrest.exceptions import APIError
+
+from .repository import execute
+
+logger = logging.getLogger(__name__)
+
+# Write-behind batching of public solicitud inserts (off by default).
+# Submissions arriving within SOLICITUD_BATCH_MAX_DELAY_MS are written with a
+# single multi-row INSERT; a full batch is written immediately.
+SOLICITUD_BATCH_INSERTS = os.getenv("SOLICITUD_BATCH_INSERTS", "false").lower() == "true"
+SOLICITUD_BATCH_MAX_SIZE = int(os.getenv("SOLICITUD_BATCH_MAX_SIZE", "50"))
+SOLICITUD_BATCH_MAX_DELAY_MS = float(os.getenv("SOLICITUD_BATCH_MAX_DELAY_MS", "5"))
+
+# PostgREST error codes answered with a 4xx: the statement was rejected and
+# rolled back (data exception, constraint violation, undefined object, bad
+# request), so nothing was written and the rows can be retried one by one.
+ROW_ERROR_CODES = ("22", "23", "42", "PGRST1", "PGRST2")
+
+
+def is_row_error(error: BaseException) -> bool:
+    """True if PostgREST rejected the INSERT itself (4xx), not the transport."""
+    return isinstance(error, APIError) and (error.code or "").startswith(ROW_ERROR_CODES)
+
+
+def uniform_rows(rows: List[dict]) -> List[dict]:
+    """Give every row the union of the batch's keys (missing ones as None).
+
+    PostgREST rejects a multi-row INSERT whose objects don't all have the
+    same keys, and optional fields (fecha_sugerida, hora_sugerida) are only
+    sent when present.
+    """
+    keys = {}
+    for row in rows:
+        keys.update(dict.fromkeys(row))
+    return [{key: row.get(key) for key in keys} for row in rows]
+
+
+class InsertBatcher:
+    """
+    Coalesces concurrent inserts into one table into multi-row INSERTs
+
+    Each caller awaits a future that resolves to its own inserted row. A
+    request waits at most ``max_delay`` seconds for companions before its
+    batch is written. If PostgREST rejects a batch (4xx), its rows are retried
+    one by one so a single invalid row does not fail the others. Any other
+    failure (timeout, connection reset, 5xx) fails the whole batch: the
+    INSERT may have been committed, and retrying it would duplicate rows.
+    """
+
+    def __init__(self, table: str, max_size: int, max_delay: float):
+        self.table = table
+        self.max_size = max(1, max_size)
+        self.max_delay = max_delay
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set = set()
+        self._closed = False
+        self.rows = 0
+        self.batches = 0
+        self.fallbacks = 0
+        self.failures = 0
+
+    async def insert(self, supabase, row: dict) -> dict:
+        if self._closed:
+            # Shutting down: don't start a batch nobody will flush
+            return await self._insert_one(supabase, row)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((supabase, row, future))
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._start_flush)
+        # shield: a client disconnecting must not cancel the write for the whole batch
+        return await asyncio.shield(future)
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _insert_one(self, supabase, row: dict) -> dict:
+        result = await execute(supabase.table(self.table).insert(row))
+        if not result.data:
+            raise RuntimeError(f"No se pudo insertar en {self.table}")
+        return result.data[0]
+
+    async def _flush(self, batch: List[tuple]) -> None:
+        supabase = batch[0][0]
+        self.batches += 1
+        self.rows += len(batch)
+        try:
+            result = await execute(supabase.table(self.table).insert(uniform_rows([row for _, row, _ in batch])))
+            if not result.data or len(result.data) != len(batch):
+                raise RuntimeError(f"El INSERT por lotes devolvió {len(result.data or [])} de {len(batch)} filas")
+        except Exception as e:
+            if not is_row_error(e):
+                logger.error("❌ INSERT por lotes en %s falló (%d filas): %r", self.table, len(batch), e)
+                self.failures += 1
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            logger.warning("⚠️ INSERT por lotes en %s rechazado, reintentando fila por fila: %s", self.table, e)
+            self.fallbacks += 1
+            await asyncio.gather(*(self._resolve_one(item) for item in batch))
+            return
+
+        # PostgREST returns the inserted rows in request order
+        for (_, _, future), inserted in zip(batch, result.data):
+            if not future.done():
+                future.set_result(inserted)
+
+    async def _resolve_one(self, item: tuple) -> None:
+        supabase, row, future = item
+        try:
+            inserted = await self._insert_one(supabase, row)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(inserted)
+
+    async def close(self) -> None:
+        """Flush what is pending and wait for in-flight batches (called on shutdown)."""
+        self._closed = True
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "max_size": self.max_size,
+            "max_delay_ms": self.max_delay * 1000,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else None,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures,
+        }
+
+
+solicitud_batcher: Optional[InsertBatcher] = (
+    InsertBatcher("solicitudes", SOLICITUD_BATCH_MAX_SIZE, SOLICITUD_BATCH_MAX_DELAY_MS / 1000)
+    if SOLICITUD_BATCH_INSERTS else None
+)
+
+
+def get_batching_stats() -> dict:
+    """Batching counters of this worker, or ``enabled: False``."""
+    if solicitud_batcher is None:
+        return {"enabled": False}
+    return solicitud_batcher.stats()
@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+# How long a worker serves its cached catalog before reloading it. Writes in
+# this worker invalidate it immediately; other workers pick changes up on expiry.
+CATALOG_CACHE_TTL = float(os.getenv("PUBLIC_CATALOG_CACHE_TTL", "60"))
+CATALOG_MAX_AGE = int(os.getenv("PUBLIC_CATALOG_MAX_AGE", "60"))
+CATALOG_STALE_WHILE_REVALIDATE = int(os.getenv("PUBLIC_CATALOG_STALE_WHILE_REVALIDATE", "300"))
+
+
+class CachedBody:
+    """A serialized JSON body with its strong ETag."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.expires_at = time.monotonic() + CATALOG_CACHE_TTL
+
+    @property
+    def headers(self) -> dict:
+        return {
+            "ETag": self.etag,
+            "Cache-Control": (
+                f"public, max-age={CATALOG_MAX_AGE}, "
+                f"stale-while-revalidate={CATALOG_STALE_WHILE_REVALIDATE}"
+            ),
+        }
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an ``If-None-Match`` header matches this body's ETag."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+class CatalogCache:
+    """Single-entry cache of a serialized response, rebuilt at most once at a time."""
+
+    def __init__(self):
+        self._entry: Optional[CachedBody] = None
+        self._generation = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, loader: Callable[[], Awaitable[bytes]]) -> CachedBody:
+        entry = self._entry
+        if entry is not None and entry.expires_at > time.monotonic():
+            self.hits += 1
+            return entry
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            entry = self._entry
+            if entry is not None and entry.expires_at > time.monotonic():
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            generation = self._generation
+            entry = CachedBody(await loader())
+            # Don't keep a body loaded before an invalidation that happened meanwhile
+            if generation == self._generation:
+                self._entry = entry
+            return entry
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entry = None
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "cached": self._entry is not None,
+            "ttl_seconds": CATALOG_CACHE_TTL,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+public_catalog_cache = CatalogCache()
+
+
+def invalidate_public_catalog() -> None:
+    """Drop the cached public catalog after a profesional is created, updated or deleted."""
+    public_catalog_cache.invalidate()
@@ -1,29 +1,229 @@
 import os
-from supabase import create_client, Client
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
 from dotenv import load_dotenv
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient as PostgrestSession
+from storage3.utils import SyncClient as StorageSession
+from supabase import Client
+from supabase.lib.client_options import ClientOptions
+from supabase.lib.storage_client import SupabaseStorageClient
 
 load_dotenv()
 
-def get_supabase_client() -> Client:
-    """Create and return a Supabase client instance."""
+# HTTP connection pool configuration (per worker process)
+POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", "30"))
+POOL_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+POOL_READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "30"))
+
+# "supabase" (default) or "memory": database.memory's in-process stand-in,
+# for running the API and the benchmarks without network access
+SUPABASE_BACKEND = os.getenv("SUPABASE_BACKEND", "supabase").lower()
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def _pool_timeout() -> httpx.Timeout:
+    return httpx.Timeout(POOL_READ_TIMEOUT, connect=POOL_CONNECT_TIMEOUT)
+
+
+class _PooledPostgrestClient(SyncPostgrestClient):
+    """PostgREST client whose session keeps a bounded keep-alive pool."""
+
+    def create_session(self, base_url, headers, timeout):
+        return PostgrestSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=_pool_timeout(),
+            limits=_pool_limits(),
+        )
+
+
+class _PooledStorageClient(SupabaseStorageClient):
+    """Storage client whose session keeps a bounded keep-alive pool."""
+
+    def _create_session(self, base_url, headers, timeout):
+        return StorageSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=_pool_timeout(),
+            limits=_pool_limits(),
+        )
+
+
+class PooledClient(Client):
+    """Supabase client that reuses HTTP connections across requests."""
+
+    def _init_postgrest_client(self, rest_url, headers, schema, timeout=None):
+        return _PooledPostgrestClient(rest_url, headers=headers, schema=schema)
+
+    def _init_storage_client(self, storage_url, headers, storage_client_timeout=None):
+        return _PooledStorageClient(storage_url, headers)
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pools."""
+        if self._postgrest is not None:
+            self._postgrest.aclose()
+            self._postgrest = None
+        if self._storage is not None:
+            self._storage.aclose()
+            self._storage = None
+
+
+def _create_supabase_client() -> PooledClient:
+    """Validate the environment and build a pooled Supabase client."""
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_KEY")
-    
-    # Debug information (commented out for production)
-    # print(f"SUPABASE_URL: {url[:20] + '...' if url else 'NOT SET'}")
-    # print(f"SUPABASE_SERVICE_KEY: {'SET' if key else 'NOT SET'}")
-    
+
     if not url or not key:
         raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in environment variables")
-    
+
     # Validate URL format
     if not url.startswith('https://'):
         raise ValueError("SUPABASE_URL must start with 'https://'")
-    
+
     if '.supabase.co' not in url:
         raise ValueError("SUPABASE_URL must be a valid Supabase URL (containing '.supabase.co')")
-    
+
     try:
-        return create_client(url, key)
+        return PooledClient(url, key, options=ClientOptions())
     except Exception as e:
         raise ValueError(f"Failed to create Supabase client: {str(e)}")
+
+
+def _create_memory_client():
+    """In-process client configured by the MEMORY_BACKEND_* variables."""
+    from .memory import MemoryClient
+
+    return MemoryClient.from_env()
+
+
+# Client factory per SUPABASE_BACKEND value
+BACKENDS: Dict[str, Callable[[], Any]] = {
+    "supabase": _create_supabase_client,
+    "memory": _create_memory_client,
+}
+
+
+def register_backend(name: str, factory: Callable[[], Any]) -> None:
+    """Make ``factory`` selectable with SUPABASE_BACKEND=<name>."""
+    BACKENDS[name] = factory
+
+
+def _create_client():
+    factory = BACKENDS.get(SUPABASE_BACKEND)
+    if factory is None:
+        raise ValueError(f"SUPABASE_BACKEND must be one of: {', '.join(sorted(BACKENDS))}")
+    return factory()
+
+
+class _ClientRegistry:
+    """Holds one Supabase client per worker process.
+
+    Gunicorn forks its workers after importing the app, so the owning pid is
+    recorded and a fresh client is built if the registry is used from a child.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client: Optional[PooledClient] = None
+        self._pid: Optional[int] = None
+        self._created_at: Optional[float] = None
+        self._checkouts = 0
+
+    def get(self) -> PooledClient:
+        client = self._client
+        if client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    self._client = _create_client()
+                    self._pid = os.getpid()
+                    self._created_at = time.time()
+                    self._checkouts = 0
+                client = self._client
+        self._checkouts += 1
+        return client
+
+    def use(self, client) -> None:
+        with self._lock:
+            self._client = client
+            self._pid = os.getpid()
+            self._created_at = time.time()
+            self._checkouts = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+            self._created_at = None
+
+    def health(self) -> dict:
+        client = self._client
+        if client is None or self._pid != os.getpid():
+            return {"initialized": False, "pid": os.getpid()}
+
+        health = {
+            "initialized": True,
+            "backend": getattr(client, "backend", "supabase"),
+            "pid": self._pid,
+            "uptime_seconds": round(time.time() - self._created_at, 1),
+            "checkouts": self._checkouts,
+            "postgrest_connections": _pool_connections(client._postgrest),
+            "storage_connections": _pool_connections(client._storage),
+            "max_connections": POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": POOL_MAX_KEEPALIVE,
+        }
+        if hasattr(client, "stats"):
+            health["simulated"] = client.stats()
+        return health
+
+
+def _pool_connections(sub_client) -> Optional[int]:
+    """Best-effort count of open connections in a sub-client's pool."""
+    if sub_client is None:
+        return 0
+    try:
+        return len(sub_client.session._transport._pool.connections)
+    except AttributeError:
+        return None
+
+
+_registry = _ClientRegistry()
+
+
+def get_supabase_client() -> Client:
+    """Return the Supabase client shared by the current worker process."""
+    return _registry.get()
+
+
+def use_supabase_client(client) -> None:
+    """Serve this worker from ``client`` instead of Supabase (e.g. a database.memory.MemoryClient)."""
+    _registry.use(client)
+
+
+def init_supabase_client() -> None:
+    """Eagerly build the worker's client (called from the app lifespan)."""
+    _registry.get()
+
+
+def close_supabase_client() -> None:
+    """Release the worker's HTTP connection pools (called on shutdown)."""
+    _registry.close()
+
+
+def get_supabase_pool_health() -> dict:
+    """Return introspection data about the worker's client and its pools."""
+    return _registry.health()
@@ -0,0 +1,32 @@
+import os
+from typing import Optional
+
+from .repository import execute
+
+# RPC defined in migration_solicitudes_dedupe.sql
+DEDUPE_RPC = "find_duplicate_solicitud"
+
+# A solicitud for the same service from the same email and phone within this
+# window is treated as a resubmission (0 disables the check)
+SOLICITUD_DEDUPE_MINUTES = int(os.getenv("SOLICITUD_DEDUPE_MINUTES", "10"))
+
+
+async def find_recent_duplicate(supabase, solicitud_data: dict) -> Optional[dict]:
+    """Return ``id``, ``estado`` and ``fecha`` of a recent equivalent solicitud, or None.
+
+    The check is best effort: if the RPC is not deployed the solicitud is
+    inserted as before.
+    """
+    if SOLICITUD_DEDUPE_MINUTES <= 0:
+        return None
+    try:
+        result = await execute(supabase.rpc(DEDUPE_RPC, {
+            "p_email": solicitud_data["email"],
+            "p_telefono": solicitud_data["telefono"],
+            "p_tipo_servicio": solicitud_data["tipo_servicio"],
+            "p_minutos": SOLICITUD_DEDUPE_MINUTES,
+        }))
+    except Exception as e:
+        print(f"⚠️ RPC {DEDUPE_RPC} no disponible, se omite la detección de duplicados: {e}")
+        return None
+    return result.data[0] if result.data else None
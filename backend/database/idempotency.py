@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Responses to requests sent with an Idempotency-Key are kept per worker for
+# this long, so a retry returns the original response instead of writing again.
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a request with a different body."""
+
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    """Stable hash of a request body, to detect a key reused with other data."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class _Entry:
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.expires_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    """
+    Bounded TTL store of Idempotency-Key -> response
+
+    Concurrent requests with the same key share one execution: the first runs
+    the handler and the rest await its result. Failed executions are not
+    stored, so the client can retry them with the same key.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+
+    def _evict(self, now: float) -> None:
+        # Entries are kept in insertion order, so the oldest are at the front
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if not entry.future.done():
+                # Never drop an execution that is still in flight
+                break
+            if entry.expires_at > now and len(self._entries) < self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """
+        Ejecuta ``handler`` una sola vez por clave
+
+        Returns:
+            (respuesta, replayed): replayed es True si la respuesta viene del store
+
+        Raises:
+            IdempotencyConflict: si la clave se usó con otro cuerpo
+        """
+        now = time.monotonic()
+        self._evict(now)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                self.conflicts += 1
+                raise IdempotencyConflict(key)
+            self.hits += 1
+            try:
+                # shield: a cancelled retry must not cancel the original execution
+                return await asyncio.shield(entry.future), True
+            except asyncio.CancelledError:
+                if not entry.future.cancelled():
+                    raise
+                # The first execution failed; run again as a fresh request
+                return await self.run(key, fingerprint, handler)
+
+        self.misses += 1
+        entry = _Entry(fingerprint)
+        self._entries[key] = entry
+        try:
+            result = await handler()
+        except BaseException:
+            # Failures are not stored, so the client can retry with the same key
+            self._entries.pop(key, None)
+            entry.future.cancel()
+            raise
+        entry.expires_at = time.monotonic() + self.ttl
+        entry.future.set_result(result)
+        return result, False
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "conflicts": self.conflicts,
+        }
+
+
+solicitud_idempotency = IdempotencyStore()
@@ -0,0 +1,776 @@
+import copy
+import json
+import operator
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from postgrest.base_request_builder import APIResponse
+from postgrest.exceptions import APIError
+
+from .duplicates import DEDUPE_RPC
+from .rollups import REBUILD_RPC, ROLLUP_TABLE, _row_keys
+from .statistics import STATS_RPC, aggregate_rows, count_rows
+
+# In-process stand-in for the parts of the Supabase client this API uses, so
+# the app can run (benchmarks/bench_api.py, SUPABASE_BACKEND=memory) without
+# network access. Rows live in Python dicts, files in a dict per bucket; RPCs
+# and triggers from the SQL migrations are reimplemented in Python.
+
+# Simulated round-trip: base latency + uniform jitter + cost per returned row
+MEMORY_LATENCY_MS = float(os.getenv("MEMORY_BACKEND_LATENCY_MS", "0"))
+MEMORY_JITTER_MS = float(os.getenv("MEMORY_BACKEND_JITTER_MS", "0"))
+MEMORY_ROW_COST_MS = float(os.getenv("MEMORY_BACKEND_ROW_COST_MS", "0"))
+# Seed of the jitter, so two runs draw the same delays
+MEMORY_SEED = int(os.getenv("MEMORY_BACKEND_SEED", "0"))
+# Optional JSON file {"tabla": [filas...]} loaded at startup
+MEMORY_DATA_PATH = os.getenv("MEMORY_BACKEND_DATA")
+# Base of the public URLs; must contain "supabase.co/storage" for
+# storage.photos.extract_filename_from_url to recognise them
+MEMORY_STORAGE_URL = os.getenv("MEMORY_STORAGE_URL", "https://memory.supabase.co")
+MEMORY_BUCKETS = ("profesionales-fotos",)
+
+
+class MemoryAPIError(APIError):
+    """Raised where PostgREST would answer with an error (unknown RPC, unsupported filter)."""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__({"message": message, "code": code})
+
+    def __str__(self) -> str:
+        return self.message or ""
+
+
+class LatencyModel:
+    """
+    Delay injected into every simulated round-trip
+
+    ``base_ms + uniform(0, jitter_ms) + row_cost_ms * filas``. The jitter comes
+    from a seeded RNG, so the same seed draws the same sequence of delays and
+    runs with caching, batching or concurrency limits can be compared on
+    round-trips and time waited rather than on network noise.
+    """
+
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0, row_cost_ms: float = 0.0, seed: int = 0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.row_cost_ms = row_cost_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.round_trips = 0
+        self.waited = 0.0
+
+    @classmethod
+    def from_env(cls) -> "LatencyModel":
+        return cls(MEMORY_LATENCY_MS, MEMORY_JITTER_MS, MEMORY_ROW_COST_MS, MEMORY_SEED)
+
+    def delay(self, rows: int = 0) -> float:
+        """Seconds the next round-trip returning ``rows`` rows takes."""
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            seconds = (self.base_ms + jitter + self.row_cost_ms * rows) / 1000
+            self.round_trips += 1
+            self.waited += seconds
+        return seconds
+
+    def wait(self, rows: int = 0) -> None:
+        # Called outside the client lock: concurrent calls overlap like real requests
+        seconds = self.delay(rows)
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+def _response(data: Any, count: Optional[int] = None) -> APIResponse:
+    """
+    postgrest's own APIResponse, so results the real client rejects fail here too
+
+    ``data`` must be a list of rows: an RPC declared RETURNS JSON/INTEGER
+    (an object or a scalar in the body) raises pydantic's ValidationError,
+    exactly as it does against PostgREST.
+    """
+    return APIResponse[Any](data=data, count=count)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Column defaults applied on insert (the DEFAULTs of the SQL schema)
+TABLE_DEFAULTS: Dict[str, Callable[[], dict]] = {
+    "solicitudes": lambda: {"fecha": _now(), "estado": "pendiente", "updated_at": _now()},
+    "profesionales": lambda: {"activo": True, "orden": 0, "created_at": _now(), "updated_at": _now()},
+    "users": lambda: {"role": "admin", "is_active": True, "created_at": _now()},
+}
+
+# NOT NULL columns the API relies on (the keyset cursor keys)
+NOT_NULL_COLUMNS: Dict[str, tuple] = {
+    "solicitudes": ("fecha",),
+    "profesionales": ("orden", "nombre"),
+}
+
+
+def _check_not_null(table: str, row: dict) -> None:
+    for column in NOT_NULL_COLUMNS.get(table, ()):
+        if row.get(column) is None:
+            raise MemoryAPIError(
+                f'null value in column "{column}" of relation "{table}" violates not-null constraint', code="23502"
+            )
+
+
+# -- PostgREST logic trees (``or=(...)``) -------------------------------------
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq, "neq": operator.ne, "gt": operator.gt,
+    "gte": operator.ge, "lt": operator.lt, "lte": operator.le,
+}
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on the commas outside parentheses and double quotes."""
+    parts, current, depth, quoted, escaped = [], [], 0, False, False
+    for ch in text:
+        if escaped:
+            escaped = False
+        elif ch == "\\" and quoted:
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif not quoted and ch in "()":
+            depth += 1 if ch == "(" else -1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    parts.append("".join(current))
+    return parts
+
+
+def _unquote(value: str) -> str:
+    # "..." with backslash escapes, as database.pagination._quote writes them
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+def _coerce(raw: str, current):
+    """Compare as the column's type, like PostgreSQL casting the literal."""
+    if isinstance(current, bool):
+        return raw == "true"
+    if isinstance(current, int):
+        return int(raw) if raw.lstrip("-").isdigit() else float(raw)
+    if isinstance(current, float):
+        return float(raw)
+    return raw
+
+
+def _condition(expression: str) -> Callable[[dict], bool]:
+    """Predicate for ``col.op.value`` or a nested ``and(...)``/``or(...)``."""
+    for name, combine in (("and", all), ("or", any)):
+        if expression.startswith(f"{name}(") and expression.endswith(")"):
+            branches = [_condition(part) for part in _split_top_level(expression[len(name) + 1:-1])]
+            return lambda row: combine(branch(row) for branch in branches)
+
+    column, op, raw = (expression.split(".", 2) + ["", ""])[:3]
+    value = _unquote(raw)
+    if op == "is":
+        expected = None if value == "null" else value == "true"
+        return lambda row: row.get(column) is expected
+    compare = _OPERATORS.get(op)
+    if compare is None:
+        raise MemoryAPIError(f"Filtro no soportado por el backend en memoria: {expression}")
+    # NULL never matches a comparison
+    return lambda row: row.get(column) is not None and compare(row[column], _coerce(value, row[column]))
+
+
+class _Params:
+    """
+    Stands in for the httpx QueryParams that pagination adds ``or=`` to
+
+    ``or``/``and`` logic trees become predicates; any other raw parameter is
+    rejected up front instead of being silently ignored.
+    """
+
+    def __init__(self):
+        self.filters: List[Callable[[dict], bool]] = []
+
+    def add(self, key: str, value: str) -> "_Params":
+        if key not in ("or", "and") or not (value.startswith("(") and value.endswith(")")):
+            raise MemoryAPIError(f"Parámetro no soportado por el backend en memoria: {key}={value}")
+        self.filters.append(_condition(f"{key}{value}"))
+        return self
+
+
+def _sort_key(value):
+    # PostgREST sorts NULLs last in ascending order
+    return (value is None, value if value is not None else 0)
+
+
+class MemoryQuery:
+    """Request builder: filters, ordering and paging applied by ``execute()``."""
+
+    _METHODS = {"select": "GET", "insert": "POST", "update": "PATCH", "delete": "DELETE"}
+
+    def __init__(self, client: "MemoryClient", table: str):
+        self.client = client
+        self.table = table
+        self.path = f"/{table}"
+        self.http_method = "GET"
+        self.params = _Params()
+        self._operation = "select"
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._filters: List[Callable[[dict], bool]] = []
+        self._orders: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    def _set_operation(self, operation: str) -> "MemoryQuery":
+        self._operation = operation
+        self.http_method = self._METHODS[operation]
+        return self
+
+    # -- operations --------------------------------------------------------
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "MemoryQuery":
+        spec = ",".join(columns) if columns else "*"
+        names = [name.strip() for name in spec.split(",") if name.strip()]
+        self._columns = None if "*" in names else names
+        self._count = count
+        return self._set_operation("select")
+
+    def insert(self, rows, **kwargs) -> "MemoryQuery":
+        self._payload = rows
+        return self._set_operation("insert")
+
+    def update(self, values: dict, **kwargs) -> "MemoryQuery":
+        self._payload = values
+        return self._set_operation("update")
+
+    def delete(self, count: Optional[str] = None, **kwargs) -> "MemoryQuery":
+        self._count = count
+        return self._set_operation("delete")
+
+    # -- filters -----------------------------------------------------------
+
+    def _filter(self, predicate: Callable[[dict], bool]) -> "MemoryQuery":
+        self._filters.append(predicate)
+        return self
+
+    def eq(self, column: str, value) -> "MemoryQuery":
+        return self._filter(lambda row: row.get(column) == value)
+
+    def neq(self, column: str, value) -> "MemoryQuery":
+        return self._filter(lambda row: row.get(column) != value)
+
+    def gt(self, column: str, value) -> "MemoryQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] > value)
+
+    def gte(self, column: str, value) -> "MemoryQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] >= value)
+
+    def lt(self, column: str, value) -> "MemoryQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] < value)
+
+    def lte(self, column: str, value) -> "MemoryQuery":
+        return self._filter(lambda row: row.get(column) is not None and row[column] <= value)
+
+    def in_(self, column: str, values) -> "MemoryQuery":
+        values = set(values)
+        return self._filter(lambda row: row.get(column) in values)
+
+    def is_(self, column: str, value) -> "MemoryQuery":
+        expected = None if value in (None, "null") else value
+        return self._filter(lambda row: row.get(column) is expected)
+
+    # -- ordering and paging -----------------------------------------------
+
+    def order(self, column: str, desc: bool = False, nullsfirst: bool = False) -> "MemoryQuery":
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "MemoryQuery":
+        self._limit = size
+        return self
+
+    def offset(self, size: int) -> "MemoryQuery":
+        self._offset = size
+        return self
+
+    def range(self, start: int, end: int) -> "MemoryQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # -- execution ---------------------------------------------------------
+
+    def _predicates(self) -> List[Callable[[dict], bool]]:
+        return self._filters + self.params.filters
+
+    def _matching(self, rows: List[dict]) -> List[dict]:
+        predicates = self._predicates()
+        return [row for row in rows if all(predicate(row) for predicate in predicates)]
+
+    def _project(self, row: dict) -> dict:
+        if self._columns is None:
+            return copy.deepcopy(row)
+        return {column: copy.deepcopy(row.get(column)) for column in self._columns}
+
+    def execute(self) -> APIResponse:
+        with self.client.lock:
+            response = self._run()
+            self.client.calls[f"{self.table}.{self._operation}"] += 1
+        self.client.latency.wait(len(response.data))
+        return response
+
+    def _run(self) -> APIResponse:
+        if self._operation == "insert":
+            rows = self._payload if isinstance(self._payload, list) else [self._payload]
+            if any(set(row) != set(rows[0]) for row in rows):
+                # PGRST102: PostgREST rejects a bulk insert whose objects have different keys
+                raise MemoryAPIError("All object keys must match", code="PGRST102")
+            return _response(self.client.insert_rows(self.table, rows))
+        rows = self.client.tables.setdefault(self.table, [])
+        if self._operation == "update":
+            matching = self._matching(rows)
+            for row in matching:
+                _check_not_null(self.table, {**row, **self._payload})
+            for row in matching:
+                old = copy.deepcopy(row)
+                row.update(copy.deepcopy(self._payload))
+                self.client.fire_triggers(self.table, old, row)
+            self.client.touch(self.table)
+            return _response([copy.deepcopy(row) for row in matching])
+        if self._operation == "delete":
+            matching = self._matching(rows)
+            deleted = {id(row) for row in matching}
+            self.client.tables[self.table] = [row for row in rows if id(row) not in deleted]
+            for row in matching:
+                self.client.fire_triggers(self.table, row, None)
+            self.client.touch(self.table)
+            return _response(matching, len(matching) if self._count else None)
+        return self._select()
+
+    def _select(self) -> APIResponse:
+        rows = self.client.ordered(self.table, tuple(self._orders))
+        end = None if self._limit is None else self._offset + self._limit
+        if self._count or end is None:
+            matching = self._matching(rows)
+            page = matching[self._offset:end]
+        else:
+            # Like an index scan: stop once the page is full
+            predicates = self._predicates()
+            page = []
+            for row in rows:
+                if all(predicate(row) for predicate in predicates):
+                    page.append(row)
+                    if len(page) == end:
+                        break
+            page = page[self._offset:]
+        count = len(matching) if self._count else None
+        return _response([self._project(row) for row in page], count)
+
+
+class MemoryRPC:
+    def __init__(self, client: "MemoryClient", name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+        self.path = f"/rpc/{name}"
+        self.http_method = "POST"
+
+    def execute(self) -> APIResponse:
+        function = self.client.rpcs.get(self.name)
+        if function is None:
+            raise MemoryAPIError(f"Could not find the function public.{self.name}", code="PGRST202")
+        with self.client.lock:
+            data = function(self.client, self.params)
+            self.client.calls[f"rpc.{self.name}"] += 1
+        # RETURNS VOID: PostgREST answers 204 No Content, which the client parses as []
+        response = _response([] if data is None else data)
+        self.client.latency.wait(len(response.data))
+        return response
+
+
+# -- RPCs from the SQL migrations ------------------------------------------
+
+def _find_duplicate_solicitud(client: "MemoryClient", params: dict) -> List[dict]:
+    since = (datetime.now(timezone.utc) - timedelta(minutes=params.get("p_minutos", 10))).isoformat()
+    telefono = "".join(ch for ch in params.get("p_telefono") or "" if ch.isdigit())
+    email = (params.get("p_email") or "").lower()
+    candidates = [
+        row for row in client.tables.get("solicitudes", [])
+        if row.get("tipo_servicio") == params.get("p_tipo_servicio")
+        and (row.get("fecha") or "") >= since
+        and (row.get("email") or "").lower() == email
+        and "".join(ch for ch in row.get("telefono") or "" if ch.isdigit()) == telefono
+    ]
+    candidates.sort(key=lambda row: row["fecha"], reverse=True)
+    return [{"id": row["id"], "estado": row.get("estado"), "fecha": row["fecha"]} for row in candidates[:1]]
+
+
+def _rebuild_stats_rollup(client: "MemoryClient", params: dict) -> List[dict]:
+    counts: Dict[tuple, int] = {}
+    for row in client.tables.get("solicitudes", []):
+        for key in _row_keys(row):
+            counts[key] = counts.get(key, 0) + 1
+    previous = {(row["dimension"], row["clave"]): row["cantidad"] for row in client.tables.get(ROLLUP_TABLE, [])}
+    drift = [
+        # Same keys as the SQL: esperado is recounted from solicitudes, actual is what the rollup had
+        {"dimension": key[0], "clave": key[1], "esperado": counts.get(key, 0), "actual": previous.get(key, 0)}
+        for key in sorted(set(counts) | set(previous)) if previous.get(key, 0) != counts.get(key, 0)
+    ]
+    client.tables[ROLLUP_TABLE] = [
+        {"dimension": key[0], "clave": key[1], "cantidad": cantidad} for key, cantidad in counts.items()
+    ]
+    client.touch(ROLLUP_TABLE)
+    return drift
+
+
+def _solicitudes_stats(client: "MemoryClient", params: dict) -> List[dict]:
+    return count_rows(aggregate_rows(client.tables.get("solicitudes", [])))
+
+
+def _search_text(*values: Optional[str]) -> str:
+    # solicitud_search_text(): lower(unaccent(...)) of the searched columns
+    text = " ".join(value or "" for value in values)
+    return "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch)).lower()
+
+
+def _search_solicitudes(client: "MemoryClient", params: dict) -> List[dict]:
+    # Substring matches only: the trigram similarity ranking is left to Postgres,
+    # so results come in (fecha DESC, id DESC) order
+    termino = _search_text(params.get("termino").strip())
+    matches = [
+        row for row in client.tables.get("solicitudes", [])
+        if termino in _search_text(row.get("nombre"), row.get("email"), row.get("telefono"), row.get("direccion"))
+        and params.get("filtro_estado") in (None, row.get("estado"))
+        and params.get("filtro_tipo_servicio") in (None, row.get("tipo_servicio"))
+    ]
+    matches.sort(key=lambda row: (row["fecha"], row["id"]), reverse=True)
+    limit = min(max(params.get("limite", 20), 1), 100)
+    offset = max(params.get("desplazamiento", 0), 0)
+    return copy.deepcopy(matches[offset:offset + limit])
+
+
+def _requires_cancelacion_migration(row: dict) -> bool:
+    # solicitud_requiere_migracion_cancelacion()
+    return (
+        not row.get("estado")
+        or "[CANCELADA]" in (row.get("comentarios") or "")
+        or (row.get("estado") == "cancelada" and row.get("cancelled_at") is None)
+    )
+
+
+def _migrate_legacy_cancelaciones(client: "MemoryClient", params: dict) -> List[dict]:
+    batch = [
+        row for row in client.tables.get("solicitudes", []) if _requires_cancelacion_migration(row)
+    ][:max(params.get("tamano_lote", 500), 1)]
+    for row in batch:
+        old = copy.deepcopy(row)
+        cancelada = "[CANCELADA]" in (row.get("comentarios") or "") or row.get("estado") == "cancelada"
+        row["estado"] = "cancelada" if cancelada else (row.get("estado") or "pendiente")
+        row["cancelled_at"] = (row.get("cancelled_at") or row.get("updated_at") or _now()) if cancelada else None
+        row["comentarios"] = re.sub(r"\[CANCELADA\][^\n]*\n?", "", row.get("comentarios") or "") or None
+        client.fire_triggers("solicitudes", old, row)
+    client.touch("solicitudes")
+    return [{"n": len(batch)}]
+
+
+def _count_legacy_cancelaciones(client: "MemoryClient", params: dict) -> List[dict]:
+    return [{"n": sum(1 for row in client.tables.get("solicitudes", []) if _requires_cancelacion_migration(row))}]
+
+
+DEFAULT_RPCS: Dict[str, Callable[["MemoryClient", dict], Any]] = {
+    DEDUPE_RPC: _find_duplicate_solicitud,
+    REBUILD_RPC: _rebuild_stats_rollup,
+    STATS_RPC: _solicitudes_stats,
+    "search_solicitudes": _search_solicitudes,
+    "migrate_legacy_cancelaciones": _migrate_legacy_cancelaciones,
+    "count_legacy_cancelaciones": _count_legacy_cancelaciones,
+}
+
+
+# -- Triggers from the SQL migrations ---------------------------------------
+
+def _solicitudes_stats_trigger(client: "MemoryClient", old: Optional[dict], new: Optional[dict]) -> None:
+    # solicitudes_stats_rollup_trigger(): minus OLD's keys, plus NEW's, in the same write
+    deltas = Counter()
+    if old is not None:
+        deltas.subtract(_row_keys(old))
+    if new is not None:
+        deltas.update(_row_keys(new))
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    rollup = client.tables.setdefault(ROLLUP_TABLE, [])
+    index = {(row["dimension"], row["clave"]): row for row in rollup}
+    for key, delta in deltas.items():
+        if key not in index:
+            index[key] = {"dimension": key[0], "clave": key[1], "cantidad": 0}
+            rollup.append(index[key])
+        index[key]["cantidad"] += delta
+    client.touch(ROLLUP_TABLE)
+
+
+# AFTER INSERT/UPDATE/DELETE FOR EACH ROW, called with (old, new) while holding the client lock
+DEFAULT_TRIGGERS: Dict[str, Callable[["MemoryClient", Optional[dict], Optional[dict]], None]] = {
+    "solicitudes": _solicitudes_stats_trigger,
+}
+
+
+# -- Storage -----------------------------------------------------------------
+
+class MemoryBucketInfo:
+    """What ``storage.list_buckets()`` returns per bucket (the code reads ``.name``)."""
+
+    def __init__(self, name: str, public: bool = True):
+        self.id = name
+        self.name = name
+        self.public = public
+
+
+def _read_file(file) -> bytes:
+    # storage3 accepts bytes, a path or an open file
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, (str, Path)):
+        with open(file, "rb") as source:
+            return source.read()
+    return file.read()
+
+
+class MemoryBucket:
+    """``storage.from_(bucket)``: upload/download/remove/list/get_public_url."""
+
+    def __init__(self, storage: "MemoryStorage", name: str):
+        self.storage = storage
+        self.name = name
+
+    def _objects(self) -> Dict[str, dict]:
+        objects = self.storage.buckets.get(self.name)
+        if objects is None:
+            raise MemoryAPIError(f"Bucket not found: {self.name}")
+        return objects
+
+    def _call(self, operation: str, function: Callable[[], Any]):
+        client = self.storage.client
+        with client.lock:
+            result = function()
+            client.calls[f"storage.{operation}"] += 1
+        client.latency.wait()
+        return result
+
+    def upload(self, path: str, file, file_options: Optional[dict] = None) -> dict:
+        options = file_options or {}
+        content = _read_file(file)
+
+        def store():
+            objects = self._objects()
+            previous = objects.get(path)
+            if previous is not None and str(options.get("x-upsert", "false")).lower() != "true":
+                raise MemoryAPIError(f"The resource already exists: {self.name}/{path}")
+            now = _now()
+            objects[path] = {
+                "id": previous["id"] if previous else str(uuid.uuid4()),
+                "content": content,
+                "created_at": previous["created_at"] if previous else now,
+                "updated_at": now,
+                "mimetype": options.get("content-type", "text/plain;charset=UTF-8"),
+                "cacheControl": options.get("cache-control", "3600"),
+            }
+            return {"Key": f"{self.name}/{path}"}
+
+        return self._call("upload", store)
+
+    def download(self, path: str, options: Optional[dict] = None) -> bytes:
+        def fetch():
+            stored = self._objects().get(path)
+            if stored is None:
+                raise MemoryAPIError(f"Object not found: {self.name}/{path}")
+            return stored["content"]
+
+        return self._call("download", fetch)
+
+    def remove(self, paths: List[str]) -> List[dict]:
+        def drop():
+            objects = self._objects()
+            # Like Storage, paths that don't exist are skipped silently
+            return [
+                {"name": path, "bucket_id": self.name, **_object_info(path, objects.pop(path))}
+                for path in paths if path in objects
+            ]
+
+        return self._call("remove", drop)
+
+    def list(self, path: Optional[str] = None, options: Optional[dict] = None) -> List[dict]:
+        options = options or {}
+        prefix = f"{path.strip('/')}/" if path else ""
+        search = (options.get("search") or "").lower()
+        sort = options.get("sortBy") or {"column": "name", "order": "asc"}
+        limit = options.get("limit", 100)
+        offset = options.get("offset", 0)
+
+        def scan():
+            entries = [
+                {"name": name[len(prefix):], **_object_info(name, stored)}
+                for name, stored in self._objects().items()
+                if name.startswith(prefix) and "/" not in name[len(prefix):]
+                and name[len(prefix):].lower().startswith(search)
+            ]
+            column = sort.get("column", "name")
+            entries.sort(key=lambda entry: entry.get(column) or "", reverse=sort.get("order") == "desc")
+            return entries[offset:offset + limit]
+
+        return self._call("list", scan)
+
+    def get_public_url(self, path: str, options: Optional[dict] = None) -> str:
+        # Built locally by storage3 too: no round-trip
+        return f"{self.storage.public_url}/storage/v1/object/public/{self.name}/{path}"
+
+
+def _object_info(name: str, stored: dict) -> dict:
+    return {
+        "id": stored["id"],
+        "created_at": stored["created_at"],
+        "updated_at": stored["updated_at"],
+        "last_accessed_at": stored["updated_at"],
+        "metadata": {
+            "size": len(stored["content"]),
+            "mimetype": stored["mimetype"],
+            "cacheControl": f"max-age={stored['cacheControl']}",
+        },
+    }
+
+
+class MemoryStorage:
+    """``client.storage``: buckets of ``path -> objeto`` shared by every request."""
+
+    def __init__(self, client: "MemoryClient", buckets=MEMORY_BUCKETS, public_url: str = MEMORY_STORAGE_URL):
+        self.client = client
+        self.public_url = public_url.rstrip("/")
+        self.buckets: Dict[str, Dict[str, dict]] = {name: {} for name in buckets}
+
+    def from_(self, bucket: str) -> MemoryBucket:
+        return MemoryBucket(self, bucket)
+
+    def list_buckets(self) -> List[MemoryBucketInfo]:
+        with self.client.lock:
+            buckets = [MemoryBucketInfo(name) for name in self.buckets]
+            self.client.calls["storage.list_buckets"] += 1
+        self.client.latency.wait()
+        return buckets
+
+    def create_bucket(self, name: str, options: Optional[dict] = None) -> dict:
+        with self.client.lock:
+            self.buckets.setdefault(name, {})
+        return {"name": name}
+
+
+class MemoryClient:
+    """
+    Supabase client backed by in-process tables
+
+    Thread-safe: ``execute()`` runs in the repository's thread pool, so every
+    query holds ``lock`` while it reads or writes the tables. The simulated
+    latency is waited after releasing it, so concurrent queries overlap.
+    """
+
+    backend = "memory"
+
+    def __init__(self, tables: Optional[Dict[str, List[dict]]] = None, latency: Optional[LatencyModel] = None):
+        self.lock = threading.RLock()
+        self.tables: Dict[str, List[dict]] = {}
+        self.rpcs = dict(DEFAULT_RPCS)
+        self.triggers = dict(DEFAULT_TRIGGERS)
+        self.latency = latency or LatencyModel()
+        self.storage = MemoryStorage(self)
+        # Round-trips per "tabla.operación", "rpc.nombre" and "storage.operación"
+        self.calls: Counter = Counter()
+        # Sorted views per (table, ORDER BY), dropped when the table changes
+        self._ordered: Dict[tuple, List[dict]] = {}
+        # connection.get_supabase_pool_health() looks for the HTTP sub-clients
+        self._postgrest = None
+        self._storage = None
+        # Seed rows predate the migrations, like existing data: no triggers fire
+        # (call the rebuild RPC to load the rollup, as the migration does)
+        for table, rows in (tables or {}).items():
+            self.insert_rows(table, rows, fire_triggers=False)
+
+    @classmethod
+    def from_env(cls) -> "MemoryClient":
+        """Client configured by the MEMORY_BACKEND_* variables (SUPABASE_BACKEND=memory)."""
+        tables = None
+        if MEMORY_DATA_PATH:
+            with open(MEMORY_DATA_PATH, encoding="utf-8") as source:
+                tables = json.load(source)
+        return cls(tables, LatencyModel.from_env())
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> MemoryRPC:
+        return MemoryRPC(self, name, params)
+
+    def touch(self, table: str) -> None:
+        """Forget the sorted views of ``table`` after a write."""
+        for key in [key for key in self._ordered if key[0] == table]:
+            del self._ordered[key]
+
+    def ordered(self, table: str, orders: tuple) -> List[dict]:
+        """Rows of ``table`` in ``orders`` order (cached until the next write)."""
+        rows = self.tables.setdefault(table, [])
+        if not orders:
+            return rows
+        key = (table, orders)
+        cached = self._ordered.get(key)
+        if cached is None:
+            cached = list(rows)
+            for column, desc in reversed(orders):
+                cached.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+            self._ordered[key] = cached
+        return cached
+
+    def fire_triggers(self, table: str, old: Optional[dict], new: Optional[dict]) -> None:
+        trigger = self.triggers.get(table)
+        if trigger is not None:
+            trigger(self, old, new)
+
+    def insert_rows(self, table: str, rows, fire_triggers: bool = True) -> List[dict]:
+        rows = rows if isinstance(rows, list) else [rows]
+        defaults = TABLE_DEFAULTS.get(table, dict)
+        inserted = []
+        with self.lock:
+            target = self.tables.setdefault(table, [])
+            # One statement: a row violating a constraint inserts none of them
+            batch = [{"id": str(uuid.uuid4()), **defaults(), **copy.deepcopy(row)} for row in rows]
+            for stored in batch:
+                _check_not_null(table, stored)
+            for stored in batch:
+                target.append(stored)
+                if fire_triggers:
+                    self.fire_triggers(table, None, stored)
+                inserted.append(copy.deepcopy(stored))
+            self.touch(table)
+        return inserted
+
+    def stats(self) -> dict:
+        """Round-trips and simulated wait so far (reported by /health)."""
+        return {
+            "round_trips": self.latency.round_trips,
+            "simulated_wait_seconds": round(self.latency.waited, 3),
+            "calls": dict(self.calls),
+            "rows": {table: len(rows) for table, rows in self.tables.items()},
+        }
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,95 @@
+import base64
+import json
+import os
+from typing import List, Optional
+
+# Sort keys used by keyset pagination (must match the listing's ORDER BY)
+SOLICITUDES_CURSOR_KEYS = ("fecha", "id")
+PROFESIONALES_CURSOR_KEYS = ("orden", "nombre", "id")
+
+# Largest page the listings serve (``limit`` query parameter)
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "200"))
+
+# Count strategies for paginated listings ("none" skips counting entirely)
+COUNT_MODES = ("exact", "planned", "estimated", "none")
+DEFAULT_COUNT_MODE = os.getenv("LIST_COUNT_MODE", "exact")
+
+
+def count_option(mode: Optional[str]) -> Optional[str]:
+    """Map a count mode to PostgREST's ``count=`` option; raises ValueError if unknown."""
+    mode = mode or DEFAULT_COUNT_MODE
+    if mode not in COUNT_MODES:
+        raise ValueError(f"Modo de conteo inválido. Use uno de: {', '.join(COUNT_MODES)}")
+    return None if mode == "none" else mode
+
+
+def encode_cursor(row: dict, keys: tuple) -> str:
+    """Build an opaque cursor token from the sort keys of the last row of a page."""
+    payload = json.dumps([row.get(key) for key in keys], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: tuple) -> list:
+    """Decode a cursor token; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Cursor inválido")
+    # The sort keys are NOT NULL (migration_keyset_pagination_indexes.sql), so a
+    # null here can only come from a tampered token
+    if not isinstance(values, list) or len(values) != len(keys) or any(v is None for v in values):
+        raise ValueError("Cursor inválido")
+    return values
+
+
+def next_cursor(rows: List[dict], limit: int, keys: tuple) -> Optional[str]:
+    """Cursor for the page after ``rows``, or None if this was the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1], keys)
+
+
+def _quote(value) -> str:
+    # PostgREST logic trees accept double-quoted values with backslash escapes
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _keyset_filter(keys: tuple, values: list, directions: tuple) -> str:
+    """Build ``(k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...`` for PostgREST ``or=``."""
+    branches = []
+    for i, key in enumerate(keys):
+        op = "lt" if directions[i] == "desc" else "gt"
+        conditions = [f"{keys[j]}.eq.{_quote(values[j])}" for j in range(i)]
+        conditions.append(f"{key}.{op}.{_quote(values[i])}")
+        if len(conditions) == 1:
+            branches.append(conditions[0])
+        else:
+            branches.append(f"and({','.join(conditions)})")
+    return ",".join(branches)
+
+
+def _or_filter(query, expression: str):
+    # postgrest-py 0.13 has no or_() helper, so the raw ``or`` param is added
+    query.params = query.params.add("or", f"({expression})")
+    return query
+
+
+def apply_solicitudes_cursor(query, cursor: Optional[str]):
+    """Order solicitudes by (fecha DESC, id DESC) and seek past ``cursor``."""
+    if cursor:
+        values = decode_cursor(cursor, SOLICITUDES_CURSOR_KEYS)
+        # The redundant bound on the leading key lets the index seek to the cursor
+        query = query.lte("fecha", values[0])
+        query = _or_filter(query, _keyset_filter(SOLICITUDES_CURSOR_KEYS, values, ("desc", "desc")))
+    return query.order("fecha", desc=True).order("id", desc=True)
+
+
+def apply_profesionales_cursor(query, cursor: Optional[str]):
+    """Order profesionales by (orden, nombre, id) and seek past ``cursor``."""
+    if cursor:
+        values = decode_cursor(cursor, PROFESIONALES_CURSOR_KEYS)
+        query = query.gte("orden", values[0])
+        query = _or_filter(query, _keyset_filter(PROFESIONALES_CURSOR_KEYS, values, ("asc", "asc", "asc")))
+    return query.order("orden", desc=False).order("nombre", desc=False).order("id", desc=False)
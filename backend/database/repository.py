@@ -0,0 +1,66 @@
+import functools
+import os
+import time
+from typing import Any, Callable, Optional
+
+import anyio
+from anyio import to_thread
+
+from observability.metrics import observe_db_call, query_labels
+from observability.tracing import span
+from .connection import POOL_MAX_CONNECTIONS
+
+# Maximum number of Supabase calls in flight per worker. Defaults to the HTTP
+# pool size so that offloaded threads never queue inside httpx.
+MAX_CONCURRENCY = int(os.getenv("SUPABASE_MAX_CONCURRENCY", str(POOL_MAX_CONNECTIONS)))
+
+_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def _get_limiter() -> anyio.CapacityLimiter:
+    # anyio limiters must be created inside a running event loop
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(MAX_CONCURRENCY)
+    return _limiter
+
+
+async def execute(query) -> Any:
+    """Run a PostgREST query builder's ``execute()`` without blocking the event loop."""
+    labels = query_labels(query)
+    started = time.perf_counter()
+    ok = False
+    try:
+        with span(f"db.{labels[1]} {labels[0]}", **{"db.table": labels[0], "db.operation": labels[1]}):
+            result = await to_thread.run_sync(query.execute, limiter=_get_limiter())
+        ok = True
+        return result
+    finally:
+        observe_db_call(labels, started, ok)
+
+
+async def run_sync(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking client call (e.g. Storage) in the bounded thread pool."""
+    call = functools.partial(func, *args, **kwargs)
+    labels = ("storage", getattr(func, "__name__", "call"))
+    started = time.perf_counter()
+    ok = False
+    try:
+        with span(f"storage.{labels[1]}"):
+            result = await to_thread.run_sync(call, limiter=_get_limiter())
+        ok = True
+        return result
+    finally:
+        observe_db_call(labels, started, ok)
+
+
+def get_repository_stats() -> dict:
+    """Return the current usage of the Supabase concurrency limiter."""
+    if _limiter is None:
+        return {"max_concurrency": MAX_CONCURRENCY, "in_flight": 0, "waiting": 0}
+    stats = _limiter.statistics()
+    return {
+        "max_concurrency": MAX_CONCURRENCY,
+        "in_flight": stats.borrowed_tokens,
+        "waiting": stats.tasks_waiting,
+    }
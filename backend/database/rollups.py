@@ -0,0 +1,49 @@
+import os
+from typing import List, Optional
+
+from .repository import execute
+from .statistics import aggregate_counts, effective_estado
+
+# Tables and RPCs defined in migration_solicitudes_stats_rollup.sql. The table is
+# kept up to date by a trigger on solicitudes, so writers never touch it.
+ROLLUP_TABLE = "solicitudes_stats_rollup"
+REBUILD_RPC = "rebuild_solicitudes_stats_rollup"
+
+STATS_ROLLUPS_ENABLED = os.getenv("STATS_ROLLUPS_ENABLED", "true").lower() == "true"
+
+
+def _row_keys(solicitud: dict) -> List[tuple]:
+    """Return the (dimension, clave) pairs a solicitud contributes to."""
+    keys = [
+        ("total", "total"),
+        ("estado", effective_estado(solicitud)),
+        ("tipo_servicio", solicitud.get("tipo_servicio") or "otros"),
+    ]
+    if solicitud.get("fecha"):
+        keys.append(("mes", solicitud["fecha"][:7]))
+    return keys
+
+
+async def read_rollup_aggregate(supabase) -> Optional[dict]:
+    """Read the rollup table as an aggregate for ``build_stats``.
+
+    Returns None when rollups are disabled or the table has not been seeded.
+    """
+    if not STATS_ROLLUPS_ENABLED:
+        return None
+
+    result = await execute(supabase.table(ROLLUP_TABLE).select("dimension, clave, cantidad"))
+    aggregate = aggregate_counts(result.data or [])
+    if aggregate["total"] is None:
+        return None
+    return aggregate
+
+
+async def reconcile_rollups(supabase) -> dict:
+    """Rebuild the rollup table from scratch and report the drift found."""
+    result = await execute(supabase.rpc(REBUILD_RPC, {}))
+    drift = result.data or []
+    return {
+        "drift_count": len(drift),
+        "drift": drift,
+    }
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from models.solicitud import ESTADOS_SOLICITUD
+
+# RPC defined in migration_solicitudes_stats.sql
+STATS_RPC = "get_solicitudes_stats"
+STATS_MONTHS = 12
+
+ESTADOS = ESTADOS_SOLICITUD
+
+# Aggregate field fed by each dimension of a (dimension, clave, cantidad) row
+COUNT_DIMENSIONS = {"estado": "por_estado", "tipo_servicio": "por_tipo_servicio", "mes": "por_mes"}
+
+
+def effective_estado(solicitud: dict) -> str:
+    """Return the estado of a row (missing or unknown values count as pending).
+
+    Legacy "[CANCELADA]" comment markers are converted into estado by
+    migrate_cancelaciones.py, so comentarios is no longer inspected.
+    """
+    estado = solicitud.get("estado")
+    if estado not in ESTADOS:
+        return "pendiente"
+    return estado
+
+
+def month_keys(now: datetime, months: int = STATS_MONTHS) -> list:
+    """Return the 'YYYY-MM' keys shown on the dashboard, newest first."""
+    keys = []
+    for i in range(months):
+        key = (now - timedelta(days=30 * i)).strftime("%Y-%m")
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def aggregate_rows(solicitudes: Iterable[dict]) -> dict:
+    """Compute in Python the same aggregate the stats RPC returns.
+
+    Used as a fallback when the RPC has not been deployed yet.
+    """
+    total = 0
+    por_estado = {}
+    por_tipo_servicio = {}
+    por_mes = {}
+
+    for solicitud in solicitudes:
+        total += 1
+        estado = effective_estado(solicitud)
+        por_estado[estado] = por_estado.get(estado, 0) + 1
+
+        tipo = solicitud.get("tipo_servicio") or "otros"
+        por_tipo_servicio[tipo] = por_tipo_servicio.get(tipo, 0) + 1
+
+        if solicitud.get("fecha"):
+            month_key = solicitud["fecha"][:7]
+            por_mes[month_key] = por_mes.get(month_key, 0) + 1
+
+    return {
+        "total": total,
+        "por_estado": por_estado,
+        "por_tipo_servicio": por_tipo_servicio,
+        "por_mes": por_mes,
+    }
+
+
+def aggregate_counts(rows: Iterable[dict]) -> dict:
+    """Build an aggregate from (dimension, clave, cantidad) rows.
+
+    Both the stats RPC and the rollup table return this shape. ``total`` is
+    None when there is no total row.
+    """
+    aggregate = {"total": None, "por_estado": {}, "por_tipo_servicio": {}, "por_mes": {}}
+    for row in rows:
+        if row["dimension"] == "total":
+            aggregate["total"] = row["cantidad"]
+        elif row["dimension"] in COUNT_DIMENSIONS:
+            aggregate[COUNT_DIMENSIONS[row["dimension"]]][row["clave"]] = row["cantidad"]
+    return aggregate
+
+
+def count_rows(aggregate: dict) -> List[dict]:
+    """Inverse of ``aggregate_counts``: the rows the stats RPC returns."""
+    rows = [{"dimension": "total", "clave": "total", "cantidad": aggregate["total"]}]
+    for dimension, field in COUNT_DIMENSIONS.items():
+        rows.extend(
+            {"dimension": dimension, "clave": clave, "cantidad": cantidad}
+            for clave, cantidad in aggregate[field].items()
+        )
+    return rows
+
+
+def build_stats(aggregate: dict, now: datetime) -> dict:
+    """Shape an aggregate into the fields of ``SolicitudStats``."""
+    por_estado = aggregate.get("por_estado") or {}
+    por_mes_raw = aggregate.get("por_mes") or {}
+    por_mes = {key: por_mes_raw.get(key, 0) for key in month_keys(now)}
+
+    return {
+        "total": aggregate.get("total", 0),
+        "pendientes": por_estado.get("pendiente", 0),
+        "confirmadas": por_estado.get("confirmada", 0),
+        "en_progreso": por_estado.get("en_progreso", 0),
+        "completadas": por_estado.get("completada", 0),
+        "canceladas": por_estado.get("cancelada", 0),
+        "por_tipo_servicio": dict(aggregate.get("por_tipo_servicio") or {}),
+        "por_mes": por_mes,
+    }
@@ -1,13 +1,53 @@
-from fastapi import FastAPI
+import hmac
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from database.connection import init_supabase_client, close_supabase_client, get_supabase_pool_health
+from database.repository import get_repository_stats
+from auth.principal_cache import get_principal_cache_stats
+from database.batching import get_batching_stats, solicitud_batcher
+from database.catalog_cache import public_catalog_cache
+from database.idempotency import solicitud_idempotency
+from observability.collectors import register_collectors
+from observability.metrics import METRICS_TOKEN, MetricsMiddleware, render_metrics
+from observability.tracing import TracingMiddleware, exporter as trace_exporter, get_tracing_stats
+from ratelimit.middleware import RateLimitMiddleware, get_rate_limit_stats
+from storage.images import shutdown_image_pool
+from tasks.queue import job_queue
+import tasks.handlers  # noqa: F401  (registers the job handlers)
 from routers import solicitudes, auth, admin, profesionales, upload
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the worker's pooled Supabase client and start the job workers; release both on shutdown."""
+    init_supabase_client()
+    await job_queue.start()
+    yield
+    if solicitud_batcher is not None:
+        await solicitud_batcher.close()
+    await job_queue.stop()
+    shutdown_image_pool()
+    close_supabase_client()
+    trace_exporter.close()
+
 app = FastAPI(
     title="Enfermería a Domicilio API",
     description="API para gestionar solicitudes de servicios de enfermería",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Opt-in request tracing (Server-Timing header + OTLP/JSON file), admitted requests only
+app.add_middleware(TracingMiddleware)
+
+# Rate limiting and admission control (inside CORS so 429/503 carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
+# Request metrics for /metrics (outside the limiter so 429/503 are counted too)
+app.add_middleware(MetricsMiddleware)
+register_collectors()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -15,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "Server-Timing"],
 )
 
 # Include routers
@@ -32,5 +73,25 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Render."""
-    return {"status": "healthy", "service": "enfermeria-api"}
+    jobs = job_queue.stats()
+    return {"status": "healthy" if jobs["healthy"] else "degraded", "service": "enfermeria-api",
+            "database_pool": get_supabase_pool_health(),
+            "database_concurrency": get_repository_stats(),
+            "principal_cache": get_principal_cache_stats(),
+            "public_catalog_cache": public_catalog_cache.stats(),
+            "solicitud_idempotency": solicitud_idempotency.stats(),
+            "solicitud_batching": get_batching_stats(),
+            "rate_limit": get_rate_limit_stats(),
+            "tracing": get_tracing_stats(),
+            "jobs": jobs}
+
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metrics of the worker that serves the scrape."""
+    content = render_metrics()
+    if content is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return Response(content=content, media_type="text/plain; version=0.0.4")
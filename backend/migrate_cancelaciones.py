@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Convierte las cancelaciones antiguas ("[CANCELADA]" en comentarios) en estado/cancelled_at
+
+Requiere haber ejecutado migration_solicitudes_cancelacion.sql. Llama a
+migrate_legacy_cancelaciones() por lotes hasta que no quedan filas por
+convertir y al final reconstruye los contadores del dashboard.
+
+Uso:
+    python migrate_cancelaciones.py --dry-run
+    python migrate_cancelaciones.py --batch-size 500 --pause 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from database.connection import get_supabase_client
+from database.repository import execute
+from database.rollups import reconcile_rollups
+
+MIGRATE_RPC = "migrate_legacy_cancelaciones"
+COUNT_RPC = "count_legacy_cancelaciones"
+
+
+def _cantidad(result) -> int:
+    # Las dos funciones devuelven una sola fila {"n": ...}
+    return int(result.data[0]["n"]) if result.data else 0
+
+
+async def pendientes(supabase) -> int:
+    result = await execute(supabase.rpc(COUNT_RPC, {}))
+    return _cantidad(result)
+
+
+async def migrar(batch_size: int, pause: float, dry_run: bool) -> None:
+    supabase = get_supabase_client()
+
+    restantes = await pendientes(supabase)
+    print(f"🔍 Solicitudes por convertir: {restantes}")
+    if dry_run or restantes == 0:
+        return
+
+    convertidas = 0
+    lotes = 0
+    started = time.perf_counter()
+    while True:
+        result = await execute(supabase.rpc(MIGRATE_RPC, {"tamano_lote": batch_size}))
+        lote = _cantidad(result)
+        if lote == 0:
+            break
+        lotes += 1
+        convertidas += lote
+        print(f"   Lote {lotes}: {lote} filas ({convertidas} en total)")
+        # Deja respirar a la base entre lotes
+        if pause:
+            await asyncio.sleep(pause)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {convertidas} solicitudes convertidas en {lotes} lotes ({elapsed:.1f}s)")
+
+    restantes = await pendientes(supabase)
+    if restantes:
+        print(f"⚠️ Quedan {restantes} filas bloqueadas por otras transacciones; vuelve a ejecutar el script")
+
+    report = await reconcile_rollups(supabase)
+    print(f"📊 Contadores reconstruidos ({report['drift_count']} diferencias corregidas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Filas por lote")
+    parser.add_argument("--pause", type=float, default=0.1, help="Segundos de espera entre lotes")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar las filas por convertir")
+    args = parser.parse_args()
+
+    asyncio.run(migrar(args.batch_size, args.pause, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
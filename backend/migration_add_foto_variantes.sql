@@ -0,0 +1,10 @@
+-- Migration: Add foto_variantes column to profesionales table
+-- Run this in your Supabase SQL editor
+
+-- Renditions generated on upload (see storage/images.py), e.g.
+-- {"width": 1200, "height": 1500, "placeholder": "data:image/webp;base64,...",
+--  "webp": {"320": "https://...", "640": "..."}, "avif": {"320": "...", ...}}
+ALTER TABLE profesionales 
+ADD COLUMN IF NOT EXISTS foto_variantes JSONB;
+
+COMMENT ON COLUMN profesionales.foto_variantes IS 'Variantes WebP/AVIF por ancho y placeholder de la foto del profesional';
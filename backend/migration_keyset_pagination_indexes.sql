@@ -0,0 +1,19 @@
+-- Migración: índices para paginación por cursor (keyset)
+-- Ejecutar este script en Supabase SQL Editor
+--
+-- Los listados del panel ordenan por (fecha DESC, id DESC) y (orden, nombre, id).
+-- Con estos índices, pedir la página siguiente con ?cursor=... cuesta lo mismo
+-- sin importar qué tan profunda sea la página.
+--
+-- Las claves del cursor no pueden ser NULL: un profesional con orden NULL (o
+-- una solicitud con fecha NULL) quedaría fuera de las comparaciones del
+-- cursor y cortaría la paginación, así que se rellenan y se declaran NOT NULL.
+
+UPDATE profesionales SET orden = 0 WHERE orden IS NULL;
+ALTER TABLE profesionales ALTER COLUMN orden SET DEFAULT 0, ALTER COLUMN orden SET NOT NULL;
+
+UPDATE solicitudes SET fecha = COALESCE(updated_at, NOW()) WHERE fecha IS NULL;
+ALTER TABLE solicitudes ALTER COLUMN fecha SET DEFAULT NOW(), ALTER COLUMN fecha SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_solicitudes_fecha_id ON solicitudes(fecha DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_profesionales_orden_nombre_id ON profesionales(orden, nombre, id);
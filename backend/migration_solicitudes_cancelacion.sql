@@ -0,0 +1,128 @@
+-- Migración: cancelación de solicitudes como estado indexado
+-- Ejecutar este script en Supabase SQL Editor (después de migration_solicitudes_stats_rollup.sql)
+--
+-- Antes, cancelar una solicitud agregaba la marca "[CANCELADA]" al inicio de
+-- comentarios, y las estadísticas tenían que buscarla en el texto de cada fila.
+-- Ahora la cancelación se guarda en estado = 'cancelada' más cancelled_at.
+-- Las filas antiguas se convierten por lotes con migrate_cancelaciones.py.
+
+-- Momento de la cancelación (NULL si la solicitud no está cancelada)
+ALTER TABLE solicitudes
+ADD COLUMN IF NOT EXISTS cancelled_at TIMESTAMP WITH TIME ZONE;
+
+COMMENT ON COLUMN solicitudes.cancelled_at IS 'Fecha y hora de la cancelación';
+
+-- Índice parcial: solo las canceladas, ordenadas por fecha de cancelación
+CREATE INDEX IF NOT EXISTS idx_solicitudes_cancelled_at
+    ON solicitudes(cancelled_at DESC)
+    WHERE cancelled_at IS NOT NULL;
+
+-- Filas que todavía necesitan conversión: sin estado, con la marca en
+-- comentarios, o canceladas sin cancelled_at
+CREATE OR REPLACE FUNCTION solicitud_requiere_migracion_cancelacion(
+    estado TEXT, comentarios TEXT, cancelled_at TIMESTAMP WITH TIME ZONE
+)
+RETURNS BOOLEAN
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT estado IS NULL
+        OR estado = ''
+        OR comentarios LIKE '%[CANCELADA]%'
+        OR (estado = 'cancelada' AND cancelled_at IS NULL);
+$$;
+
+-- Convierte un lote de filas antiguas y devuelve cuántas actualizó.
+-- Cada llamada es una transacción corta; SKIP LOCKED evita esperar a filas
+-- que el panel esté editando en ese momento.
+-- Las funciones de este script que llama el backend devuelven filas: PostgREST
+-- entrega un escalar (INTEGER, JSON) sin envolver en una lista y el cliente
+-- de Python lo rechaza. DROP primero porque cambia el tipo de retorno.
+DROP FUNCTION IF EXISTS migrate_legacy_cancelaciones(INTEGER);
+
+CREATE FUNCTION migrate_legacy_cancelaciones(tamano_lote INTEGER DEFAULT 500)
+RETURNS TABLE(n INTEGER)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    convertidas INTEGER;
+BEGIN
+    WITH lote AS (
+        SELECT id FROM solicitudes
+        WHERE solicitud_requiere_migracion_cancelacion(estado, comentarios, cancelled_at)
+        LIMIT GREATEST(tamano_lote, 1)
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE solicitudes s
+    SET
+        estado = CASE
+            WHEN s.comentarios LIKE '%[CANCELADA]%' OR s.estado = 'cancelada' THEN 'cancelada'
+            WHEN s.estado IS NULL OR s.estado = '' THEN 'pendiente'
+            ELSE s.estado
+        END,
+        cancelled_at = CASE
+            WHEN s.comentarios LIKE '%[CANCELADA]%' OR s.estado = 'cancelada'
+                THEN COALESCE(s.cancelled_at, s.updated_at, NOW())
+        END,
+        -- Quita la línea "[CANCELADA] ..." y deja los comentarios originales del cliente
+        comentarios = NULLIF(regexp_replace(s.comentarios, '\[CANCELADA\][^\n]*\n?', '', 'g'), '')
+    FROM lote
+    WHERE s.id = lote.id;
+
+    GET DIAGNOSTICS convertidas = ROW_COUNT;
+    RETURN QUERY SELECT convertidas;
+END;
+$$;
+
+-- Cantidad de filas pendientes de conversión (para --dry-run)
+DROP FUNCTION IF EXISTS count_legacy_cancelaciones();
+
+CREATE FUNCTION count_legacy_cancelaciones()
+RETURNS TABLE(n INTEGER)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COUNT(*)::INTEGER FROM solicitudes
+    WHERE solicitud_requiere_migracion_cancelacion(estado, comentarios, cancelled_at);
+$$;
+
+-- El estado efectivo pasa a ser la columna estado, sin mirar comentarios
+CREATE OR REPLACE FUNCTION solicitud_estado_efectivo(estado TEXT, comentarios TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN estado IN ('pendiente', 'confirmada', 'en_progreso', 'completada', 'cancelada') THEN estado
+        ELSE 'pendiente'
+    END;
+$$;
+
+-- Conteos por estado agrupando la columna indexada (index-only scan sobre idx_solicitudes_estado).
+-- Mismas filas (dimension, clave, cantidad) que migration_solicitudes_stats.sql
+DROP FUNCTION IF EXISTS get_solicitudes_stats(INTEGER);
+
+CREATE FUNCTION get_solicitudes_stats(meses INTEGER DEFAULT 12)
+RETURNS TABLE(dimension TEXT, clave TEXT, cantidad BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'total'::TEXT, 'total'::TEXT, COUNT(*)::BIGINT FROM solicitudes
+    UNION ALL
+    SELECT 'estado', solicitud_estado_efectivo(e.estado, NULL), SUM(e.cantidad)::BIGINT
+    FROM (SELECT s.estado, COUNT(*) AS cantidad FROM solicitudes s GROUP BY s.estado) e
+    GROUP BY 2
+    UNION ALL
+    SELECT 'tipo_servicio', COALESCE(s.tipo_servicio, 'otros'), COUNT(*)
+    FROM solicitudes s GROUP BY 2
+    UNION ALL
+    SELECT 'mes', to_char(s.fecha, 'YYYY-MM'), COUNT(*)
+    FROM solicitudes s
+    WHERE s.fecha >= date_trunc('month', NOW()) - make_interval(months => meses - 1)
+    GROUP BY 2;
+$$;
+
+COMMENT ON FUNCTION migrate_legacy_cancelaciones(INTEGER) IS 'Convierte por lotes las cancelaciones marcadas con [CANCELADA] en estado/cancelled_at';
+
+-- Paso final, cuando count_legacy_cancelaciones() devuelva 0:
+-- ALTER TABLE solicitudes ALTER COLUMN estado SET NOT NULL;
@@ -0,0 +1,50 @@
+-- Migración: detección de solicitudes duplicadas
+-- Ejecutar este script en Supabase SQL Editor
+--
+-- POST /api/solicitud llama a find_duplicate_solicitud() antes de insertar.
+-- Si en los últimos minutos ya llegó una solicitud del mismo tipo de servicio
+-- con el mismo email y teléfono, no crea otra. El endpoint es público, así
+-- que la función solo devuelve id, estado y fecha de la existente: nunca los
+-- datos personales de otra persona.
+-- Email sin distinguir mayúsculas; teléfono comparando solo los dígitos.
+
+-- Teléfono normalizado: solo dígitos ("+56 9 1234-5678" -> "56912345678")
+CREATE OR REPLACE FUNCTION solicitud_telefono_normalizado(telefono TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT regexp_replace(coalesce(telefono, ''), '[^0-9]', '', 'g');
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_solicitudes_dedupe_email
+    ON solicitudes(lower(email), tipo_servicio, fecha DESC);
+
+-- Con email Y teléfono basta el índice por email; el teléfono se compara en las pocas filas que encuentra
+DROP INDEX IF EXISTS idx_solicitudes_dedupe_telefono;
+
+-- Solicitud reciente equivalente (id, estado, fecha), o ninguna fila.
+-- DROP primero porque la versión anterior devolvía SETOF solicitudes.
+DROP FUNCTION IF EXISTS find_duplicate_solicitud(TEXT, TEXT, TEXT, INTEGER);
+
+CREATE FUNCTION find_duplicate_solicitud(
+    p_email TEXT,
+    p_telefono TEXT,
+    p_tipo_servicio TEXT,
+    p_minutos INTEGER DEFAULT 10
+)
+RETURNS TABLE(id UUID, estado TEXT, fecha TIMESTAMP WITH TIME ZONE)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT s.id, s.estado, s.fecha
+    FROM solicitudes s
+    WHERE s.tipo_servicio = p_tipo_servicio
+        AND s.fecha >= NOW() - make_interval(mins => p_minutos)
+        AND lower(s.email) = lower(p_email)
+        AND solicitud_telefono_normalizado(s.telefono) = solicitud_telefono_normalizado(p_telefono)
+    ORDER BY s.fecha DESC
+    LIMIT 1;
+$$;
+
+COMMENT ON FUNCTION find_duplicate_solicitud(TEXT, TEXT, TEXT, INTEGER) IS 'id, estado y fecha de una solicitud reciente con el mismo email, teléfono y tipo de servicio';
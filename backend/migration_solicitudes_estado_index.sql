@@ -0,0 +1,13 @@
+-- Migración: índice compuesto para filtrar solicitudes por estado
+-- Ejecutar este script en Supabase SQL Editor (después de migration_solicitudes_cancelacion.sql)
+--
+-- /api/admin/solicitudes?estado=... y la cola /api/admin/solicitudes-pendientes
+-- filtran por estado y ordenan por (fecha DESC, id DESC). Con este índice la
+-- base lee solo las filas de la página pedida, también al paginar con ?cursor=.
+
+CREATE INDEX IF NOT EXISTS idx_solicitudes_estado_fecha_id
+    ON solicitudes(estado, fecha DESC, id DESC);
+
+-- idx_solicitudes_estado queda cubierto por el nuevo índice (mismo primer campo).
+-- Una vez verificado con EXPLAIN que las consultas usan el compuesto:
+-- DROP INDEX IF EXISTS idx_solicitudes_estado;
@@ -0,0 +1,68 @@
+-- Migración: búsqueda de solicitudes en el servidor
+-- Ejecutar este script en Supabase SQL Editor
+--
+-- /api/admin/solicitudes/search llama a search_solicitudes() vía RPC. La
+-- búsqueda ignora mayúsculas y acentos ("maria" encuentra "María") y usa un
+-- índice de trigramas, así que no necesita recorrer toda la tabla.
+
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA extensions;
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+-- unaccent() no es IMMUTABLE; este wrapper fija el diccionario para poder indexarlo
+CREATE OR REPLACE FUNCTION f_unaccent(texto TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE STRICT
+AS $$
+    SELECT extensions.unaccent('extensions.unaccent'::regdictionary, texto);
+$$;
+
+-- Texto normalizado sobre el que se busca (nombre, email, teléfono y dirección)
+CREATE OR REPLACE FUNCTION solicitud_search_text(nombre TEXT, email TEXT, telefono TEXT, direccion TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT lower(f_unaccent(
+        coalesce(nombre, '') || ' ' || coalesce(email, '') || ' ' ||
+        coalesce(telefono, '') || ' ' || coalesce(direccion, '')
+    ));
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_solicitudes_search_trgm ON solicitudes
+    USING gin (solicitud_search_text(nombre, email, telefono, direccion) extensions.gin_trgm_ops);
+
+-- Búsqueda paginada ordenada por relevancia (similitud de trigramas) y luego por fecha
+CREATE OR REPLACE FUNCTION search_solicitudes(
+    termino TEXT,
+    filtro_estado TEXT DEFAULT NULL,
+    filtro_tipo_servicio TEXT DEFAULT NULL,
+    limite INTEGER DEFAULT 20,
+    desplazamiento INTEGER DEFAULT 0
+)
+RETURNS SETOF solicitudes
+LANGUAGE sql
+STABLE
+AS $$
+    WITH t AS (
+        SELECT
+            lower(f_unaccent(trim(termino))) AS normalizado,
+            replace(replace(replace(lower(f_unaccent(trim(termino))), '\', '\\'), '%', '\%'), '_', '\_') AS patron
+    )
+    SELECT s.*
+    FROM solicitudes s, t
+    WHERE (
+            solicitud_search_text(s.nombre, s.email, s.telefono, s.direccion) LIKE '%' || t.patron || '%'
+            OR t.normalizado OPERATOR(extensions.<%) solicitud_search_text(s.nombre, s.email, s.telefono, s.direccion)
+        )
+        AND (filtro_estado IS NULL OR s.estado = filtro_estado)
+        AND (filtro_tipo_servicio IS NULL OR s.tipo_servicio = filtro_tipo_servicio)
+    ORDER BY
+        extensions.word_similarity(t.normalizado, solicitud_search_text(s.nombre, s.email, s.telefono, s.direccion)) DESC,
+        s.fecha DESC,
+        s.id DESC
+    LIMIT LEAST(GREATEST(limite, 1), 100)
+    OFFSET GREATEST(desplazamiento, 0);
+$$;
+
+COMMENT ON FUNCTION search_solicitudes(TEXT, TEXT, TEXT, INTEGER, INTEGER) IS 'Búsqueda de solicitudes por nombre, email, teléfono y dirección, sin distinguir acentos';
@@ -0,0 +1,42 @@
+-- Migración: estadísticas agregadas de solicitudes en la base de datos
+-- Ejecutar este script en Supabase SQL Editor
+--
+-- /api/admin/estadisticas llama a esta función vía RPC y recibe solo los
+-- conteos agrupados, en lugar de descargar toda la tabla solicitudes.
+
+-- Devuelve filas (dimension, clave, cantidad), igual que solicitudes_stats_rollup:
+-- PostgREST entrega las funciones escalares (RETURNS JSON) como un objeto, que
+-- el cliente de Python rechaza porque espera una lista de filas.
+DROP FUNCTION IF EXISTS get_solicitudes_stats(INTEGER);
+
+CREATE FUNCTION get_solicitudes_stats(meses INTEGER DEFAULT 12)
+RETURNS TABLE(dimension TEXT, clave TEXT, cantidad BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH base AS (
+        SELECT
+            CASE
+                -- Solicitudes antiguas sin estado: se detecta la cancelación por comentarios
+                WHEN s.estado IS NULL OR s.estado = '' THEN
+                    CASE WHEN s.comentarios LIKE '%[CANCELADA]%' THEN 'cancelada' ELSE 'pendiente' END
+                WHEN s.estado IN ('pendiente', 'confirmada', 'en_progreso', 'completada', 'cancelada') THEN s.estado
+                ELSE 'pendiente'
+            END AS estado_efectivo,
+            COALESCE(s.tipo_servicio, 'otros') AS tipo_servicio,
+            s.fecha
+        FROM solicitudes s
+    )
+    SELECT 'total'::TEXT, 'total'::TEXT, COUNT(*)::BIGINT FROM base
+    UNION ALL
+    SELECT 'estado', estado_efectivo, COUNT(*) FROM base GROUP BY estado_efectivo
+    UNION ALL
+    SELECT 'tipo_servicio', tipo_servicio, COUNT(*) FROM base GROUP BY tipo_servicio
+    UNION ALL
+    SELECT 'mes', to_char(fecha, 'YYYY-MM'), COUNT(*)
+    FROM base
+    WHERE fecha >= date_trunc('month', NOW()) - make_interval(months => meses - 1)
+    GROUP BY to_char(fecha, 'YYYY-MM');
+$$;
+
+COMMENT ON FUNCTION get_solicitudes_stats(INTEGER) IS 'Conteos de solicitudes por estado, tipo de servicio y mes para el dashboard';
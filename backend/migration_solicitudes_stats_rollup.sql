@@ -0,0 +1,134 @@
+-- Migración: contadores incrementales para el dashboard de solicitudes
+-- Ejecutar este script en Supabase SQL Editor (después de migration_solicitudes_stats.sql)
+--
+-- Un trigger sobre solicitudes mantiene esta tabla en la misma transacción que
+-- cada INSERT/UPDATE/DELETE, así /api/admin/estadisticas lee unas pocas filas
+-- en vez de contar la tabla completa y los contadores no se desvían aunque
+-- varios admins escriban a la vez. rebuild_solicitudes_stats_rollup() la reconstruye
+-- desde cero e informa las diferencias encontradas.
+
+CREATE TABLE IF NOT EXISTS solicitudes_stats_rollup (
+    dimension TEXT NOT NULL CHECK (dimension IN ('total', 'estado', 'tipo_servicio', 'mes')),
+    clave TEXT NOT NULL,
+    cantidad BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (dimension, clave)
+);
+
+COMMENT ON TABLE solicitudes_stats_rollup IS 'Conteos de solicitudes mantenidos incrementalmente para el dashboard';
+
+-- Estado efectivo de una solicitud (las antiguas sin estado usan la marca [CANCELADA])
+CREATE OR REPLACE FUNCTION solicitud_estado_efectivo(estado TEXT, comentarios TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN estado IS NULL OR estado = '' THEN
+            CASE WHEN comentarios LIKE '%[CANCELADA]%' THEN 'cancelada' ELSE 'pendiente' END
+        WHEN estado IN ('pendiente', 'confirmada', 'en_progreso', 'completada', 'cancelada') THEN estado
+        ELSE 'pendiente'
+    END;
+$$;
+
+-- Claves (dimension, clave) a las que contribuye una solicitud
+CREATE OR REPLACE FUNCTION solicitud_stats_claves(estado TEXT, comentarios TEXT, tipo_servicio TEXT, fecha TIMESTAMPTZ)
+RETURNS TABLE(dimension TEXT, clave TEXT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'total', 'total'
+    UNION ALL
+    SELECT 'estado', solicitud_estado_efectivo(estado, comentarios)
+    UNION ALL
+    SELECT 'tipo_servicio', COALESCE(tipo_servicio, 'otros')
+    UNION ALL
+    SELECT 'mes', to_char(fecha, 'YYYY-MM') WHERE fecha IS NOT NULL;
+$$;
+
+-- Los deltas ahora los aplica el trigger, en la misma transacción que la escritura
+DROP FUNCTION IF EXISTS apply_solicitudes_stats_delta(JSON);
+
+-- Resta las claves de OLD y suma las de NEW; las que se cancelan no se escriben
+CREATE OR REPLACE FUNCTION solicitudes_stats_rollup_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO solicitudes_stats_rollup AS r (dimension, clave, cantidad)
+    SELECT d.dimension, d.clave, SUM(d.delta)
+    FROM (
+        SELECT c.dimension, c.clave, -1 AS delta
+        FROM solicitud_stats_claves(OLD.estado, OLD.comentarios, OLD.tipo_servicio, OLD.fecha) c
+        WHERE TG_OP IN ('UPDATE', 'DELETE')
+        UNION ALL
+        SELECT c.dimension, c.clave, 1
+        FROM solicitud_stats_claves(NEW.estado, NEW.comentarios, NEW.tipo_servicio, NEW.fecha) c
+        WHERE TG_OP IN ('INSERT', 'UPDATE')
+    ) d
+    GROUP BY d.dimension, d.clave
+    HAVING SUM(d.delta) <> 0
+    ON CONFLICT (dimension, clave)
+    DO UPDATE SET cantidad = r.cantidad + EXCLUDED.cantidad, updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS solicitudes_stats_rollup_insert_delete ON solicitudes;
+CREATE TRIGGER solicitudes_stats_rollup_insert_delete
+    AFTER INSERT OR DELETE ON solicitudes
+    FOR EACH ROW EXECUTE FUNCTION solicitudes_stats_rollup_trigger();
+
+-- Solo las columnas que cambian las claves; editar notas o datos de contacto no toca los contadores
+DROP TRIGGER IF EXISTS solicitudes_stats_rollup_update ON solicitudes;
+CREATE TRIGGER solicitudes_stats_rollup_update
+    AFTER UPDATE OF estado, comentarios, tipo_servicio, fecha ON solicitudes
+    FOR EACH ROW EXECUTE FUNCTION solicitudes_stats_rollup_trigger();
+
+-- Reconstruye los contadores desde cero y devuelve las diferencias encontradas
+CREATE OR REPLACE FUNCTION rebuild_solicitudes_stats_rollup()
+RETURNS JSON
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    drift JSON;
+BEGIN
+    -- Espera a las escrituras en curso: sus triggers ya habrán tocado el rollup
+    -- y el recuento de abajo las incluye
+    LOCK TABLE solicitudes_stats_rollup IN EXCLUSIVE MODE;
+
+    CREATE TEMP TABLE rollup_esperado ON COMMIT DROP AS
+        SELECT 'total'::TEXT AS dimension, 'total'::TEXT AS clave, COUNT(*)::BIGINT AS cantidad
+        FROM solicitudes
+        UNION ALL
+        SELECT 'estado', solicitud_estado_efectivo(estado, comentarios), COUNT(*)
+        FROM solicitudes GROUP BY 2
+        UNION ALL
+        SELECT 'tipo_servicio', COALESCE(tipo_servicio, 'otros'), COUNT(*)
+        FROM solicitudes GROUP BY 2
+        UNION ALL
+        SELECT 'mes', to_char(fecha, 'YYYY-MM'), COUNT(*)
+        FROM solicitudes WHERE fecha IS NOT NULL GROUP BY 2;
+
+    SELECT COALESCE(json_agg(json_build_object(
+        'dimension', COALESCE(e.dimension, r.dimension),
+        'clave', COALESCE(e.clave, r.clave),
+        'esperado', COALESCE(e.cantidad, 0),
+        'actual', COALESCE(r.cantidad, 0)
+    )), '[]'::json)
+    INTO drift
+    FROM rollup_esperado e
+    FULL OUTER JOIN solicitudes_stats_rollup r
+        ON r.dimension = e.dimension AND r.clave = e.clave
+    WHERE COALESCE(e.cantidad, 0) <> COALESCE(r.cantidad, 0);
+
+    DELETE FROM solicitudes_stats_rollup;
+    INSERT INTO solicitudes_stats_rollup (dimension, clave, cantidad)
+    SELECT dimension, clave, cantidad FROM rollup_esperado;
+
+    RETURN drift;
+END;
+$$;
+
+-- Carga inicial de los contadores
+SELECT rebuild_solicitudes_stats_rollup();
@@ -0,0 +1,143 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, List
+
+from pydantic_core import to_json
+
+from observability.tracing import span
+from .solicitud import SolicitudResponse
+
+# Marks a value that could not be parsed (cached like any other result)
+_INVALID = object()
+
+
+@lru_cache(maxsize=4096)
+def _parse_fecha_sugerida(value: str):
+    try:
+        return datetime.fromisoformat(value).date()
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_hora_sugerida(value: str):
+    try:
+        return datetime.strptime(value, "%H:%M:%S").time()
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_timestamp(value: str):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return _INVALID
+
+
+def _parse_column(rows: List[dict], column: str, parser) -> list:
+    """Parse one column of a batch, calling ``parser`` once per distinct value."""
+    parsed = {}
+    out = []
+    for row in rows:
+        value = row.get(column)
+        if not value:
+            out.append(None)
+            continue
+        if value not in parsed:
+            parsed[value] = parser(value)
+        out.append(parsed[value])
+    return out
+
+
+def _estado(row: dict) -> str:
+    # Rows written before the estado column existed have no value
+    return row.get("estado") or "pendiente"
+
+
+def solicitudes_from_rows(rows: Iterable[dict], trusted: bool = True) -> List[SolicitudResponse]:
+    """
+    Convierte filas de la tabla solicitudes en SolicitudResponse por lotes
+
+    Args:
+        rows: Filas tal como las devuelve PostgREST
+        trusted: Si es True, las filas vienen de la base de datos y se omite
+            la re-validación de Pydantic (los campos ya se parsearon aquí)
+
+    Returns:
+        Lista de SolicitudResponse en el mismo orden que ``rows``
+    """
+    rows = list(rows)
+    with span("convert.solicitudes", rows=len(rows)):
+        build = SolicitudResponse.model_construct if trusted else SolicitudResponse
+        return [build(**fields) for fields in _solicitud_fields(rows)]
+
+
+def solicitudes_json(rows: Iterable[dict]) -> bytes:
+    """
+    Serializa filas de la tabla solicitudes como una lista JSON de SolicitudResponse
+
+    Para los endpoints que devuelven la respuesta directamente: no construye
+    modelos (``model_construct`` cuesta más que serializar) ni deja que
+    FastAPI re-valide contra ``response_model``.
+
+    Args:
+        rows: Filas tal como las devuelve PostgREST
+
+    Returns:
+        Cuerpo JSON con el mismo contenido que ``solicitudes_from_rows``
+    """
+    rows = list(rows)
+    with span("convert.solicitudes", rows=len(rows)):
+        return to_json(_solicitud_fields(rows))
+
+
+def solicitud_json(row: dict) -> bytes:
+    """Serializa una fila de solicitudes como un objeto JSON de SolicitudResponse"""
+    with span("convert.solicitudes", rows=1):
+        return to_json(_solicitud_fields([row])[0])
+
+
+def _solicitud_fields(rows: List[dict]) -> List[dict]:
+    """Campos de SolicitudResponse (en su orden) ya parseados, una entrada por fila."""
+    fechas_sugeridas = _parse_column(rows, "fecha_sugerida", _parse_fecha_sugerida)
+    horas_sugeridas = _parse_column(rows, "hora_sugerida", _parse_hora_sugerida)
+    fechas = _parse_column(rows, "fecha", _parse_timestamp)
+    actualizaciones = _parse_column(rows, "updated_at", _parse_timestamp)
+    cancelaciones = _parse_column(rows, "cancelled_at", _parse_timestamp)
+
+    now = None
+    out = []
+    for i, row in enumerate(rows):
+        fecha_creacion = fechas[i]
+        if fecha_creacion is _INVALID:
+            now = now or datetime.now()
+            fecha_creacion = now
+        updated_at = actualizaciones[i]
+        if updated_at is _INVALID:
+            updated_at = None
+        cancelled_at = cancelaciones[i]
+        if cancelled_at is _INVALID:
+            cancelled_at = None
+
+        fields = dict(
+            nombre=row["nombre"],
+            telefono=row["telefono"],
+            email=row["email"],
+            direccion=row["direccion"],
+            tipo_servicio=row["tipo_servicio"],
+            comentarios=row.get("comentarios"),
+            estado=_estado(row),
+            fecha_sugerida=fechas_sugeridas[i],
+            hora_sugerida=horas_sugeridas[i],
+            id=row["id"],
+            created_at=fecha_creacion,
+            updated_at=updated_at,
+            cancelled_at=cancelled_at
+        )
+        if fecha_creacion is None:
+            # A missing creation date still goes through validation so it fails loudly
+            SolicitudResponse(**fields)
+        out.append(fields)
+
+    return out
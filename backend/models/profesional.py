@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import Any, Dict, Optional
 from datetime import datetime
 
 class ProfesionalBase(BaseModel):
@@ -53,6 +53,7 @@ class ProfesionalUpdate(BaseModel):
 class ProfesionalResponse(ProfesionalBase):
     id: str
     foto_url: Optional[str] = None
+    foto_variantes: Optional[Dict[str, Any]] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -61,7 +62,8 @@ class ProfesionalResponse(ProfesionalBase):
 
 class ProfesionalListResponse(BaseModel):
     profesionales: list[ProfesionalResponse]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 
@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, Union
+from typing import List, Optional, Union
 from datetime import datetime, time, date
 
+# Valores permitidos por el CHECK de la columna solicitudes.estado
+ESTADOS_SOLICITUD = ['pendiente', 'confirmada', 'en_progreso', 'completada', 'cancelada']
+
 class SolicitudBase(BaseModel):
     nombre: str = Field(..., min_length=2, max_length=100, description="Nombre completo del cliente")
     telefono: str = Field(..., min_length=8, max_length=20, description="Teléfono de contacto")
@@ -29,9 +32,8 @@ class SolicitudBase(BaseModel):
     def validate_estado(cls, v):
         if v is None:
             return v  # Permitir None ya que el campo no existe en la base de datos
-        allowed_states = ['pendiente', 'en_proceso', 'completada', 'cancelada']
-        if v not in allowed_states:
-            raise ValueError(f'Estado debe ser uno de: {", ".join(allowed_states)}')
+        if v not in ESTADOS_SOLICITUD:
+            raise ValueError(f'Estado debe ser uno de: {", ".join(ESTADOS_SOLICITUD)}')
         return v
 
     @validator('fecha_sugerida', pre=True)
@@ -75,6 +77,7 @@ class SolicitudUpdate(BaseModel):
     tipo_servicio: Optional[str] = Field(None, min_length=2, max_length=100)
     comentarios: Optional[str] = Field(None, max_length=500)
     estado: Optional[str] = None
+    comentarios_admin: Optional[str] = Field(None, max_length=1000)
     fecha_sugerida: Optional[Union[datetime, date, str]] = None
     hora_sugerida: Optional[Union[time, str]] = None
 
@@ -94,9 +97,8 @@ class SolicitudUpdate(BaseModel):
     def validate_estado(cls, v):
         if v is None:
             return v  # Permitir None ya que el campo no existe en la base de datos
-        allowed_states = ['pendiente', 'en_proceso', 'completada', 'cancelada']
-        if v not in allowed_states:
-            raise ValueError(f'Estado debe ser uno de: {", ".join(allowed_states)}')
+        if v not in ESTADOS_SOLICITUD:
+            raise ValueError(f'Estado debe ser uno de: {", ".join(ESTADOS_SOLICITUD)}')
         return v
 
     @validator('fecha_sugerida', pre=True)
@@ -127,11 +129,35 @@ class SolicitudUpdate(BaseModel):
                 raise ValueError('Formato de hora inválido. Use HH:MM')
         return v
 
+# Máximo de solicitudes por llamada a PATCH /api/admin/solicitudes/bulk
+SOLICITUDES_BULK_MAX = 200
+
+class SolicitudBulkUpdate(BaseModel):
+    """Model for updating the estado and/or admin comments of many solicitudes."""
+    ids: List[str] = Field(..., min_length=1, max_length=SOLICITUDES_BULK_MAX)
+    estado: Optional[str] = None
+    comentarios_admin: Optional[str] = Field(None, max_length=1000)
+
+    @validator('estado')
+    def validate_estado(cls, v):
+        if v is None:
+            return v
+        if v not in ESTADOS_SOLICITUD:
+            raise ValueError(f'Estado debe ser uno de: {", ".join(ESTADOS_SOLICITUD)}')
+        return v
+
+    @validator('comentarios_admin', always=True)
+    def validate_cambios(cls, v, values):
+        if v is None and values.get('estado') is None:
+            raise ValueError('Debe indicar un estado o comentarios_admin')
+        return v
+
 class SolicitudResponse(SolicitudBase):
     """Model for solicitud response."""
     id: str
     created_at: datetime
     updated_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
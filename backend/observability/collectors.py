@@ -0,0 +1,75 @@
+from typing import Iterable
+
+from auth.principal_cache import get_principal_cache_stats
+from database.batching import get_batching_stats
+from database.catalog_cache import public_catalog_cache
+from database.idempotency import solicitud_idempotency
+from database.repository import get_repository_stats
+from observability.metrics import Family, registry
+from ratelimit.middleware import get_rate_limit_stats
+from tasks.queue import job_queue
+
+
+def _cache_metrics() -> Iterable[Family]:
+    # The caches already count hits and misses for /health; expose the same numbers
+    caches = {
+        "principal": get_principal_cache_stats(),
+        "public_catalog": public_catalog_cache.stats(),
+        "solicitud_idempotency": solicitud_idempotency.stats(),
+    }
+    for name, help in (("hits", "Cache hits"), ("misses", "Cache misses")):
+        yield (f"cache_{name}_total", "counter", help,
+               [({"cache": cache}, stats[name]) for cache, stats in caches.items()])
+    yield ("cache_invalidations_total", "counter", "Explicit cache invalidations",
+           [({"cache": cache}, stats["invalidations"]) for cache, stats in caches.items() if "invalidations" in stats])
+    yield ("cache_entries", "gauge", "Entries currently cached", [
+        ({"cache": "principal"}, caches["principal"]["size"]),
+        ({"cache": "solicitud_idempotency"}, caches["solicitud_idempotency"]["keys"]),
+        ({"cache": "public_catalog"}, int(caches["public_catalog"]["cached"])),
+    ])
+
+
+def _database_metrics() -> Iterable[Family]:
+    stats = get_repository_stats()
+    yield ("db_calls_in_flight", "gauge", "Supabase calls holding a pool slot", [({}, stats["in_flight"])])
+    yield ("db_calls_waiting", "gauge", "Supabase calls waiting for a pool slot", [({}, stats["waiting"])])
+    yield ("db_max_concurrency", "gauge", "Supabase pool slots per worker", [({}, stats["max_concurrency"])])
+
+
+def _rate_limit_metrics() -> Iterable[Family]:
+    stats = get_rate_limit_stats()
+    samples = []
+    for key, count in stats["decisions"].items():
+        rule, decision = key.split(".", 1)
+        samples.append(({"rule": rule, "decision": decision}, count))
+    yield ("rate_limit_decisions_total", "counter", "Rate limiter and admission decisions", samples)
+    admission = stats.get("admission")
+    if admission:
+        yield ("admission_in_flight", "gauge", "Requests admitted and running", [({}, admission["in_flight"])])
+        yield ("admission_waiting", "gauge", "Requests queued for admission", [({}, admission["waiting"])])
+
+
+def _background_metrics() -> Iterable[Family]:
+    jobs = job_queue.stats()
+    yield ("jobs_total", "counter", "Background jobs by outcome", [
+        ({"outcome": outcome}, jobs[outcome]) for outcome in ("completed", "retried", "dead")
+    ])
+    yield ("jobs_workers_alive", "gauge", "Job queue workers running", [({}, jobs["workers"])])
+    yield ("jobs_worker_errors_total", "counter", "Job queue errors survived by the workers", [({}, jobs["loop_errors"])])
+    yield ("jobs_workers_crashed_total", "counter", "Job queue workers that exited unexpectedly",
+           [({}, jobs["crashed_workers"])])
+    batching = get_batching_stats()
+    if batching["enabled"]:
+        yield ("solicitud_insert_batches_total", "counter", "Multi-row solicitud INSERTs", [({}, batching["batches"])])
+        yield ("solicitud_insert_batched_rows_total", "counter", "Solicitudes written through the batcher",
+               [({}, batching["rows"])])
+        yield ("solicitud_insert_batch_errors_total", "counter", "Failed multi-row solicitud INSERTs", [
+            ({"outcome": "row_by_row"}, batching["fallbacks"]),
+            ({"outcome": "failed"}, batching["failures"]),
+        ])
+
+
+def register_collectors() -> None:
+    """Expose the counters the caches, limiter and job queue keep for /health."""
+    for collector in (_cache_metrics, _database_metrics, _rate_limit_metrics, _background_metrics):
+        registry.register_collector(collector)
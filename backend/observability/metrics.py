@@ -0,0 +1,240 @@
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition at GET /metrics, without extra dependencies.
+# Metrics are per worker and every series carries a ``worker`` label (the pid),
+# so each gunicorn worker's counters stay monotonic whichever one is scraped.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Optional bearer token required to read /metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Seconds: from a cached catalog read to a slow admin export
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes: up to the 5MB upload limit
+SIZE_BUCKETS = (16_384, 65_536, 262_144, 524_288, 1_048_576, 2_097_152, 5_242_880)
+
+LabelValues = Tuple[str, ...]
+# (name, kind, help, [(labels dict, value)]) produced by collectors at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: dict = {}
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter. Updated from the event loop only, so no locking."""
+
+    kind = "counter"
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self, extra: str) -> List[str]:
+        lines = self._header()
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels, extra)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: LabelValues = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram
+
+    ``observe`` is a bisect plus two additions; buckets are stored
+    non-cumulative and only accumulated when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            # per-bucket counts (+Inf last), sum
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def render(self, extra: str) -> List[str]:
+        lines = self._header()
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                bucket_labels = _format_labels(self.label_names, labels, f"{extra},{le}" if extra else le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            base = _format_labels(self.label_names, labels, extra)
+            lines.append(f"{self.name}_sum{base} {_format_value(total)}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Add a callback read at scrape time (for counters other modules already keep)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        # The pid is read here: gunicorn may fork after this module is imported
+        extra = f'worker="{os.getpid()}"'
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render(extra))
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"⚠️ Error al leer métricas de {getattr(collector, '__name__', collector)}: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(
+                        f"{name}{_format_labels(list(labels), list(labels.values()), extra)} {_format_value(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+))
+HTTP_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",)
+))
+DB_CALLS = registry.register(Counter(
+    "db_calls_total", "Supabase calls by table and operation", ("table", "operation", "outcome")
+))
+DB_DURATION = registry.register(Histogram(
+    "db_call_duration_seconds", "Supabase call latency, including the wait for a pool slot",
+    ("table", "operation"),
+))
+UPLOAD_SIZE = registry.register(Histogram(
+    "upload_size_bytes", "Size of accepted photo uploads", ("stage",), buckets=SIZE_BUCKETS
+))
+
+_DB_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def query_labels(query) -> LabelValues:
+    """(table, operation) of a PostgREST request builder, e.g. ``("solicitudes", "select")``."""
+    path = getattr(query, "path", "") or ""
+    if path.startswith("/rpc/"):
+        return path[5:], "rpc"
+    return path.lstrip("/") or "unknown", _DB_OPERATIONS.get(getattr(query, "http_method", ""), "unknown")
+
+
+def observe_db_call(labels: LabelValues, started: float, ok: bool) -> None:
+    if not METRICS_ENABLED:
+        return
+    DB_DURATION.observe(time.perf_counter() - started, labels)
+    DB_CALLS.inc(labels + ("ok" if ok else "error",))
+
+
+def observe_upload(stage: str, size: int) -> None:
+    if METRICS_ENABLED:
+        UPLOAD_SIZE.observe(size, (stage,))
+
+
+class MetricsMiddleware:
+    """
+    Per-route request counts, latency and in-flight requests
+
+    Pure ASGI. The route label is the matched template (``/api/admin/solicitudes/{solicitud_id}``),
+    read from ``scope["route"]`` after routing, so ids never create new series.
+    Requests that never reach a route (404s, rate-limited or shed requests)
+    are counted under ``unrouted``; the status label tells them apart.
+    """
+
+    def __init__(self, app, enabled: bool = METRICS_ENABLED):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec((method,))
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unrouted"
+            HTTP_DURATION.observe(elapsed, (method, path))
+            HTTP_REQUESTS.inc((method, path, str(status)))
+
+
+def render_metrics() -> Optional[str]:
+    """Exposition text for this worker, or None when metrics are disabled."""
+    if not METRICS_ENABLED:
+        return None
+    return registry.render()
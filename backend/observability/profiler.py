@@ -0,0 +1,193 @@
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+from anyio import to_thread
+
+# On-demand profiling of the worker that serves GET /api/admin/_profile (opt-in)
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MIN_INTERVAL_MS = 1.0
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this worker."""
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_BACKEND_DIR):
+        return os.path.relpath(filename, _BACKEND_DIR)
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    # The definition line (not the current one) keeps one node per function
+    label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+    return label.replace(";", ":")
+
+
+class StackSampler:
+    """
+    Statistical CPU sampler
+
+    Every ``interval`` seconds of CPU time a SIGPROF handler records the stack
+    of every thread: the event loop's exactly where it was interrupted, the
+    others via ``sys._current_frames()``. Nothing is hooked into the profiled
+    code, so the cost is one stack walk per thread per sample. Where SIGPROF
+    is unavailable (Windows, or not on the main thread) a sampling thread
+    takes the samples on wall-clock time instead; it can only observe the
+    event loop where it releases the GIL, so it is less precise.
+
+    The result is in Brendan Gregg's collapsed format (``frame;frame;frame count``),
+    ready for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.clock = "cpu" if _signals_available() else "wall"
+        self._labels: Dict[object, str] = {}
+
+    def _sample(self, skip: Optional[int] = None, main_frame=None) -> None:
+        # Runs inside the SIGPROF handler, on the main thread between two
+        # bytecodes: threading.enumerate() would take _active_limbo_lock, which
+        # the interrupted code may be holding (Thread.start), and deadlock.
+        # Copying the dict without the lock is atomic under the GIL.
+        names = {ident: thread.name for ident, thread in dict(threading._active).items()}
+        main = threading.main_thread().ident
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            if ident == main and main_frame is not None:
+                frame = main_frame
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}").replace(";", ":"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    async def run(self, seconds: float) -> None:
+        if self.clock == "wall":
+            await to_thread.run_sync(self._run_thread, seconds)
+            return
+        previous = signal.signal(signal.SIGPROF, lambda signum, frame: self._sample(main_frame=frame))
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous)
+
+    def _run_thread(self, seconds: float) -> None:
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self._sample(skip=own)
+            time.sleep(self.interval)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _signals_available() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _allocation_rows(stats: List[tracemalloc.StatisticDiff]) -> List[dict]:
+    rows = []
+    for stat in stats:
+        frame = stat.traceback[0]
+        rows.append({
+            "archivo": _short_path(frame.filename),
+            "linea": frame.lineno,
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        })
+    return rows
+
+
+class Profiler:
+    """One profile at a time per worker (sampling or allocation tracking)."""
+
+    def __init__(self):
+        self._running = False
+
+    def _start(self, seconds: float) -> None:
+        if self._running:
+            raise ProfilerBusy("Ya hay un perfil en curso en este worker")
+        if not 0 < seconds <= PROFILE_MAX_SECONDS:
+            raise ValueError(f"La duración debe estar entre 0 y {PROFILE_MAX_SECONDS:g} segundos")
+        self._running = True
+
+    async def sample_cpu(self, seconds: float, interval_ms: float) -> StackSampler:
+        """Sample every thread's stack for ``seconds`` without blocking the event loop."""
+        self._start(seconds)
+        try:
+            sampler = StackSampler(max(interval_ms, PROFILE_MIN_INTERVAL_MS) / 1000)
+            await sampler.run(seconds)
+            return sampler
+        finally:
+            self._running = False
+
+    async def allocations(self, seconds: float, top: int, group_by: str = "lineno") -> dict:
+        """
+        Diferencia de memoria asignada durante ``seconds`` (tracemalloc)
+
+        Args:
+            seconds: Ventana entre las dos instantáneas
+            top: Cantidad de líneas a devolver, ordenadas por crecimiento
+            group_by: ``lineno`` o ``filename``
+
+        Returns:
+            Totales de la ventana y las ``top`` líneas que más crecieron
+        """
+        self._start(seconds)
+        # Leave tracemalloc running if it was started outside (PYTHONTRACEMALLOC)
+        started_here = not tracemalloc.is_tracing()
+        try:
+            if started_here:
+                tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            await asyncio.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+            self._running = False
+
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        before = before.filter_traces(ignore)
+        after = after.filter_traces(ignore)
+        diff = after.compare_to(before, group_by)
+        return {
+            "pid": os.getpid(),
+            "segundos": seconds,
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "growth_kb": round(sum(stat.size_diff for stat in diff) / 1024, 1),
+            "top": _allocation_rows(diff[:top]),
+        }
+
+
+profiler: Optional[Profiler] = Profiler() if PROFILER_ENABLED else None
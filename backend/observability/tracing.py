@@ -0,0 +1,319 @@
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+# Opt-in request tracing. Each request becomes a trace whose spans cover auth,
+# every Supabase call, row conversion, the endpoint and response serialization.
+# Per-phase totals are returned in the Server-Timing header; whole traces are
+# appended to TRACE_EXPORT_PATH as OTLP/JSON (one ExportTraceServiceRequest per
+# line, the format of the OpenTelemetry Collector file exporter).
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+# Only export traces at least this slow (Server-Timing is sent for every sampled request)
+TRACE_EXPORT_MIN_MS = float(os.getenv("TRACE_EXPORT_MIN_MS", "0"))
+
+SERVICE_NAME = "enfermeria-api"
+
+_NOOP = nullcontext()
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class Trace:
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        # perf_counter() when the endpoint function returned; serialization starts there
+        self.endpoint_done: Optional[float] = None
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_parent: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_parent", default=None)
+
+
+class _SpanContext:
+    __slots__ = ("trace", "span", "token")
+
+    def __init__(self, trace: Trace, name: str, attributes: Dict[str, Any]):
+        parent = _parent.get()
+        self.trace = trace
+        self.span = Span(name, parent.span_id if parent else None, attributes)
+
+    def __enter__(self) -> Span:
+        self.token = _parent.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+        _parent.reset(self.token)
+        self.trace.spans.append(self.span)
+
+
+def span(name: str, **attributes):
+    """
+    Context manager timing one phase of the current request
+
+    A no-op outside a sampled request, so it can wrap hot paths. Spans nest:
+    a Supabase call inside ``auth.user_lookup`` becomes its child.
+    """
+    trace = _trace.get()
+    if trace is None:
+        return _NOOP
+    return _SpanContext(trace, name, attributes)
+
+
+def _attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp(trace: Trace) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for one trace."""
+    spans = []
+    for item in trace.spans:
+        entry = {
+            "traceId": trace.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            # SERVER for the request itself, INTERNAL for the phases
+            "kind": 2 if item.parent_id is None else 1,
+            "startTimeUnixNano": str(item.start_ns),
+            "endTimeUnixNano": str(item.end_ns),
+            "attributes": [_attribute(key, value) for key, value in item.attributes.items()],
+            "status": {"code": 2} if "error" in item.attributes else {},
+        }
+        if item.parent_id:
+            entry["parentSpanId"] = item.parent_id
+        spans.append(entry)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                _attribute("service.name", SERVICE_NAME),
+                _attribute("process.pid", os.getpid()),
+            ]},
+            "scopeSpans": [{"scope": {"name": "observability.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class FileSpanExporter:
+    """
+    Appends traces to a JSON Lines file from a background thread
+
+    The request path only enqueues the finished trace; encoding and the
+    write happen off the event loop. Each trace is written with a single
+    ``write`` so lines from several workers appending to the file don't interleave.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10_000):
+        self.path = path
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, trace: Trace) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as out:
+            while True:
+                trace = self._queue.get()
+                if trace is None:
+                    return
+                try:
+                    out.write(json.dumps(to_otlp(trace), separators=(",", ":")) + "\n")
+                    out.flush()
+                    self.exported += 1
+                except Exception as e:
+                    print(f"⚠️ Error al exportar traza: {e}")
+
+    def close(self, timeout: float = 5) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "pending": self._queue.qsize(), "exported": self.exported, "dropped": self.dropped}
+
+
+exporter = FileSpanExporter(TRACE_EXPORT_PATH)
+
+
+def server_timing(trace: Trace, total_ms: float) -> str:
+    """Server-Timing value: time per phase (span name without the table) plus the total."""
+    phases: Dict[str, List[float]] = {}
+    for item in trace.spans:
+        if item.parent_id is None:
+            continue
+        phase = item.name.split(" ", 1)[0]
+        totals = phases.setdefault(phase, [0.0, 0])
+        totals[0] += item.duration_ms
+        totals[1] += 1
+    entries = [
+        f'{phase};dur={duration:.1f}' + (f';desc="{count} calls"' if count > 1 else "")
+        for phase, (duration, count) in phases.items()
+    ]
+    entries.append(f"total;dur={total_ms:.1f}")
+    entries.append(f'trace;desc="{trace.trace_id}"')
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    """
+    Starts a trace per sampled request and adds the Server-Timing header
+
+    Pure ASGI, like the limiter and metrics middlewares. The root span is
+    named after the matched route template.
+    """
+
+    def __init__(self, app, enabled: bool = TRACING_ENABLED, sample_rate: float = TRACE_SAMPLE_RATE):
+        self.app = app
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        root = Span(scope["method"], None, {"http.method": scope["method"], "http.target": scope["path"]})
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", server_timing(trace, (time.perf_counter() - started) * 1000).encode())
+                ]
+            await send(message)
+
+        trace_token = _trace.set(trace)
+        parent_token = _parent.set(root)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except BaseException as e:
+            root.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            _parent.reset(parent_token)
+            _trace.reset(trace_token)
+            root.end_ns = time.time_ns()
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+                root.attributes["http.route"] = route.path
+            trace.spans.append(root)
+            if root.duration_ms >= TRACE_EXPORT_MIN_MS:
+                exporter.export(trace)
+
+
+def _traced_endpoint(endpoint):
+    # Marks when the endpoint returned so the route handler can time serialization
+    if getattr(endpoint, "__traced__", False):
+        # include_router() builds a second route around the already wrapped endpoint
+        return endpoint
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            with span("endpoint", function=endpoint.__name__):
+                result = await endpoint(*args, **kwargs)
+            trace = _trace.get()
+            if trace is not None:
+                trace.endpoint_done = time.perf_counter()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            # Sync endpoints run in the threadpool, which copies the request context
+            with span("endpoint", function=endpoint.__name__):
+                result = endpoint(*args, **kwargs)
+            trace = _trace.get()
+            if trace is not None:
+                trace.endpoint_done = time.perf_counter()
+            return result
+    wrapper.__traced__ = True
+    return wrapper
+
+
+class TracedRoute(APIRoute):
+    """
+    APIRoute that adds ``endpoint`` and ``serialize`` spans
+
+    ``serialize`` runs from the endpoint's return until the response is built:
+    response_model validation, jsonable_encoder and JSON rendering. Without
+    TRACING_ENABLED this is a plain APIRoute.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if TRACING_ENABLED:
+            endpoint = _traced_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not TRACING_ENABLED:
+            return handler
+
+        async def traced_handler(request):
+            response = await handler(request)
+            trace = _trace.get()
+            if trace is not None and trace.endpoint_done is not None:
+                parent = _parent.get()
+                serialize = Span("serialize", parent.span_id if parent else None, {})
+                serialize.start_ns = time.time_ns() - int((time.perf_counter() - trace.endpoint_done) * 1e9)
+                serialize.end_ns = time.time_ns()
+                trace.spans.append(serialize)
+            return response
+
+        return traced_handler
+
+
+def get_tracing_stats() -> dict:
+    """Exporter counters of this worker, or ``enabled: False``."""
+    if not TRACING_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, "sample_rate": TRACE_SAMPLE_RATE, **exporter.stats()}
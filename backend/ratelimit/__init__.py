@@ -0,0 +1 @@
+# Rate limiting and admission control package
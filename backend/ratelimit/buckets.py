@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import anyio
+from anyio import to_thread
+
+# Buckets idle for longer than this are forgotten (they would be full anyway)
+BUCKET_IDLE_SECONDS = 3600
+
+
+class RateRule:
+    """Token bucket: ``capacity`` requests of burst, refilled over ``period`` seconds."""
+
+    def __init__(self, name: str, capacity: int, period: float):
+        if capacity <= 0 or period <= 0:
+            raise ValueError(f"Límite inválido para {name}: {capacity}/{period}")
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.refill_per_second = capacity / period
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateRule":
+        """Parse ``"N/S"`` (N requests every S seconds)."""
+        try:
+            capacity, period = spec.split("/", 1)
+            return cls(name, int(capacity), float(period))
+        except ValueError:
+            raise ValueError(f"Límite inválido para {name}: '{spec}' (formato N/segundos)")
+
+
+def _refill(tokens: float, updated: float, now: float, rule: RateRule) -> float:
+    return min(rule.capacity, tokens + (now - updated) * rule.refill_per_second)
+
+
+def _decide(tokens: float, rule: RateRule) -> Tuple[bool, float, float]:
+    """Take one token if available. Returns (allowed, tokens left, retry_after)."""
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rule.refill_per_second
+
+
+class MemoryBucketStore:
+    """Per-worker buckets; with N workers a client effectively gets N times the limit."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def take(self, key: str, rule: RateRule) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(rule.capacity), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        allowed, tokens, retry_after = _decide(_refill(bucket[0], bucket[1], now, rule), rule)
+        bucket[0], bucket[1] = tokens, now
+        return allowed, tokens, retry_after
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "keys": len(self._buckets)}
+
+
+class SQLiteBucketStore:
+    """
+    Buckets shared by every worker on the host through a SQLite file
+
+    Same approach as the job queue journal: no extra service to run, and each
+    decision is one short IMMEDIATE transaction.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self._calls = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _take(self, key: str, rule: RateRule) -> Tuple[bool, float, float]:
+        # Wall clock: the timestamps are compared across processes
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = _refill(row[0], row[1], now, rule) if row else float(rule.capacity)
+                allowed, tokens, retry_after = _decide(tokens, rule)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+                self._calls += 1
+                if self._calls % 1000 == 0:
+                    conn.execute("DELETE FROM buckets WHERE updated < ?", (now - BUCKET_IDLE_SECONDS,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, tokens, retry_after
+
+    async def take(self, key: str, rule: RateRule) -> Tuple[bool, float, float]:
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(2)
+        return await to_thread.run_sync(self._take, key, rule, limiter=self._limiter)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        return {"backend": "sqlite", "path": self.path}
@@ -0,0 +1,245 @@
+import asyncio
+import ipaddress
+import json
+import math
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
+
+from database.repository import get_repository_stats
+from ratelimit.buckets import MemoryBucketStore, RateRule, SQLiteBucketStore
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# "memory" (per worker) or "sqlite" (shared by the workers on this host)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", "ratelimit.sqlite3")
+
+# Networks of the reverse proxies in front of the app (the hosting platform's
+# ingress). X-Forwarded-For hops from these addresses are skipped when looking
+# for the client IP; everything left of the first untrusted hop is ignored.
+RATE_LIMIT_TRUSTED_PROXIES = os.getenv(
+    "RATE_LIMIT_TRUSTED_PROXIES",
+    "127.0.0.0/8,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,100.64.0.0/10,::1/128,fc00::/7",
+)
+
+# Unauthenticated endpoints that reach the database, as "N/seconds" per client IP
+RATE_LIMIT_RULES: Dict[Tuple[str, str], RateRule] = {
+    ("POST", "/api/solicitud"): RateRule.parse(
+        "solicitud", os.getenv("RATE_LIMIT_SOLICITUD", "5/60")
+    ),
+    ("GET", "/api/profesionales/public/activos"): RateRule.parse(
+        "catalogo", os.getenv("RATE_LIMIT_CATALOGO", "120/60")
+    ),
+}
+
+# Admission control (per worker): requests beyond ADMISSION_MAX_CONCURRENCY
+# wait up to ADMISSION_QUEUE_TIMEOUT seconds in a queue of at most
+# ADMISSION_MAX_QUEUE; the rest are shed with 503 before touching the database.
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "64"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "128"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+# Shed public requests while this many Supabase calls are already queued
+ADMISSION_MAX_DB_WAITING = int(os.getenv("ADMISSION_MAX_DB_WAITING", "40"))
+
+# Never limited: probes, metrics scrapes and docs
+EXEMPT_PATHS = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(spec: str) -> List[Network]:
+    """Parse a comma-separated list of CIDRs (or single addresses)."""
+    try:
+        return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+    except ValueError as e:
+        raise ValueError(f"RATE_LIMIT_TRUSTED_PROXIES inválido: {e}")
+
+
+def _is_trusted(address: str, networks: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        # Not an IP (e.g. "unknown" or an obfuscated identifier): never a proxy we know
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(scope, trusted: List[Network]) -> str:
+    """
+    Client address of a request, for rate limiting
+
+    Starting from the socket peer, walks X-Forwarded-For from right to left
+    while the hop is a trusted proxy and returns the first address that is
+    not. Proxies append the address they received the request from, so the
+    entries a client writes itself end up to the left and are never reached.
+    """
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    if not _is_trusted(address, trusted):
+        return address
+
+    hops = []
+    for name, value in scope.get("headers") or []:
+        if name == b"x-forwarded-for":
+            hops.extend(hop.strip() for hop in value.decode("latin-1").split(","))
+    for hop in reversed([hop for hop in hops if hop]):
+        address = hop
+        if not _is_trusted(address, trusted):
+            break
+    return address
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, time-limited wait queue."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def acquire(self) -> Optional[str]:
+        """Returns None when admitted, or the reason the request was shed."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                return "queue_full"
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        return None
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket rate limiting per client IP and route, plus admission control
+
+    Pure ASGI middleware so streamed request bodies (photo uploads) pass
+    through untouched. Behind a reverse proxy, the client is the rightmost
+    X-Forwarded-For hop outside RATE_LIMIT_TRUSTED_PROXIES (see ``client_ip``).
+    """
+
+    def __init__(self, app, enabled: bool = RATE_LIMIT_ENABLED, backend: str = RATE_LIMIT_BACKEND,
+                 trusted_proxies: str = RATE_LIMIT_TRUSTED_PROXIES):
+        self.app = app
+        self.enabled = enabled
+        self.rules = RATE_LIMIT_RULES
+        self.trusted_proxies = parse_networks(trusted_proxies)
+        if backend == "sqlite":
+            self.store = SQLiteBucketStore(RATE_LIMIT_PATH)
+        elif backend == "memory":
+            self.store = MemoryBucketStore()
+        else:
+            raise ValueError(f"RATE_LIMIT_BACKEND inválido: '{backend}' (memory o sqlite)")
+        self.admission = AdmissionController(
+            ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT
+        )
+        # (rule or "admission", decision) -> count
+        self.decisions: Counter = Counter()
+        _registry.append(self)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {}
+        rule = self.rules.get((scope["method"], scope["path"]))
+        if rule is not None:
+            key = f"{rule.name}:{client_ip(scope, self.trusted_proxies)}"
+            try:
+                allowed, remaining, retry_after = await self.store.take(key, rule)
+            except Exception as e:
+                # Fail open: a broken limiter must not take the site down
+                print(f"⚠️ Rate limiter no disponible: {e}")
+                self.decisions[(rule.name, "error")] += 1
+            else:
+                headers = {
+                    "X-RateLimit-Limit": str(rule.capacity),
+                    "X-RateLimit-Remaining": str(int(remaining)),
+                }
+                if not allowed:
+                    self.decisions[(rule.name, "limited")] += 1
+                    await self._reject(send, 429, "Demasiadas solicitudes, intenta nuevamente más tarde",
+                                       retry_after, headers)
+                    return
+                self.decisions[(rule.name, "allowed")] += 1
+
+            # Public traffic is shed first when the database is already backed up
+            if get_repository_stats()["waiting"] >= ADMISSION_MAX_DB_WAITING:
+                self.decisions[("admission", "shed_db_saturated")] += 1
+                await self._reject(send, 503, "Servicio saturado, intenta nuevamente en unos segundos", 1, headers)
+                return
+
+        shed = await self.admission.acquire()
+        if shed is not None:
+            self.decisions[("admission", f"shed_{shed}")] += 1
+            await self._reject(send, 503, "Servicio saturado, intenta nuevamente en unos segundos", 1, headers)
+            return
+        self.decisions[("admission", "admitted")] += 1
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and headers:
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (name.lower().encode(), value.encode()) for name, value in headers.items()
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            self.admission.release()
+
+    async def _reject(self, send, status_code: int, detail: str, retry_after: float, headers: dict) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        response_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ] + [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        await send({"type": "http.response.start", "status": status_code, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "store": self.store.stats(),
+            "rules": {
+                rule.name: f"{rule.capacity}/{rule.period:g}s" for rule in self.rules.values()
+            },
+            "admission": {
+                "max_concurrency": self.admission.max_concurrency,
+                "in_flight": self.admission.in_flight,
+                "waiting": self.admission.waiting,
+            },
+            "decisions": {
+                f"{name}.{decision}": count for (name, decision), count in sorted(self.decisions.items())
+            },
+        }
+
+
+# Starlette builds the middleware stack lazily, so /health finds the instance here
+_registry = []
+
+
+def get_rate_limit_stats() -> dict:
+    """Limiter decisions and admission state of this worker."""
+    if not _registry:
+        return {"enabled": RATE_LIMIT_ENABLED, "decisions": {}}
+    return _registry[-1].stats()
@@ -17,7 +17,7 @@ CREATE TABLE profesionales (
     imagen_url TEXT, -- Columna legacy
     foto_url TEXT,   -- Nueva columna para Supabase Storage
     activo BOOLEAN DEFAULT true,
-    orden INTEGER DEFAULT 0 CHECK (orden >= 0),
+    orden INTEGER NOT NULL DEFAULT 0 CHECK (orden >= 0),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
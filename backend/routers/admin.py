@@ -1,126 +1,122 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
+from fastapi.responses import PlainTextResponse
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+import os
+import time
+import uuid
 from database.connection import get_supabase_client
-from models.solicitud import SolicitudResponse, SolicitudUpdate, SolicitudStats
+from database.repository import execute, run_sync
+from database.statistics import STATS_RPC, STATS_MONTHS, aggregate_counts, aggregate_rows, build_stats
+from database.rollups import read_rollup_aggregate, reconcile_rollups
+from database.catalog_cache import invalidate_public_catalog
+from database.pagination import (
+    LIST_MAX_LIMIT, SOLICITUDES_CURSOR_KEYS, PROFESIONALES_CURSOR_KEYS,
+    apply_solicitudes_cursor, apply_profesionales_cursor, count_option, next_cursor
+)
+from models.solicitud import ESTADOS_SOLICITUD, SolicitudResponse, SolicitudUpdate, SolicitudBulkUpdate, SolicitudStats
+from models.converters import solicitud_json, solicitudes_json
 from models.profesional import ProfesionalResponse, ProfesionalListResponse, ProfesionalCreate, ProfesionalUpdate
-from auth.middleware import get_manager_or_admin_user
+from auth.middleware import get_admin_user, get_manager_or_admin_user
+from observability.profiler import PROFILE_MAX_SECONDS, ProfilerBusy, profiler
+from observability.tracing import TracedRoute, span
+from storage.gc import GC_MIN_AGE_HOURS, collect_orphaned_photos
+from storage.photos import PROFESIONALES_BUCKET, extract_filename_from_url, photo_filenames_from_row
+from tasks.handlers import schedule_foto_variantes, schedule_storage_removal
+from tasks.queue import JOB_STATUSES, job_queue
 from supabase import Client
-import re
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
-def extract_filename_from_url(url: str) -> Optional[str]:
-    """
-    Extrae el nombre del archivo de una URL de Supabase Storage
-    
-    Args:
-        url: URL completa del archivo en Supabase Storage
-        
-    Returns:
-        Nombre del archivo o None si no se puede extraer
+# Tamaño máximo de página de la cola de pendientes
+PENDIENTES_MAX_LIMIT = 200
+
+def _solicitudes_response(rows: List[dict], cursor: Optional[str] = None) -> Response:
+    """JSON list of SolicitudResponse built straight from database rows.
+
+    A Response skips FastAPI's re-validation against ``response_model``,
+    which stays on the route for the OpenAPI schema.
     """
-    if not url or "supabase.co/storage" not in url:
-        return None
-    
-    try:
-        # Patrón para extraer el nombre del archivo de la URL
-        # https://project.supabase.co/storage/v1/object/public/profesionales-fotos/filename.jpg
-        pattern = r'/profesionales-fotos/([^/?]+)'
-        match = re.search(pattern, url)
-        
-        if match:
-            filename = match.group(1)
-            # Limpiar parámetros de query si existen
-            filename = filename.split("?")[0]
-            return filename
-        
-        return None
-    except Exception as e:
-        print(f"Error extrayendo filename de URL: {e}")
-        return None
+    headers = {"X-Next-Cursor": cursor} if cursor else None
+    return Response(content=solicitudes_json(rows), media_type="application/json", headers=headers)
 
 @router.get("/solicitudes", response_model=List[SolicitudResponse])
 async def get_all_solicitudes(
     estado: Optional[str] = Query(None, description="Filtrar por estado"),
     tipo_servicio: Optional[str] = Query(None, description="Filtrar por tipo de servicio"),
-    limit: int = Query(50, description="Número máximo de resultados"),
-    offset: int = Query(0, description="Número de resultados a omitir"),
+    limit: int = Query(50, ge=1, le=LIST_MAX_LIMIT, description="Número máximo de resultados"),
+    offset: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (reemplaza a offset)"),
     current_user: dict = Depends(get_manager_or_admin_user),
     supabase: Client = Depends(get_supabase_client)
 ):
-    """Get all solicitudes with optional filters."""
+    """Get all solicitudes with optional filters.
+    
+    The cursor for the next page is returned in the ``X-Next-Cursor`` header.
+    """
     try:
         query = supabase.table("solicitudes").select("*")
         
-        # Apply filters
-        # if estado:  # Campo estado no existe en la base de datos
-        #     query = query.eq("estado", estado)
+        # Apply filters (estado + fecha ordering use idx_solicitudes_estado_fecha_id)
+        if estado:
+            if estado not in ESTADOS_SOLICITUD:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Estado inválido. Valores permitidos: {', '.join(ESTADOS_SOLICITUD)}"
+                )
+            query = query.eq("estado", estado)
         if tipo_servicio:
             query = query.eq("tipo_servicio", tipo_servicio)
         
-        # Apply pagination and ordering
-        result = query.order("fecha", desc=True).range(offset, offset + limit - 1).execute()
+        # Apply ordering and pagination (keyset when a cursor is given)
+        try:
+            query = apply_solicitudes_cursor(query, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
-        solicitudes = []
-        for solicitud in result.data:
-            # Parse fecha_sugerida if it exists
-            fecha_sugerida = None
-            if solicitud.get("fecha_sugerida"):
-                try:
-                    fecha_sugerida = datetime.fromisoformat(solicitud["fecha_sugerida"]).date()
-                except:
-                    fecha_sugerida = None
-            
-            # Parse hora_sugerida if it exists
-            hora_sugerida = None
-            if solicitud.get("hora_sugerida"):
-                try:
-                    hora_sugerida = datetime.strptime(solicitud["hora_sugerida"], "%H:%M:%S").time()
-                except:
-                    hora_sugerida = None
-            
-            # Parse fecha (created_at)
-            fecha_creacion = None
-            if solicitud.get("fecha"):
-                try:
-                    fecha_creacion = datetime.fromisoformat(solicitud["fecha"].replace('Z', '+00:00'))
-                except:
-                    fecha_creacion = datetime.now()
-            
-            # Determine estado from database or comments
-            estado = solicitud.get("estado")
-            if estado is None or estado == "":
-                # If no estado field, check if it's cancelled by comments
-                comentarios = solicitud.get("comentarios", "")
-                if "[CANCELADA]" in comentarios:
-                    estado = "cancelada"
-                else:
-                    estado = "pendiente"
-            
-            solicitudes.append(SolicitudResponse(
-                id=solicitud["id"],
-                nombre=solicitud["nombre"],
-                telefono=solicitud["telefono"],
-                email=solicitud["email"],
-                direccion=solicitud["direccion"],
-                tipo_servicio=solicitud["tipo_servicio"],
-                fecha_sugerida=fecha_sugerida,
-                hora_sugerida=hora_sugerida,
-                comentarios=solicitud.get("comentarios"),
-                estado=estado,
-                created_at=fecha_creacion,
-                updated_at=solicitud.get("updated_at")
-            ))
-        
-        return solicitudes
+        query = query.limit(limit) if cursor else query.limit(limit).offset(offset)
+        result = await execute(query)
+        
+        cursor_siguiente = next_cursor(result.data, limit, SOLICITUDES_CURSOR_KEYS)
+        
+        return _solicitudes_response(result.data, cursor_siguiente)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener solicitudes: {str(e)}"
         )
 
+@router.get("/solicitudes/search", response_model=List[SolicitudResponse])
+async def search_solicitudes(
+    q: str = Query(..., min_length=2, max_length=100, description="Texto a buscar en nombre, email, teléfono y dirección"),
+    estado: Optional[str] = Query(None, description="Filtrar por estado"),
+    tipo_servicio: Optional[str] = Query(None, description="Filtrar por tipo de servicio"),
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de resultados"),
+    offset: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    current_user: dict = Depends(get_manager_or_admin_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Search solicitudes server-side, ranked by relevance and accent-insensitive."""
+    try:
+        result = await execute(supabase.rpc("search_solicitudes", {
+            "termino": q,
+            "filtro_estado": estado,
+            "filtro_tipo_servicio": tipo_servicio,
+            "limite": limit,
+            "desplazamiento": offset
+        }))
+        
+        return _solicitudes_response(result.data or [])
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al buscar solicitudes: {str(e)}"
+        )
+
 @router.get("/solicitudes/{solicitud_id}", response_model=SolicitudResponse)
 async def get_solicitud_by_id(
     solicitud_id: str,
@@ -129,7 +125,7 @@ async def get_solicitud_by_id(
 ):
     """Get a specific solicitud by ID."""
     try:
-        result = supabase.table("solicitudes").select("*").eq("id", solicitud_id).execute()
+        result = await execute(supabase.table("solicitudes").select("*").eq("id", solicitud_id))
         
         if not result.data:
             raise HTTPException(
@@ -137,56 +133,7 @@ async def get_solicitud_by_id(
                 detail="Solicitud no encontrada"
             )
         
-        solicitud = result.data[0]
-        
-        # Parse fecha_sugerida if it exists
-        fecha_sugerida = None
-        if solicitud.get("fecha_sugerida"):
-            try:
-                fecha_sugerida = datetime.fromisoformat(solicitud["fecha_sugerida"]).date()
-            except:
-                fecha_sugerida = None
-        
-        # Parse hora_sugerida if it exists
-        hora_sugerida = None
-        if solicitud.get("hora_sugerida"):
-            try:
-                hora_sugerida = datetime.strptime(solicitud["hora_sugerida"], "%H:%M:%S").time()
-            except:
-                hora_sugerida = None
-        
-        # Parse fecha (created_at)
-        fecha_creacion = None
-        if solicitud.get("fecha"):
-            try:
-                fecha_creacion = datetime.fromisoformat(solicitud["fecha"].replace('Z', '+00:00'))
-            except:
-                fecha_creacion = datetime.now()
-        
-        # Determine estado from database or comments
-        estado = solicitud.get("estado")
-        if estado is None or estado == "":
-            # If no estado field, check if it's cancelled by comments
-            comentarios = solicitud.get("comentarios", "")
-            if "[CANCELADA]" in comentarios:
-                estado = "cancelada"
-            else:
-                estado = "pendiente"
-        
-        return SolicitudResponse(
-            id=solicitud["id"],
-            nombre=solicitud["nombre"],
-            telefono=solicitud["telefono"],
-            email=solicitud["email"],
-            direccion=solicitud["direccion"],
-            tipo_servicio=solicitud["tipo_servicio"],
-            fecha_sugerida=fecha_sugerida,
-            hora_sugerida=hora_sugerida,
-            comentarios=solicitud.get("comentarios"),
-            estado=estado,
-            created_at=fecha_creacion,
-            updated_at=solicitud.get("updated_at")
-        )
+        return Response(content=solicitud_json(result.data[0]), media_type="application/json")
         
     except HTTPException:
         raise
@@ -196,6 +143,73 @@ async def get_solicitud_by_id(
             detail=f"Error al obtener solicitud: {str(e)}"
         )
 
+def _estado_update(estado: Optional[str], now: str) -> dict:
+    """Columns written when a solicitud moves to ``estado``."""
+    return {"estado": estado, "cancelled_at": now if estado == "cancelada" else None}
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+@router.patch("/solicitudes/bulk", response_model=dict)
+async def bulk_update_solicitudes(
+    bulk_update: SolicitudBulkUpdate,
+    current_user: dict = Depends(get_manager_or_admin_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Update estado and/or admin comments of many solicitudes at once.
+    
+    Writes all rows with one ``in_``-filtered UPDATE. Every id gets a
+    ``resultado``: ``updated``, ``not_found`` or ``invalid``.
+    """
+    try:
+        ids = list(dict.fromkeys(bulk_update.ids))
+        valid_ids = [solicitud_id for solicitud_id in ids if _is_uuid(solicitud_id)]
+        
+        now = datetime.utcnow().isoformat()
+        update_data = {"updated_at": now}
+        if bulk_update.estado is not None:
+            update_data.update(_estado_update(bulk_update.estado, now))
+        if bulk_update.comentarios_admin:
+            update_data["comentarios_admin"] = bulk_update.comentarios_admin
+        
+        updated_rows = {}
+        if valid_ids:
+            result = await execute(
+                supabase.table("solicitudes").update(update_data).in_("id", valid_ids)
+            )
+            updated_rows = {row["id"]: row for row in result.data or []}
+        
+        resultados = []
+        for solicitud_id in ids:
+            if solicitud_id in updated_rows:
+                resultado = "updated"
+            elif _is_uuid(solicitud_id):
+                resultado = "not_found"
+            else:
+                resultado = "invalid"
+            resultados.append({"id": solicitud_id, "resultado": resultado})
+        
+        return {
+            "success": True,
+            "message": f"{len(updated_rows)} de {len(ids)} solicitudes actualizadas",
+            "data": {
+                "updated": len(updated_rows),
+                "not_found": sum(1 for r in resultados if r["resultado"] == "not_found"),
+                "invalid": sum(1 for r in resultados if r["resultado"] == "invalid"),
+                "results": resultados
+            }
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al actualizar solicitudes: {str(e)}"
+        )
+
 @router.put("/solicitudes/{solicitud_id}", response_model=dict)
 async def update_solicitud_status(
     solicitud_id: str,
@@ -206,7 +220,7 @@ async def update_solicitud_status(
     """Update solicitud status and admin comments."""
     try:
         # Check if solicitud exists
-        existing = supabase.table("solicitudes").select("id").eq("id", solicitud_id).execute()
+        existing = await execute(supabase.table("solicitudes").select("id").eq("id", solicitud_id))
         if not existing.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -214,16 +228,17 @@ async def update_solicitud_status(
             )
         
         # Prepare update data
-        update_data = {
-            "estado": solicitud_update.estado,
-            "updated_at": datetime.utcnow().isoformat()
-        }
+        now = datetime.utcnow().isoformat()
+        update_data = {"updated_at": now}
+        # A comment-only update leaves estado and cancelled_at untouched
+        if solicitud_update.estado is not None:
+            update_data.update(_estado_update(solicitud_update.estado, now))
         
         if solicitud_update.comentarios_admin:
             update_data["comentarios_admin"] = solicitud_update.comentarios_admin
         
         # Update solicitud
-        result = supabase.table("solicitudes").update(update_data).eq("id", solicitud_id).execute()
+        result = await execute(supabase.table("solicitudes").update(update_data).eq("id", solicitud_id))
         
         if result.data:
             return {
@@ -252,73 +267,27 @@ async def get_statistics(
 ):
     """Get solicitudes statistics for dashboard."""
     try:
-        # Get all solicitudes
-        result = supabase.table("solicitudes").select("*").execute()
-        solicitudes = result.data
-        
-        # Calculate basic stats
-        total = len(solicitudes)
-        
-        # Count by status - check if estado field exists and has values
-        pendientes = 0
-        confirmadas = 0
-        en_progreso = 0
-        completadas = 0
-        canceladas = 0
-        
-        for solicitud in solicitudes:
-            estado = solicitud.get("estado")
-            if estado is None or estado == "":
-                # If no estado field or empty, check if it's cancelled by comments
-                comentarios = solicitud.get("comentarios", "")
-                if "[CANCELADA]" in comentarios:
-                    canceladas += 1
-                else:
-                    pendientes += 1
-            elif estado == "pendiente":
-                pendientes += 1
-            elif estado == "confirmada":
-                confirmadas += 1
-            elif estado == "en_progreso":
-                en_progreso += 1
-            elif estado == "completada":
-                completadas += 1
-            elif estado == "cancelada":
-                canceladas += 1
-            else:
-                # Unknown status, treat as pending
-                pendientes += 1
-        
-        # Calculate by service type
-        por_tipo_servicio = {}
-        for solicitud in solicitudes:
-            tipo = solicitud.get("tipo_servicio", "otros")
-            por_tipo_servicio[tipo] = por_tipo_servicio.get(tipo, 0) + 1
-        
-        # Calculate by month (last 12 months)
-        por_mes = {}
-        now = datetime.utcnow()
-        for i in range(12):
-            month_date = now - timedelta(days=30 * i)
-            month_key = month_date.strftime("%Y-%m")
-            por_mes[month_key] = 0
-        
-        for solicitud in solicitudes:
-            fecha = datetime.fromisoformat(solicitud["fecha"])
-            month_key = fecha.strftime("%Y-%m")
-            if month_key in por_mes:
-                por_mes[month_key] += 1
-        
-        return SolicitudStats(
-            total=total,
-            pendientes=pendientes,
-            confirmadas=confirmadas,
-            en_progreso=en_progreso,
-            completadas=completadas,
-            canceladas=canceladas,
-            por_tipo_servicio=por_tipo_servicio,
-            por_mes=por_mes
-        )
+        # Read the incrementally maintained counters
+        aggregate = None
+        try:
+            aggregate = await read_rollup_aggregate(supabase)
+        except Exception as e:
+            print(f"⚠️ Contadores de estadísticas no disponibles: {e}")
+        
+        # Otherwise aggregate in the database and only transfer the grouped counts
+        if aggregate is None:
+            try:
+                result = await execute(supabase.rpc(STATS_RPC, {"meses": STATS_MONTHS}))
+                aggregate = aggregate_counts(result.data)
+            except Exception as e:
+                print(f"⚠️ RPC {STATS_RPC} no disponible, calculando en Python: {e}")
+                result = await execute(supabase.table("solicitudes").select("estado, tipo_servicio, fecha"))
+                with span("convert.stats_rows", rows=len(result.data or [])):
+                    aggregate = aggregate_rows(result.data)
+        
+        with span("convert.stats"):
+            stats = build_stats(aggregate, datetime.utcnow())
+        return SolicitudStats(**stats)
         
     except Exception as e:
         raise HTTPException(
@@ -326,69 +295,53 @@ async def get_statistics(
             detail=f"Error al obtener estadísticas: {str(e)}"
         )
 
+@router.post("/estadisticas/reconcile")
+async def reconcile_statistics(
+    current_user: dict = Depends(get_manager_or_admin_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Rebuild the dashboard counters from scratch and report drift."""
+    try:
+        report = await reconcile_rollups(supabase)
+        return {
+            "success": True,
+            "message": f"Contadores reconstruidos ({report['drift_count']} diferencias)",
+            "data": report
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al reconstruir estadísticas: {str(e)}"
+        )
+
 @router.get("/solicitudes-pendientes", response_model=List[SolicitudResponse])
 async def get_pending_solicitudes(
+    limit: int = Query(50, ge=1, le=PENDIENTES_MAX_LIMIT, description="Número máximo de resultados"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
     current_user: dict = Depends(get_manager_or_admin_user),
     supabase: Client = Depends(get_supabase_client)
 ):
-    """Get all pending solicitudes."""
+    """Page through pending solicitudes, newest first.
+    
+    Served by the (estado, fecha DESC, id DESC) index; the cursor for the
+    next page is returned in the ``X-Next-Cursor`` header.
+    """
     try:
-        # Como no existe el campo estado, obtenemos todas las solicitudes
-        result = supabase.table("solicitudes").select("*").order("fecha", desc=True).execute()
-        
-        solicitudes = []
-        for solicitud in result.data:
-            # Parse fecha_sugerida if it exists
-            fecha_sugerida = None
-            if solicitud.get("fecha_sugerida"):
-                try:
-                    fecha_sugerida = datetime.fromisoformat(solicitud["fecha_sugerida"]).date()
-                except:
-                    fecha_sugerida = None
-            
-            # Parse hora_sugerida if it exists
-            hora_sugerida = None
-            if solicitud.get("hora_sugerida"):
-                try:
-                    hora_sugerida = datetime.strptime(solicitud["hora_sugerida"], "%H:%M:%S").time()
-                except:
-                    hora_sugerida = None
-            
-            # Parse fecha (created_at)
-            fecha_creacion = None
-            if solicitud.get("fecha"):
-                try:
-                    fecha_creacion = datetime.fromisoformat(solicitud["fecha"].replace('Z', '+00:00'))
-                except:
-                    fecha_creacion = datetime.now()
-            
-            # Determine estado from database or comments
-            estado = solicitud.get("estado")
-            if estado is None or estado == "":
-                # If no estado field, check if it's cancelled by comments
-                comentarios = solicitud.get("comentarios", "")
-                if "[CANCELADA]" in comentarios:
-                    estado = "cancelada"
-                else:
-                    estado = "pendiente"
-            
-            solicitudes.append(SolicitudResponse(
-                id=solicitud["id"],
-                nombre=solicitud["nombre"],
-                telefono=solicitud["telefono"],
-                email=solicitud["email"],
-                direccion=solicitud["direccion"],
-                tipo_servicio=solicitud["tipo_servicio"],
-                fecha_sugerida=fecha_sugerida,
-                hora_sugerida=hora_sugerida,
-                comentarios=solicitud.get("comentarios"),
-                estado=estado,
-                created_at=fecha_creacion,
-                updated_at=solicitud.get("updated_at")
-            ))
-        
-        return solicitudes
+        query = supabase.table("solicitudes").select("*").eq("estado", "pendiente")
+        try:
+            query = apply_solicitudes_cursor(query, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        result = await execute(query.limit(limit))
+        
+        cursor_siguiente = next_cursor(result.data, limit, SOLICITUDES_CURSOR_KEYS)
+        
+        return _solicitudes_response(result.data, cursor_siguiente)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -404,23 +357,24 @@ async def delete_solicitud(
     """Delete a solicitud (soft delete by changing status to cancelled)."""
     try:
         # Check if solicitud exists
-        existing = supabase.table("solicitudes").select("id").eq("id", solicitud_id).execute()
+        existing = await execute(supabase.table("solicitudes").select("id, estado").eq("id", solicitud_id))
         if not existing.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Solicitud no encontrada"
             )
         
-        # Soft delete by adding cancellation note to comments
-        existing_solicitud = supabase.table("solicitudes").select("comentarios").eq("id", solicitud_id).execute()
-        current_comments = existing_solicitud.data[0]["comentarios"] if existing_solicitud.data else ""
-        
-        cancellation_note = "[CANCELADA] Solicitud cancelada por el administrador"
-        new_comments = f"{cancellation_note}\n{current_comments}" if current_comments else cancellation_note
+        if existing.data[0].get("estado") == "cancelada":
+            return {
+                "success": True,
+                "message": "La solicitud ya estaba cancelada"
+            }
         
-        result = supabase.table("solicitudes").update({
-            "comentarios": new_comments
-        }).eq("id", solicitud_id).execute()
+        now = datetime.utcnow().isoformat()
+        result = await execute(supabase.table("solicitudes").update({
+            **_estado_update("cancelada", now),
+            "updated_at": now
+        }).eq("id", solicitud_id))
         
         if result.data:
             return {
@@ -441,19 +395,134 @@ async def delete_solicitud(
             detail=f"Error al cancelar solicitud: {str(e)}"
         )
 
+@router.get("/jobs")
+async def get_jobs(
+    estado: Optional[str] = Query("dead", description="Estado de los trabajos: pending, running o dead"),
+    limit: int = Query(50, ge=1, le=500, description="Número máximo de trabajos"),
+    current_user: dict = Depends(get_manager_or_admin_user)
+):
+    """Inspect the background job queue (dead-letter list by default)."""
+    if estado not in JOB_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Estado inválido. Valores permitidos: {', '.join(JOB_STATUSES)}"
+        )
+    try:
+        return {
+            "success": True,
+            "data": {
+                "counts": await job_queue.counts(),
+                "worker": job_queue.stats(),
+                "jobs": await job_queue.list_jobs(estado, limit)
+            }
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener trabajos: {str(e)}"
+        )
+
+@router.post("/jobs/{job_id}/retry")
+async def retry_job(
+    job_id: str,
+    current_user: dict = Depends(get_manager_or_admin_user)
+):
+    """Move a dead job back to the queue with a fresh attempt budget."""
+    if not await job_queue.retry(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo no encontrado en la lista de fallidos"
+        )
+    return {"success": True, "message": "Trabajo reencolado"}
+
+@router.post("/storage/gc")
+async def garbage_collect_photos(
+    dry_run: bool = Query(True, description="Solo informar los huérfanos, sin eliminarlos"),
+    min_age_hours: float = Query(GC_MIN_AGE_HOURS, ge=0, description="Antigüedad mínima de un archivo huérfano"),
+    current_user: dict = Depends(get_manager_or_admin_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Find (and unless dry_run, delete) photos no profesional references."""
+    try:
+        report = await collect_orphaned_photos(supabase, dry_run=dry_run, min_age_hours=min_age_hours)
+        action = "encontrados" if dry_run else "eliminados"
+        count = report["orphans"] if dry_run else report["deleted"]
+        return {
+            "success": not report["errors"],
+            "message": f"{count} archivos huérfanos {action}",
+            "data": report
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al limpiar fotos huérfanas: {str(e)}"
+        )
+
+@router.get("/_profile")
+async def profile_worker(
+    mode: str = Query("cpu", pattern="^(cpu|memory)$", description="cpu (muestreo de stacks) o memory (tracemalloc)"),
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS, description="Duración del perfil"),
+    interval_ms: float = Query(10, ge=1, le=1000, description="Intervalo de muestreo (modo cpu)"),
+    top: int = Query(25, ge=1, le=200, description="Líneas a devolver (modo memory)"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename)$", description="Agrupación (modo memory)"),
+    current_user: dict = Depends(get_admin_user)
+):
+    """
+    Perfila el worker que atiende esta request durante ``seconds`` segundos
+    
+    - ``cpu``: devuelve stacks colapsados (``frame;frame count``) para
+      flamegraph.pl o speedscope, muestreados cada ``interval_ms`` de CPU.
+    - ``memory``: diferencia de tracemalloc entre el inicio y el final,
+      con las ``top`` líneas que más memoria asignaron.
+    
+    Cada worker de gunicorn se perfila por separado; el pid va en ``X-Worker-Pid``.
+    """
+    if profiler is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiler deshabilitado")
+    
+    try:
+        if mode == "memory":
+            report = await profiler.allocations(seconds, top, group_by)
+            return {"success": True, "data": report}
+        
+        sampler = await profiler.sample_cpu(seconds, interval_ms)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    pid = os.getpid()
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{pid}-{int(time.time())}.collapsed"',
+            "X-Worker-Pid": str(pid),
+            "X-Profile-Samples": str(sampler.samples),
+            "X-Profile-Clock": sampler.clock,
+        }
+    )
+
 @router.get("/profesionales", response_model=ProfesionalListResponse)
 async def get_all_profesionales(
     activo: Optional[bool] = Query(None, description="Filtrar por estado activo"),
     especialidad: Optional[str] = Query(None, description="Filtrar por especialidad"),
-    limit: int = Query(50, description="Número máximo de resultados"),
-    offset: int = Query(0, description="Número de resultados a omitir"),
+    limit: int = Query(50, ge=1, le=LIST_MAX_LIMIT, description="Número máximo de resultados"),
+    offset: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (reemplaza a offset)"),
+    count: Optional[str] = Query(None, description="Modo de conteo del total: exact, planned, estimated o none"),
     current_user: dict = Depends(get_manager_or_admin_user),
     supabase: Client = Depends(get_supabase_client)
 ):
-    """Get all profesionales with optional filters."""
+    """Get all profesionales with optional filters.
+    
+    With a cursor, ``total`` counts the rows from the cursor onwards.
+    """
     try:
-        # Construir query base
-        query = supabase.table("profesionales").select("*")
+        # Construir query base (la página y el total en una sola request)
+        try:
+            query = supabase.table("profesionales").select("*", count=count_option(count))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         # Aplicar filtros
         if activo is not None:
@@ -462,34 +531,34 @@ async def get_all_profesionales(
         if especialidad:
             query = query.eq("especialidad", especialidad)
         
-        # Ordenar por orden y luego por nombre
-        query = query.order("orden", desc=False).order("nombre", desc=False)
+        # Ordenar por orden, nombre e id (keyset cuando se entrega un cursor)
+        try:
+            query = apply_profesionales_cursor(query, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         # Aplicar paginación
-        query = query.range(offset, offset + limit - 1)
+        query = query.limit(limit) if cursor else query.limit(limit).offset(offset)
         
-        result = query.execute()
+        result = await execute(query)
         
         if result.data is None:
             return ProfesionalListResponse(profesionales=[], total=0)
         
-        # Contar total para paginación
-        count_query = supabase.table("profesionales").select("*", count="exact")
-        if activo is not None:
-            count_query = count_query.eq("activo", activo)
-        if especialidad:
-            count_query = count_query.eq("especialidad", especialidad)
-        
-        count_result = count_query.execute()
-        total = count_result.count or 0
+        # El total viene en el Content-Range de la misma respuesta
+        total = result.count
         
-        profesionales = [ProfesionalResponse(**prof) for prof in result.data]
+        with span("convert.profesionales", rows=len(result.data)):
+            profesionales = [ProfesionalResponse(**prof) for prof in result.data]
         
         return ProfesionalListResponse(
             profesionales=profesionales,
-            total=total
+            total=total,
+            next_cursor=next_cursor(result.data, limit, PROFESIONALES_CURSOR_KEYS)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -510,9 +579,11 @@ async def create_profesional(
         # Verificar que no haya campos None que puedan causar problemas
         cleaned_data = {k: v for k, v in data_to_insert.items() if v is not None}
         
-        result = supabase.table("profesionales").insert(cleaned_data).execute()
+        result = await execute(supabase.table("profesionales").insert(cleaned_data))
         
         if result.data:
+            invalidate_public_catalog()
+            await schedule_foto_variantes(result.data[0])
             return ProfesionalResponse(**result.data[0])
         else:
             print(f"❌ No se devolvieron datos en la inserción")
@@ -544,6 +615,9 @@ async def update_profesional(
     try:
         # Filtrar campos None del update
         update_data = {k: v for k, v in profesional.model_dump().items() if v is not None}
+        # Una foto nueva sin variantes no debe quedar con las de la anterior
+        if "foto_url" in update_data and "foto_variantes" not in update_data:
+            update_data["foto_variantes"] = None
         
         if not update_data:
             raise HTTPException(
@@ -551,9 +625,11 @@ async def update_profesional(
                 detail="No hay datos para actualizar"
             )
         
-        result = supabase.table("profesionales").update(update_data).eq("id", profesional_id).execute()
+        result = await execute(supabase.table("profesionales").update(update_data).eq("id", profesional_id))
         
         if result.data:
+            invalidate_public_catalog()
+            await schedule_foto_variantes(result.data[0])
             return ProfesionalResponse(**result.data[0])
         else:
             raise HTTPException(
@@ -574,59 +650,32 @@ async def delete_profesional(
     current_user: dict = Depends(get_manager_or_admin_user),
     supabase: Client = Depends(get_supabase_client)
 ):
-    """Delete a profesional and their photo from storage."""
+    """Delete a profesional; their photo is removed from storage in the background."""
     try:
         print(f"🗑️ Eliminando profesional: {profesional_id}")
         
-        # Primero obtener los datos del profesional para acceder a la foto
-        profesional_data = supabase.table("profesionales").select("foto_url, nombre").eq("id", profesional_id).execute()
+        # El DELETE devuelve la fila eliminada, con foto_url y foto_variantes
+        result = await execute(supabase.table("profesionales").delete().eq("id", profesional_id))
         
-        if not profesional_data.data:
+        if not result.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profesional no encontrado"
             )
         
-        profesional = profesional_data.data[0]
-        foto_url = profesional.get("foto_url")
-        nombre = profesional.get("nombre", "profesional")
-        
-        print(f"📸 Foto URL del profesional: {foto_url}")
-        
-        # Eliminar la foto del storage si existe
-        if foto_url:
-            filename = extract_filename_from_url(foto_url)
-            
-            if filename:
-                try:
-                    print(f"📁 Eliminando archivo del storage: {filename}")
-                    
-                    # Eliminar archivo del storage
-                    storage_result = supabase.storage.from_("profesionales-fotos").remove([filename])
-                    
-                    if storage_result.get("error"):
-                        print(f"⚠️ Error al eliminar archivo del storage: {storage_result['error']}")
-                        # No fallar la eliminación del profesional si falla la eliminación del archivo
-                    else:
-                        print(f"✅ Archivo eliminado del storage: {filename}")
-                        
-                except Exception as e:
-                    print(f"⚠️ Error al eliminar archivo del storage: {str(e)}")
-                    # No fallar la eliminación del profesional si falla la eliminación del archivo
-            else:
-                print(f"⚠️ No se pudo extraer el nombre del archivo de la URL: {foto_url}")
+        profesional = result.data[0]
+        print(f"✅ Profesional eliminado: {profesional.get('nombre', 'profesional')}")
+        invalidate_public_catalog()
         
-        # Eliminar el profesional de la base de datos
-        result = supabase.table("profesionales").delete().eq("id", profesional_id).execute()
+        # La foto y sus variantes se borran del storage en la cola de trabajos
+        filenames = photo_filenames_from_row(profesional)
+        if filenames:
+            print(f"📁 Eliminación de archivos encolada: {filenames}")
+            await schedule_storage_removal(filenames)
+        elif profesional.get("foto_url"):
+            print(f"⚠️ No se pudo extraer el nombre del archivo de la URL: {profesional['foto_url']}")
         
-        if result.data:
-            print(f"✅ Profesional eliminado: {nombre}")
-            return {"success": True, "message": "Profesional eliminado exitosamente"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Profesional no encontrado"
-            )
+        return {"success": True, "message": "Profesional eliminado exitosamente"}
     except HTTPException:
         raise
     except Exception as e:
@@ -647,7 +696,7 @@ async def test_delete_profesional(
         print(f"🧪 Test de eliminación para profesional: {profesional_id}")
         
         # Obtener datos del profesional
-        profesional_data = supabase.table("profesionales").select("foto_url, nombre").eq("id", profesional_id).execute()
+        profesional_data = await execute(supabase.table("profesionales").select("foto_url, nombre").eq("id", profesional_id))
         
         if not profesional_data.data:
             return {"error": "Profesional no encontrado"}
@@ -672,12 +721,16 @@ async def test_delete_profesional(
             if filename:
                 # Probar operación de storage (sin eliminar realmente)
                 try:
-                    # Solo verificar que el archivo existe
-                    files = supabase.storage.from_("profesionales-fotos").list()
+                    # Solo verificar que el archivo existe (búsqueda por prefijo, no el bucket completo)
+                    files = await run_sync(
+                        supabase.storage.from_(PROFESIONALES_BUCKET).list,
+                        None,
+                        {"search": filename, "limit": 10}
+                    )
                     file_exists = any(f.get("name") == filename for f in files)
                     result["storage_operation"] = {
                         "file_exists": file_exists,
-                        "total_files_in_bucket": len(files)
+                        "matching_files": len(files)
                     }
                 except Exception as e:
                     result["storage_operation"] = {"error": str(e)}
@@ -695,7 +748,7 @@ async def get_profesional_by_id(
 ):
     """Get a profesional by ID."""
     try:
-        result = supabase.table("profesionales").select("*").eq("id", profesional_id).execute()
+        result = await execute(supabase.table("profesionales").select("*").eq("id", profesional_id))
         
         if not result.data:
             raise HTTPException(
@@ -720,7 +773,7 @@ async def test_profesionales_table(
     """Test endpoint to check if profesionales table exists and has data."""
     try:
         # Try to get all data from profesionales table
-        result = supabase.table("profesionales").select("*").limit(5).execute()
+        result = await execute(supabase.table("profesionales").select("*").limit(5))
         
         return {
             "success": True,
@@ -782,11 +835,11 @@ async def test_profesional_insert(
         cleaned_data = {k: v for k, v in data_to_insert.items() if v is not None}
         
         # Intentar insertar
-        result = supabase.table("profesionales").insert(cleaned_data).execute()
+        result = await execute(supabase.table("profesionales").insert(cleaned_data))
         
         if result.data:
             # Eliminar el registro de prueba
-            supabase.table("profesionales").delete().eq("id", result.data[0]["id"]).execute()
+            await execute(supabase.table("profesionales").delete().eq("id", result.data[0]["id"]))
             
             return {
                 "success": True,
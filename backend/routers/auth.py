@@ -1,14 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer
-from typing import Optional
 from pydantic import BaseModel
-from auth.jwt_handler import create_access_token, verify_token
+from auth.jwt_handler import create_access_token
 from auth.middleware import get_current_user
+from auth.principal_cache import invalidate_user
 from database.connection import get_supabase_client
+from database.repository import execute
 from supabase import Client
-from models.auth import UserLogin, TokenResponse
+from models.auth import TokenResponse
+from observability.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 security = HTTPBearer()
 
 class LoginRequest(BaseModel):
@@ -23,7 +25,7 @@ async def login(
     """Authenticate user and return access token."""
     try:
         # Verify user credentials with Supabase
-        result = supabase.table("users").select("*").eq("username", login_data.username).execute()
+        result = await execute(supabase.table("users").select("*").eq("username", login_data.username))
         
         if not result.data:
             raise HTTPException(
@@ -33,6 +35,9 @@ async def login(
         
         user = result.data[0]
         
+        # A fresh login always re-reads role/is_active from the database
+        invalidate_user(user["username"])
+        
         # In a real application, you would verify the password hash here
         # For now, we'll assume the password is correct if user exists
         # You should implement proper password hashing and verification
@@ -1,26 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
 from typing import List, Optional
 from database.connection import get_supabase_client
+from database.repository import execute
+from database.catalog_cache import public_catalog_cache, invalidate_public_catalog
+from storage.photos import photo_filenames_from_row
+from tasks.handlers import schedule_foto_variantes, schedule_storage_removal
+from database.pagination import LIST_MAX_LIMIT, PROFESIONALES_CURSOR_KEYS, apply_profesionales_cursor, count_option, next_cursor
 from models.profesional import ProfesionalCreate, ProfesionalUpdate, ProfesionalResponse, ProfesionalListResponse
 from auth.middleware import get_current_user
+from observability.tracing import TracedRoute
 import uuid
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.get("", response_model=ProfesionalListResponse)
 async def get_profesionales(
     activo: Optional[bool] = None,
     especialidad: Optional[str] = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=LIST_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    count: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Obtener lista de profesionales con filtros opcionales"""
+    """Obtener lista de profesionales con filtros opcionales
+    
+    ``count`` elige cómo se calcula ``total`` (exact, planned, estimated o none).
+    Con un cursor, ``total`` cuenta las filas desde el cursor en adelante.
+    """
     try:
         supabase = get_supabase_client()
         
-        # Construir query base
-        query = supabase.table("profesionales").select("*")
+        # Construir query base (la página y el total en una sola request)
+        try:
+            query = supabase.table("profesionales").select("*", count=count_option(count))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         # Aplicar filtros
         if activo is not None:
@@ -29,34 +45,33 @@ async def get_profesionales(
         if especialidad:
             query = query.eq("especialidad", especialidad)
         
-        # Ordenar por orden y luego por nombre
-        query = query.order("orden", desc=False).order("nombre", desc=False)
+        # Ordenar por orden, nombre e id (keyset cuando se entrega un cursor)
+        try:
+            query = apply_profesionales_cursor(query, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         # Aplicar paginación
-        query = query.range(offset, offset + limit - 1)
+        query = query.limit(limit) if cursor else query.limit(limit).offset(offset)
         
-        result = query.execute()
+        result = await execute(query)
         
         if result.data is None:
             return ProfesionalListResponse(profesionales=[], total=0)
         
-        # Contar total para paginación
-        count_query = supabase.table("profesionales").select("*", count="exact")
-        if activo is not None:
-            count_query = count_query.eq("activo", activo)
-        if especialidad:
-            count_query = count_query.eq("especialidad", especialidad)
-        
-        count_result = count_query.execute()
-        total = count_result.count or 0
+        # El total viene en el Content-Range de la misma respuesta
+        total = result.count
         
         profesionales = [ProfesionalResponse(**prof) for prof in result.data]
         
         return ProfesionalListResponse(
             profesionales=profesionales,
-            total=total
+            total=total,
+            next_cursor=next_cursor(result.data, limit, PROFESIONALES_CURSOR_KEYS)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting profesionales: {e}")
         raise HTTPException(
@@ -70,7 +85,7 @@ async def get_profesional(profesional_id: str):
     try:
         supabase = get_supabase_client()
         
-        result = supabase.table("profesionales").select("*").eq("id", profesional_id).execute()
+        result = await execute(supabase.table("profesionales").select("*").eq("id", profesional_id))
         
         if not result.data:
             raise HTTPException(
@@ -109,7 +124,7 @@ async def create_profesional(
         profesional_data = profesional.dict()
         profesional_data["id"] = str(uuid.uuid4())
         
-        result = supabase.table("profesionales").insert(profesional_data).execute()
+        result = await execute(supabase.table("profesionales").insert(profesional_data))
         
         if not result.data:
             raise HTTPException(
@@ -117,6 +132,8 @@ async def create_profesional(
                 detail="Error al crear profesional"
             )
         
+        invalidate_public_catalog()
+        await schedule_foto_variantes(result.data[0])
         return ProfesionalResponse(**result.data[0])
         
     except HTTPException:
@@ -146,7 +163,7 @@ async def update_profesional(
             )
         
         # Verificar que el profesional existe
-        existing = supabase.table("profesionales").select("*").eq("id", profesional_id).execute()
+        existing = await execute(supabase.table("profesionales").select("*").eq("id", profesional_id))
         if not existing.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -155,6 +172,9 @@ async def update_profesional(
         
         # Preparar datos para actualización (solo campos no nulos)
         update_data = {k: v for k, v in profesional.dict().items() if v is not None}
+        # Una foto nueva sin variantes no debe quedar con las de la anterior
+        if "foto_url" in update_data and "foto_variantes" not in update_data:
+            update_data["foto_variantes"] = None
         
         if not update_data:
             raise HTTPException(
@@ -162,7 +182,7 @@ async def update_profesional(
                 detail="No hay datos para actualizar"
             )
         
-        result = supabase.table("profesionales").update(update_data).eq("id", profesional_id).execute()
+        result = await execute(supabase.table("profesionales").update(update_data).eq("id", profesional_id))
         
         if not result.data:
             raise HTTPException(
@@ -170,6 +190,8 @@ async def update_profesional(
                 detail="Error al actualizar profesional"
             )
         
+        invalidate_public_catalog()
+        await schedule_foto_variantes(result.data[0])
         return ProfesionalResponse(**result.data[0])
         
     except HTTPException:
@@ -198,7 +220,7 @@ async def delete_profesional(
             )
         
         # Verificar que el profesional existe
-        existing = supabase.table("profesionales").select("*").eq("id", profesional_id).execute()
+        existing = await execute(supabase.table("profesionales").select("*").eq("id", profesional_id))
         if not existing.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -206,7 +228,7 @@ async def delete_profesional(
             )
         
         # Eliminar profesional
-        result = supabase.table("profesionales").delete().eq("id", profesional_id).execute()
+        result = await execute(supabase.table("profesionales").delete().eq("id", profesional_id))
         
         if not result.data:
             raise HTTPException(
@@ -214,6 +236,8 @@ async def delete_profesional(
                 detail="Error al eliminar profesional"
             )
         
+        invalidate_public_catalog()
+        await schedule_storage_removal(photo_filenames_from_row(result.data[0]))
         return {"message": "Profesional eliminado exitosamente"}
         
     except HTTPException:
@@ -225,20 +249,32 @@ async def delete_profesional(
             detail="Error al eliminar profesional"
         )
 
+_profesionales_adapter = TypeAdapter(List[ProfesionalResponse])
+
+async def _load_profesionales_activos() -> bytes:
+    """Consulta y serializa los profesionales activos para la caché pública"""
+    supabase = get_supabase_client()
+    
+    result = await execute(supabase.table("profesionales").select("*").eq("activo", True).order("orden", desc=False).order("nombre", desc=False))
+    
+    profesionales = [ProfesionalResponse(**prof) for prof in result.data or []]
+    
+    return _profesionales_adapter.dump_json(profesionales)
+
 @router.get("/public/activos", response_model=List[ProfesionalResponse])
-async def get_profesionales_activos():
-    """Obtener solo profesionales activos para mostrar en la página pública"""
+async def get_profesionales_activos(request: Request):
+    """Obtener solo profesionales activos para mostrar en la página pública
+    
+    La respuesta serializada se guarda en caché con un ETag fuerte; si el
+    navegador envía un If-None-Match que coincide se responde 304 sin cuerpo.
+    """
     try:
-        supabase = get_supabase_client()
-        
-        result = supabase.table("profesionales").select("*").eq("activo", True).order("orden", desc=False).order("nombre", desc=False).execute()
+        cached = await public_catalog_cache.get(_load_profesionales_activos)
         
-        if result.data is None:
-            return []
-        
-        profesionales = [ProfesionalResponse(**prof) for prof in result.data]
+        if cached.matches(request.headers.get("if-none-match")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cached.headers)
         
-        return profesionales
+        return Response(content=cached.body, media_type="application/json", headers=cached.headers)
         
     except Exception as e:
         print(f"Error getting active profesionales: {e}")
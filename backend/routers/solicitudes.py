@@ -1,19 +1,70 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Response, status
 from fastapi.exceptions import RequestValidationError
-from typing import List
+from typing import List, Optional
+from database.batching import solicitud_batcher
 from database.connection import get_supabase_client
+from database.duplicates import find_recent_duplicate
+from database.idempotency import (
+    IDEMPOTENCY_KEY_MAX_LENGTH, IdempotencyConflict, request_fingerprint, solicitud_idempotency
+)
+from database.repository import execute
 from models.solicitud import SolicitudCreate, SolicitudResponse
+from observability.tracing import TracedRoute
 from supabase import Client
 import logging
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
+
+async def _insertar_solicitud(supabase: Client, solicitud_data: dict) -> dict:
+    """Insert a solicitud unless an equivalent one arrived in the last minutes."""
+    duplicada = await find_recent_duplicate(supabase, solicitud_data)
+    if duplicada:
+        logging.info(f"Duplicate solicitud detected, returning {duplicada['id']}")
+        # Public endpoint: echo the caller's own data, never the stored row
+        return {
+            "success": True,
+            "message": "Solicitud creada exitosamente",
+            "data": {**solicitud_data, **duplicada},
+            "duplicada": True
+        }
+    
+    if solicitud_batcher is not None:
+        # Write-behind: coalesced with other submissions into one INSERT
+        return {
+            "success": True,
+            "message": "Solicitud creada exitosamente",
+            "data": await solicitud_batcher.insert(supabase, solicitud_data)
+        }
+    
+    result = await execute(supabase.table("solicitudes").insert(solicitud_data))
+    
+    if result.data:
+        return {
+            "success": True,
+            "message": "Solicitud creada exitosamente",
+            "data": result.data[0]
+        }
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="No se pudo crear la solicitud"
+        )
 
 @router.post("/solicitud", response_model=dict)
 async def crear_solicitud(
     solicitud: SolicitudCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH,
+        description="Clave única por envío del formulario; los reintentos con la misma clave no crean otra solicitud"
+    ),
     supabase: Client = Depends(get_supabase_client)
 ):
-    """Create a new solicitud."""
+    """Create a new solicitud.
+    
+    Retries sent with the same ``Idempotency-Key`` get the original response
+    (marked with ``Idempotent-Replayed: true``) without writing again.
+    """
     try:
         # Log the received data for debugging
         logging.info(f"Received solicitud data: {solicitud.dict()}")
@@ -43,19 +94,23 @@ async def crear_solicitud(
         
         logging.info(f"Prepared data for insertion: {solicitud_data}")
         
-        result = supabase.table("solicitudes").insert(solicitud_data).execute()
+        if not idempotency_key:
+            return await _insertar_solicitud(supabase, solicitud_data)
         
-        if result.data:
-            return {
-                "success": True,
-                "message": "Solicitud creada exitosamente",
-                "data": result.data[0]
-            }
-        else:
+        try:
+            resultado, replayed = await solicitud_idempotency.run(
+                idempotency_key,
+                request_fingerprint(solicitud_data),
+                lambda: _insertar_solicitud(supabase, solicitud_data)
+            )
+        except IdempotencyConflict:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="No se pudo crear la solicitud"
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="La Idempotency-Key ya se usó con otros datos"
             )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return resultado
     except RequestValidationError as e:
         logging.error(f"Validation error: {e}")
         raise HTTPException(
@@ -77,7 +132,7 @@ async def listar_solicitudes(
 ):
     """Get all solicitudes."""
     try:
-        result = supabase.table("solicitudes").select("*").order("fecha", desc=True).execute()
+        result = await execute(supabase.table("solicitudes").select("*").order("fecha", desc=True))
         
         return {
             "success": True,
@@ -1,95 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
 from fastapi.responses import JSONResponse
-from supabase import create_client, Client
+from supabase import Client
+from database.connection import get_supabase_client
+from database.repository import run_sync
+from observability.metrics import observe_upload
+from observability.tracing import TracedRoute
+from storage.streaming import UploadError, receive_image_upload
+from storage.images import ImageProcessingError, run_in_image_pool, sanitize_image, variants_available
 import os
+import tempfile
 import uuid
 from datetime import datetime
 from typing import Optional
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
-# Configuración de Supabase
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    raise ValueError("SUPABASE_URL y SUPABASE_SERVICE_KEY deben estar configurados")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
-# Configuración de archivos permitidos
-ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+# Configuración de archivos permitidos (JPG, PNG y WebP, detectados por magic bytes)
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
-def validate_image_file(file: UploadFile) -> None:
-    """Valida que el archivo sea una imagen válida"""
-    # Verificar extensión
-    file_extension = os.path.splitext(file.filename.lower())[1]
-    if file_extension not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Tipo de archivo no permitido. Extensiones permitidas: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-    
-    # Verificar tamaño (se verificará después de leer el archivo)
-    if hasattr(file, 'size') and file.size and file.size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Archivo muy grande. Tamaño máximo permitido: {MAX_FILE_SIZE // (1024*1024)}MB"
-        )
-
-def generate_unique_filename(original_filename: str) -> str:
+def generate_unique_filename(original_filename: str, extension: Optional[str] = None) -> str:
     """Genera un nombre de archivo único"""
-    file_extension = os.path.splitext(original_filename)[1]
+    file_extension = extension or os.path.splitext(original_filename)[1]
     unique_id = str(uuid.uuid4())
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     return f"profesional_{timestamp}_{unique_id}{file_extension}"
 
-@router.post("/upload/profesional-foto")
+@router.post(
+    "/upload/profesional-foto",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
 async def upload_profesional_foto(
-    file: UploadFile = File(...)
+    request: Request,
+    supabase: Client = Depends(get_supabase_client)
 ):
     """
     Sube una foto de profesional a Supabase Storage
     
+    El cuerpo se lee en streaming hacia un archivo temporal: el límite de
+    tamaño se aplica durante la lectura y el tipo de imagen se valida por su
+    contenido. La subida a Storage se hace desde ese archivo, por partes.
+    
+    Si Pillow está disponible, un proceso aparte quita los metadatos EXIF
+    antes de guardar la foto. Las variantes WebP/AVIF se generan en segundo
+    plano cuando un profesional pasa a usar esta foto (ver tasks.handlers).
+    
     Args:
-        file: Archivo de imagen a subir
+        request: Formulario multipart con el campo ``file``
         
     Returns:
         JSON con la URL pública de la imagen subida
     """
     try:
-        # Validar archivo
-        validate_image_file(file)
-        
-        # Leer contenido del archivo
-        content = await file.read()
-        
-        # Verificar que el contenido sea bytes
-        if not isinstance(content, bytes):
-            print(f"❌ Error: El contenido no es bytes, es {type(content)}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Error al leer el archivo: contenido no válido"
-            )
+        upload = await receive_image_upload(request, "file", MAX_FILE_SIZE)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    observe_upload("received", upload.size)
+    
+    sanitized = None
+    try:
+        # Generar nombre único con la extensión del tipo detectado
+        filename = generate_unique_filename(upload.filename, upload.extension)
         
-        # Verificar tamaño después de leer
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Archivo muy grande. Tamaño máximo permitido: {MAX_FILE_SIZE // (1024*1024)}MB"
-            )
+        # Quitar metadatos fuera del proceso de la API
+        sanitized_ok = False
+        if variants_available():
+            sanitized = tempfile.NamedTemporaryFile(prefix="sanitized_", suffix=upload.extension)
+            try:
+                await run_in_image_pool(sanitize_image, upload.path, sanitized.name, upload.content_type)
+                sanitized_ok = True
+            except ImageProcessingError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="La imagen está dañada o no se puede procesar"
+                )
+            except Exception as e:
+                print(f"⚠️ Error al procesar imagen, se sube el original: {str(e)}")
         
-        # Generar nombre único
-        filename = generate_unique_filename(file.filename)
         # Subir a Supabase Storage
+        reader = open(sanitized.name, "rb") if sanitized_ok else upload.open_reader()
+        size = os.fstat(reader.fileno()).st_size
         try:
             # Intentar subir el archivo
-            result = supabase.storage.from_("profesionales-fotos").upload(
+            result = await run_sync(
+                supabase.storage.from_("profesionales-fotos").upload,
                 filename,
-                content,
+                reader,
                 file_options={
-                    "content-type": file.content_type,
+                    "content-type": upload.content_type,
                     "cache-control": "3600"
                 }
             )
@@ -119,6 +129,9 @@ async def upload_profesional_foto(
                 status_code=500,
                 detail=f"Error al subir archivo a Supabase: {str(e)}"
             )
+        finally:
+            reader.close()
+        observe_upload("stored", size)
         
         # Obtener URL pública
         try:
@@ -132,8 +145,8 @@ async def upload_profesional_foto(
                     "data": {
                         "filename": filename,
                         "url": public_url,
-                        "size": len(content),
-                        "content_type": file.content_type
+                        "size": size,
+                        "content_type": upload.content_type
                     }
                 }
             )
@@ -151,9 +164,16 @@ async def upload_profesional_foto(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
         )
+    finally:
+        upload.close()
+        if sanitized is not None:
+            sanitized.close()
 
 @router.delete("/upload/profesional-foto/{filename}")
-async def delete_profesional_foto(filename: str):
+async def delete_profesional_foto(
+    filename: str,
+    supabase: Client = Depends(get_supabase_client)
+):
     """
     Elimina una foto de profesional de Supabase Storage
     
@@ -165,9 +185,10 @@ async def delete_profesional_foto(filename: str):
     """
     try:
         # Eliminar archivo de Supabase Storage
-        result = supabase.storage.from_("profesionales-fotos").remove([filename])
+        result = await run_sync(supabase.storage.from_("profesionales-fotos").remove, [filename])
         
-        if result.get("error"):
+        # storage3 devuelve la lista de objetos eliminados
+        if isinstance(result, dict) and result.get("error"):
             raise HTTPException(
                 status_code=500,
                 detail=f"Error al eliminar archivo: {result['error']}"
@@ -190,7 +211,10 @@ async def delete_profesional_foto(filename: str):
         )
 
 @router.get("/upload/profesional-foto/{filename}")
-async def get_profesional_foto(filename: str):
+async def get_profesional_foto(
+    filename: str,
+    supabase: Client = Depends(get_supabase_client)
+):
     """
     Obtiene información de una foto de profesional
     
@@ -222,7 +246,9 @@ async def get_profesional_foto(filename: str):
         )
 
 @router.get("/upload/test")
-async def test_upload_connection():
+async def test_upload_connection(
+    supabase: Client = Depends(get_supabase_client)
+):
     """
     Endpoint de prueba para verificar la conexión con Supabase Storage
     """
@@ -238,7 +264,7 @@ async def test_upload_connection():
         
         # Intentar listar buckets
         try:
-            buckets = supabase.storage.list_buckets()
+            buckets = await run_sync(supabase.storage.list_buckets)
             print(f"📦 Buckets encontrados: {len(buckets)}")
             
             bucket_names = [bucket.name for bucket in buckets]
@@ -282,7 +308,10 @@ async def test_upload_connection():
         )
 
 @router.post("/upload/test-simple")
-async def test_simple_upload(file: UploadFile = File(...)):
+async def test_simple_upload(
+    file: UploadFile = File(...),
+    supabase: Client = Depends(get_supabase_client)
+):
     """
     Endpoint de prueba simple para subir un archivo
     """
@@ -305,7 +334,7 @@ async def test_simple_upload(file: UploadFile = File(...)):
         
         # Intentar subir a un bucket existente (usar el primer bucket disponible)
         try:
-            buckets = supabase.storage.list_buckets()
+            buckets = await run_sync(supabase.storage.list_buckets)
             if not buckets:
                 raise HTTPException(
                     status_code=500,
@@ -316,7 +345,8 @@ async def test_simple_upload(file: UploadFile = File(...)):
             bucket_name = buckets[0].name
             print(f"📦 Usando bucket: {bucket_name}")
             
-            result = supabase.storage.from_(bucket_name).upload(
+            result = await run_sync(
+                supabase.storage.from_(bucket_name).upload,
                 filename,
                 content,
                 file_options={
@@ -325,7 +355,7 @@ async def test_simple_upload(file: UploadFile = File(...)):
             )
             
             # Limpiar archivo de prueba
-            supabase.storage.from_(bucket_name).remove([filename])
+            await run_sync(supabase.storage.from_(bucket_name).remove, [filename])
             
             return JSONResponse(
                 status_code=200,
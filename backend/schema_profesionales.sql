@@ -9,7 +9,7 @@ CREATE TABLE IF NOT EXISTS profesionales (
     email VARCHAR(100),
     imagen_url TEXT,
     activo BOOLEAN DEFAULT true,
-    orden INTEGER DEFAULT 0 CHECK (orden >= 0),
+    orden INTEGER NOT NULL DEFAULT 0 CHECK (orden >= 0),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
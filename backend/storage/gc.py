@@ -0,0 +1,157 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Set
+
+from supabase import Client
+
+from database.repository import execute, run_sync
+from storage.photos import PROFESIONALES_BUCKET, photo_filenames_from_row
+
+# Objects are listed and removed in pages; the grace period protects photos
+# uploaded for a profesional form that has not been saved yet, and renditions
+# whose job has not recorded them on the row yet.
+GC_LIST_PAGE_SIZE = int(os.getenv("STORAGE_GC_LIST_PAGE_SIZE", "1000"))
+GC_DELETE_BATCH_SIZE = int(os.getenv("STORAGE_GC_DELETE_BATCH_SIZE", "100"))
+GC_MIN_AGE_HOURS = float(os.getenv("STORAGE_GC_MIN_AGE_HOURS", "24"))
+_REFERENCES_PAGE_SIZE = 1000
+_REPORTED_ORPHANS = 100
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+async def referenced_filenames(supabase: Client) -> Set[str]:
+    """Photos and renditions referenced by any profesional, as bucket filenames."""
+    referenced: Set[str] = set()
+    offset = 0
+    while True:
+        result = await execute(
+            supabase.table("profesionales").select("foto_url, foto_variantes")
+            .order("id").limit(_REFERENCES_PAGE_SIZE).offset(offset)
+        )
+        rows = result.data or []
+        for row in rows:
+            referenced.update(photo_filenames_from_row(row))
+        if len(rows) < _REFERENCES_PAGE_SIZE:
+            return referenced
+        offset += _REFERENCES_PAGE_SIZE
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def collect_orphaned_photos(
+    supabase: Client,
+    dry_run: bool = True,
+    min_age_hours: float = GC_MIN_AGE_HOURS,
+    bucket: str = PROFESIONALES_BUCKET,
+) -> dict:
+    """
+    Elimina del bucket las fotos que ningún profesional referencia
+
+    Recorre el listado del bucket por páginas y lo compara con ``foto_url``
+    y ``foto_variantes`` de la tabla profesionales. Los huérfanos se borran
+    en lotes con ``remove([...])``, después de recorrer todo el listado para
+    que el borrado no desplace los offsets de las páginas.
+
+    Args:
+        dry_run: Si es True solo informa, no elimina nada
+        min_age_hours: Antigüedad mínima de un archivo para considerarlo huérfano
+        bucket: Bucket a revisar
+
+    Returns:
+        Reporte con conteos, bytes recuperables y métricas de rendimiento
+    """
+    started = time.perf_counter()
+    referenced = await referenced_filenames(supabase)
+    storage_bucket = supabase.storage.from_(bucket)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
+
+    scanned = 0
+    pages = 0
+    too_recent = 0
+    orphan_bytes = 0
+    orphans: List[str] = []
+
+    list_started = time.perf_counter()
+    offset = 0
+    while True:
+        page = await run_sync(storage_bucket.list, None, {
+            "limit": GC_LIST_PAGE_SIZE,
+            "offset": offset,
+            "sortBy": {"column": "name", "order": "asc"},
+        })
+        pages += 1
+        for obj in page:
+            # Folders come back without an id; the bucket is flat but skip them anyway
+            if not obj.get("id") or obj["name"].startswith("."):
+                continue
+            scanned += 1
+            if obj["name"] in referenced:
+                continue
+            created_at = _parse_timestamp(obj.get("created_at"))
+            if created_at is not None and created_at > cutoff:
+                too_recent += 1
+                continue
+            orphans.append(obj["name"])
+            orphan_bytes += int((obj.get("metadata") or {}).get("size") or 0)
+        if len(page) < GC_LIST_PAGE_SIZE:
+            break
+        offset += GC_LIST_PAGE_SIZE
+    list_seconds = time.perf_counter() - list_started
+
+    deleted = 0
+    delete_batches = 0
+    errors: List[str] = []
+    delete_started = time.perf_counter()
+    if not dry_run and orphans:
+        # A profesional saved while the bucket was being listed may have adopted an "orphan"
+        referenced_now = await referenced_filenames(supabase)
+        orphans = [name for name in orphans if name not in referenced_now]
+        for batch in _chunks(orphans, GC_DELETE_BATCH_SIZE):
+            delete_batches += 1
+            try:
+                removed = await run_sync(storage_bucket.remove, batch)
+                deleted += len(removed or [])
+            except Exception as e:
+                errors.append(f"{batch[0]}..{batch[-1]}: {str(e)}")
+                print(f"⚠️ Error al eliminar lote de huérfanos: {str(e)}")
+    delete_seconds = time.perf_counter() - delete_started
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "dry_run": dry_run,
+        "bucket": bucket,
+        "min_age_hours": min_age_hours,
+        "scanned": scanned,
+        "referenced": len(referenced),
+        "too_recent": too_recent,
+        "orphans": len(orphans),
+        "orphan_bytes": orphan_bytes,
+        "deleted": deleted,
+        "errors": errors,
+        "sample": orphans[:_REPORTED_ORPHANS],
+        "metrics": {
+            "list_pages": pages,
+            "delete_batches": delete_batches,
+            "list_seconds": round(list_seconds, 3),
+            "delete_seconds": round(delete_seconds, 3),
+            "elapsed_seconds": round(elapsed, 3),
+            "objects_scanned_per_second": round(scanned / list_seconds, 1) if list_seconds else None,
+            "objects_deleted_per_second": round(deleted / delete_seconds, 1) if deleted and delete_seconds else None,
+        },
+    }
+    print(
+        f"🧹 GC de {bucket}: {scanned} archivos revisados, {len(orphans)} huérfanos, "
+        f"{deleted} eliminados{' (dry run)' if dry_run else ''} en {elapsed:.1f}s"
+    )
+    return report
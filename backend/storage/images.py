@@ -0,0 +1,165 @@
+import asyncio
+import base64
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Without Pillow photos are stored as uploaded, with no renditions
+    Image = None
+
+# Derivative generation for profesional photos. Encoding runs in a separate
+# process pool so it never holds the API worker's GIL or event loop.
+IMAGE_VARIANTS_ENABLED = os.getenv("IMAGE_VARIANTS_ENABLED", "true").lower() in ("1", "true", "yes")
+VARIANT_WIDTHS = tuple(sorted({int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1024").split(",") if w.strip()}))
+IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", "1"))
+# Larger images are rejected before decoding (decompression bombs)
+MAX_IMAGE_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+
+PLACEHOLDER_WIDTH = 16
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+_SANITIZED_FORMATS = {"image/jpeg": "JPEG", "image/png": "PNG", "image/webp": "WEBP"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class ImageProcessingError(Exception):
+    """The uploaded file could not be decoded as an image."""
+
+
+def variants_available() -> bool:
+    return IMAGE_VARIANTS_ENABLED and Image is not None
+
+
+def variant_formats() -> List[str]:
+    formats = ["webp"]
+    if Image is not None:
+        Image.init()  # plugins register their encoders lazily
+        if "AVIF" in Image.SAVE:
+            formats.append("avif")
+    return formats
+
+
+def variant_filename(filename: str, fmt: str, width: int) -> str:
+    """Nombre en el bucket de una variante: ``<nombre>_w<ancho>.<formato>``"""
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}_w{width}.{fmt}"
+
+
+def _encode(image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(buffer, "AVIF", quality=AVIF_QUALITY)
+    return buffer.getvalue()
+
+
+def _open_oriented(source_path: str):
+    """Decode an image with its EXIF orientation applied, in RGB/RGBA."""
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        with Image.open(source_path) as original:
+            original.load()
+            image = ImageOps.exif_transpose(original)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(str(e))
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+    return image
+
+
+def sanitize_image(source_path: str, sanitized_path: str, content_type: str) -> Tuple[int, int]:
+    """
+    Escribe una copia del original sin metadatos (se ejecuta en el pool)
+
+    Aplica la orientación EXIF y vuelve a codificar en el mismo formato sin
+    ``exif=`` ni ``icc_profile=``, lo que descarta GPS, cámara y demás datos.
+
+    Returns:
+        (ancho, alto) de la imagen ya orientada
+    """
+    image = _open_oriented(source_path)
+    sanitized = image.convert("RGB") if content_type == "image/jpeg" else image
+    save_options = {"quality": 90, "optimize": True} if content_type == "image/jpeg" else {}
+    sanitized.save(sanitized_path, _SANITIZED_FORMATS[content_type], **save_options)
+    return image.width, image.height
+
+
+def render_variants(source_path: str) -> dict:
+    """
+    Genera las variantes de una foto (se ejecuta en un proceso del pool)
+
+    Returns:
+        Dict con width, height, placeholder (data URI) y renditions
+        como lista de (formato, ancho, bytes)
+    """
+    image = _open_oriented(source_path)
+
+    renditions: List[Tuple[str, int, bytes]] = []
+    # Never upscale; an image narrower than every width still gets one rendition
+    widths = [w for w in VARIANT_WIDTHS if w < image.width] or [image.width]
+    formats = variant_formats()
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            renditions.append((fmt, width, _encode(resized, fmt)))
+
+    tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))), Image.BILINEAR)
+    buffer = io.BytesIO()
+    tiny.save(buffer, "WEBP", quality=30)
+    placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    return {
+        "width": image.width,
+        "height": image.height,
+        "placeholder": placeholder,
+        "renditions": renditions,
+    }
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a worker that already runs threads (httpx, anyio) is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run_in_image_pool(func, *args):
+    """Run an image function of this module in the process pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), func, *args)
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def build_foto_variantes(rendered: dict, urls: Dict[Tuple[str, int], str]) -> dict:
+    """
+    Arma el valor de la columna ``foto_variantes``
+
+    Returns:
+        {"width", "height", "placeholder", "webp": {ancho: url}, "avif": {ancho: url}}
+    """
+    variantes = {
+        "width": rendered["width"],
+        "height": rendered["height"],
+        "placeholder": rendered["placeholder"],
+    }
+    for (fmt, width), url in sorted(urls.items()):
+        variantes.setdefault(fmt, {})[str(width)] = url
+    return variantes
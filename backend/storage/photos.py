@@ -0,0 +1,69 @@
+import re
+from typing import List, Optional
+
+# Bucket de Supabase Storage con las fotos de profesionales
+PROFESIONALES_BUCKET = "profesionales-fotos"
+
+def extract_filename_from_url(url: str) -> Optional[str]:
+    """
+    Extrae el nombre del archivo de una URL de Supabase Storage
+
+    Args:
+        url: URL completa del archivo en Supabase Storage
+
+    Returns:
+        Nombre del archivo o None si no se puede extraer
+    """
+    if not url or "supabase.co/storage" not in url:
+        return None
+
+    try:
+        # Patrón para extraer el nombre del archivo de la URL
+        # https://project.supabase.co/storage/v1/object/public/profesionales-fotos/filename.jpg
+        pattern = r'/profesionales-fotos/([^/?]+)'
+        match = re.search(pattern, url)
+
+        if match:
+            filename = match.group(1)
+            # Limpiar parámetros de query si existen
+            filename = filename.split("?")[0]
+            return filename
+
+        return None
+    except Exception as e:
+        print(f"Error extrayendo filename de URL: {e}")
+        return None
+
+def variant_filenames_from_row(profesional: dict) -> List[str]:
+    """
+    Nombres en el bucket de las variantes registradas en ``foto_variantes``
+
+    Args:
+        profesional: Fila de la tabla profesionales
+
+    Returns:
+        Lista de nombres de archivo (vacía si no hay variantes)
+    """
+    variantes = profesional.get("foto_variantes") or {}
+    filenames = []
+    for fmt in ("webp", "avif"):
+        for url in (variantes.get(fmt) or {}).values():
+            filename = extract_filename_from_url(url)
+            if filename:
+                filenames.append(filename)
+    return filenames
+
+def photo_filenames_from_row(profesional: dict) -> List[str]:
+    """
+    Foto y variantes de un profesional, como nombres en el bucket
+
+    Args:
+        profesional: Fila de la tabla profesionales
+
+    Returns:
+        Lista de nombres de archivo (vacía si no tiene foto en el bucket)
+    """
+    filename = extract_filename_from_url(profesional.get("foto_url"))
+    if not filename:
+        return []
+    return [filename] + variant_filenames_from_row(profesional)
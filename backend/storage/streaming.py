@@ -0,0 +1,210 @@
+import io
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+# Bytes read from the request per iteration; also the write size to the temp file
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Slack allowed on top of the file limit for multipart boundaries and part headers
+MULTIPART_OVERHEAD = 16 * 1024
+
+# (signature offset, signature, content type, extension)
+_IMAGE_SIGNATURES = (
+    (0, b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (8, b"WEBP", "image/webp", ".webp"),
+)
+SNIFF_BYTES = 12
+
+
+class UploadError(Exception):
+    """An upload was rejected while it was being received."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """Return ``(content_type, extension)`` for a JPEG/PNG/WebP header, else None."""
+    if head[:4] == b"RIFF" and head[8:12] != b"WEBP":
+        return None
+    for offset, signature, content_type, extension in _IMAGE_SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return content_type, extension
+    return None
+
+
+class StreamedUpload:
+    """A received file part, stored in a temp file rather than memory."""
+
+    def __init__(self, filename: str, declared_content_type: Optional[str]):
+        self.filename = filename
+        self.declared_content_type = declared_content_type
+        self.content_type: Optional[str] = None
+        self.extension: Optional[str] = None
+        self.size = 0
+        self._file = tempfile.NamedTemporaryFile(prefix="upload_")
+
+    @property
+    def path(self) -> str:
+        """Path of the stored bytes, for readers in other processes."""
+        self._file.flush()
+        return self._file.name
+
+    def open_reader(self) -> io.BufferedReader:
+        """
+        Read-only handle to the stored bytes, positioned at the start
+
+        storage3 only streams ``BufferedReader``/``FileIO`` objects, so this
+        duplicates the descriptor instead of passing the temp file itself.
+        """
+        self._file.flush()
+        reader = os.fdopen(os.dup(self._file.fileno()), "rb")
+        reader.seek(0)
+        return reader
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ImagePartReceiver:
+    """python-multipart callbacks that keep only the wanted file part."""
+
+    def __init__(self, field_name: str, max_bytes: int):
+        self.field_name = field_name
+        self.max_bytes = max_bytes
+        self.upload: Optional[StreamedUpload] = None
+        self._head = b""
+        self._in_target = False
+        self._done = False
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_part_begin(self) -> None:
+        self._headers = []
+        self._in_target = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        if name != self.field_name or b"filename" not in options or self._done:
+            return
+        content_type = headers.get(b"content-type")
+        self.upload = StreamedUpload(
+            filename=options[b"filename"].decode("utf-8", errors="replace"),
+            declared_content_type=content_type.decode("latin-1") if content_type else None,
+        )
+        self._in_target = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_target:
+            return
+        upload = self.upload
+        upload.size += end - start
+        if upload.size > self.max_bytes:
+            raise UploadError(413, f"Archivo muy grande. Tamaño máximo permitido: {self.max_bytes // (1024*1024)}MB")
+
+        if upload.content_type is None:
+            self._head += data[start:min(end, start + SNIFF_BYTES)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+        # Writes land in the page cache; small enough not to need a thread hop
+        upload._file.write(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._in_target:
+            if self.upload.content_type is None:
+                self._sniff()
+            self._in_target = False
+            self._done = True
+
+    def _sniff(self) -> None:
+        detected = sniff_image_type(self._head)
+        if detected is None:
+            raise UploadError(400, "Tipo de archivo no permitido. Formatos permitidos: JPG, PNG, WebP")
+        self.upload.content_type, self.upload.extension = detected
+
+
+async def receive_image_upload(request: Request, field_name: str, max_bytes: int) -> StreamedUpload:
+    """
+    Recibe una imagen multipart en streaming, sin cargarla completa en memoria
+
+    El límite de tamaño se aplica mientras se lee el cuerpo (y antes, si el
+    Content-Length ya lo excede), y el tipo se determina por los magic bytes
+    del contenido, no por la extensión ni el Content-Type del cliente.
+
+    Args:
+        request: Request con cuerpo multipart/form-data
+        field_name: Nombre del campo de archivo
+        max_bytes: Tamaño máximo del archivo
+
+    Returns:
+        StreamedUpload respaldado por un archivo temporal; el llamador debe cerrarlo
+
+    Raises:
+        UploadError: Si el cuerpo es inválido, muy grande o no es una imagen permitida
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadError(400, "Se esperaba un formulario multipart/form-data")
+
+    max_body = max_bytes + MULTIPART_OVERHEAD
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_body:
+        raise UploadError(413, f"Archivo muy grande. Tamaño máximo permitido: {max_bytes // (1024*1024)}MB")
+
+    receiver = _ImagePartReceiver(field_name, max_bytes)
+    parser = MultipartParser(boundary, {
+        "on_part_begin": receiver.on_part_begin,
+        "on_part_data": receiver.on_part_data,
+        "on_part_end": receiver.on_part_end,
+        "on_header_field": receiver.on_header_field,
+        "on_header_value": receiver.on_header_value,
+        "on_header_end": receiver.on_header_end,
+        "on_headers_finished": receiver.on_headers_finished,
+    })
+
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body:
+                raise UploadError(413, f"Archivo muy grande. Tamaño máximo permitido: {max_bytes // (1024*1024)}MB")
+            # Feed the parser in bounded slices so a large ASGI message is not copied whole
+            for offset in range(0, len(chunk), UPLOAD_CHUNK_SIZE):
+                parser.write(chunk[offset:offset + UPLOAD_CHUNK_SIZE])
+        parser.finalize()
+    except MultipartParseError as e:
+        if receiver.upload is not None:
+            receiver.upload.close()
+        raise UploadError(400, f"Formulario multipart inválido: {e}")
+    except Exception:
+        if receiver.upload is not None:
+            receiver.upload.close()
+        raise
+
+    if receiver.upload is None or not receiver._done:
+        if receiver.upload is not None:
+            receiver.upload.close()
+        raise UploadError(400, f"No se recibió el archivo '{field_name}'")
+    return receiver.upload
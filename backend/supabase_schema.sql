@@ -10,7 +10,7 @@ CREATE TABLE IF NOT EXISTS solicitudes (
     hora_sugerida TIME,
     comentarios TEXT,
     estado TEXT DEFAULT 'pendiente' CHECK (estado IN ('pendiente', 'confirmada', 'en_progreso', 'completada', 'cancelada')),
-    fecha TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    fecha TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import tempfile
+from typing import List, Optional
+
+from supabase import Client
+
+from database.catalog_cache import invalidate_public_catalog
+from database.connection import get_supabase_client
+from database.repository import execute, run_sync
+from storage.images import (
+    ImageProcessingError,
+    build_foto_variantes,
+    render_variants,
+    run_in_image_pool,
+    variant_filename,
+    variants_available,
+)
+from storage.photos import PROFESIONALES_BUCKET, extract_filename_from_url
+from tasks.queue import job_queue
+
+# Side effects that used to run inside requests. Handlers must be idempotent:
+# a job can run again after a failure or after its worker dies mid-way.
+
+STORAGE_REMOVE_JOB = "storage.remove"
+FOTO_VARIANTES_JOB = "profesional.foto_variantes"
+
+
+@job_queue.register(STORAGE_REMOVE_JOB)
+async def remove_storage_files(payload: dict) -> None:
+    """Borra archivos de un bucket. Los que ya no existen se ignoran."""
+    supabase = get_supabase_client()
+    removed = await run_sync(supabase.storage.from_(payload["bucket"]).remove, payload["paths"])
+    print(f"✅ Archivos eliminados del storage: {len(removed or [])} de {len(payload['paths'])}")
+
+
+async def upload_variants(supabase: Client, filename: str, rendered: dict) -> Optional[dict]:
+    """
+    Sube las variantes generadas para una foto y arma ``foto_variantes``
+
+    Args:
+        filename: Nombre del original en el bucket
+        rendered: Resultado de storage.images.render_variants
+
+    Returns:
+        Dict para la columna foto_variantes, o None si alguna subida falló
+    """
+    bucket = supabase.storage.from_(PROFESIONALES_BUCKET)
+
+    async def _upload(fmt: str, width: int, content: bytes):
+        name = variant_filename(filename, fmt, width)
+        await run_sync(
+            bucket.upload,
+            name,
+            content,
+            # x-upsert: a retried job overwrites what a previous attempt uploaded
+            file_options={"content-type": f"image/{fmt}", "cache-control": "31536000", "x-upsert": "true"}
+        )
+        return (fmt, width), bucket.get_public_url(name)
+
+    try:
+        uploaded = await asyncio.gather(*(
+            _upload(fmt, width, content) for fmt, width, content in rendered["renditions"]
+        ))
+    except Exception as e:
+        print(f"⚠️ Error al subir variantes de {filename}: {str(e)}")
+        return None
+
+    return build_foto_variantes(rendered, dict(uploaded))
+
+
+@job_queue.register(FOTO_VARIANTES_JOB)
+async def generate_foto_variantes(payload: dict) -> None:
+    """
+    Genera y registra las variantes WebP/AVIF de la foto de un profesional
+
+    Solo actualiza la fila si su ``foto_url`` sigue siendo la del trabajo,
+    para no pisar una foto cambiada mientras tanto.
+    """
+    foto_url = payload["foto_url"]
+    filename = extract_filename_from_url(foto_url)
+    if not filename or not variants_available():
+        return
+
+    supabase = get_supabase_client()
+    content = await run_sync(supabase.storage.from_(PROFESIONALES_BUCKET).download, filename)
+
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1]) as source:
+        source.write(content)
+        source.flush()
+        try:
+            rendered = await run_in_image_pool(render_variants, source.name)
+        except ImageProcessingError as e:
+            # Retrying will not make an undecodable file decodable
+            print(f"⚠️ No se pudieron generar variantes de {filename}: {str(e)}")
+            return
+
+    variantes = await upload_variants(supabase, filename, rendered)
+    if variantes is None:
+        raise RuntimeError(f"No se pudieron subir las variantes de {filename}")
+
+    result = await execute(
+        supabase.table("profesionales")
+        .update({"foto_variantes": variantes})
+        .eq("id", payload["profesional_id"])
+        .eq("foto_url", foto_url)
+    )
+    if result.data:
+        invalidate_public_catalog()
+
+
+async def schedule_foto_variantes(profesional: dict) -> None:
+    """Encola la generación de variantes si la fila tiene foto y aún no las tiene."""
+    if not profesional.get("foto_url") or profesional.get("foto_variantes") or not variants_available():
+        return
+    try:
+        await job_queue.enqueue(FOTO_VARIANTES_JOB, {
+            "profesional_id": profesional["id"],
+            "foto_url": profesional["foto_url"],
+        })
+    except Exception as e:
+        print(f"⚠️ No se pudo encolar la generación de variantes: {str(e)}")
+
+
+async def schedule_storage_removal(paths: List[str], bucket: str = PROFESIONALES_BUCKET) -> None:
+    """Encola el borrado de archivos del storage (no falla la petición si no se puede)."""
+    if not paths:
+        return
+    try:
+        await job_queue.enqueue(STORAGE_REMOVE_JOB, {"bucket": bucket, "paths": paths})
+    except Exception as e:
+        print(f"⚠️ No se pudo encolar la eliminación de {paths}: {str(e)}")
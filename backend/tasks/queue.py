@@ -0,0 +1,300 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import anyio
+from anyio import to_thread
+
+# Jobs are journaled in a local SQLite file so they survive worker restarts;
+# every gunicorn worker on the host shares it and claims jobs atomically.
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "2"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "300"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+# A running job whose worker died is handed out again after this long
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+JOB_STATUSES = ("pending", "running", "dead")
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, run_at);
+"""
+
+
+class JobQueue:
+    """
+    In-process job queue with a durable SQLite journal
+
+    Successful jobs are deleted. Failed jobs are retried with exponential
+    backoff and jitter; after ``max_attempts`` they stay in the journal with
+    status ``dead`` until an admin retries them.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH):
+        self.path = path
+        self._handlers: Dict[str, Handler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self._initialized = False
+        self._expected_workers = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead = 0
+        # Journal errors the workers survived, and workers that exited anyway
+        self.loop_errors = 0
+        self.crashed_workers = 0
+        self.last_loop_error: Optional[str] = None
+
+    # -- storage ---------------------------------------------------------
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        self._initialized = True
+
+    async def _db(self, func: Callable, *args) -> Any:
+        # SQLite calls are short but blocking; a dedicated limiter keeps them
+        # off the Supabase thread budget
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(4)
+        if not self._initialized:
+            await to_thread.run_sync(self._init_db, limiter=self._limiter)
+        return await to_thread.run_sync(func, *args, limiter=self._limiter)
+
+    def _insert(self, job_id: str, name: str, payload: str, run_at: float, max_attempts: int) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, name, payload, status, max_attempts, run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'pending', ?, ?, ?, ?)",
+                (job_id, name, payload, max_attempts, run_at, now, now),
+            )
+
+    def _claim(self) -> Optional[dict]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_until = ?, updated_at = ? "
+                "WHERE id = ("
+                "  SELECT id FROM jobs"
+                "  WHERE (status = 'pending' AND run_at <= ?) OR (status = 'running' AND locked_until < ?)"
+                "  ORDER BY run_at LIMIT 1"
+                ") RETURNING *",
+                (now + JOB_LEASE_SECONDS, now, now, now),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def _complete(self, job_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def _fail(self, job_id: str, status: str, run_at: float, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, locked_until = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, run_at, error[:2000], time.time(), job_id),
+            )
+
+    def _release(self, job_id: str) -> None:
+        # Interrupted by shutdown: hand the attempt back
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = attempts - 1, locked_until = NULL, updated_at = ? WHERE id = ?",
+                (time.time(), job_id),
+            )
+
+    def _list(self, status: Optional[str], limit: int) -> List[dict]:
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY updated_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row, payload=json.loads(row["payload"])) for row in rows]
+
+    def _counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def _requeue(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, run_at = ?, last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'dead'",
+                (time.time(), time.time(), job_id),
+            )
+        return cursor.rowcount > 0
+
+    # -- public API ------------------------------------------------------
+
+    def register(self, name: str) -> Callable[[Handler], Handler]:
+        """Decorator that registers the coroutine that runs jobs named ``name``."""
+        def decorator(handler: Handler) -> Handler:
+            self._handlers[name] = handler
+            return handler
+        return decorator
+
+    async def enqueue(self, name: str, payload: Dict[str, Any], delay: float = 0,
+                      max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        """Persist a job and wake a worker. Returns the job id."""
+        if name not in self._handlers:
+            raise ValueError(f"No hay handler registrado para el trabajo '{name}'")
+        job_id = str(uuid.uuid4())
+        await self._db(self._insert, job_id, name, json.dumps(payload), time.time() + delay, max_attempts)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[dict]:
+        return await self._db(self._list, status, limit)
+
+    async def counts(self) -> Dict[str, int]:
+        return await self._db(self._counts)
+
+    async def retry(self, job_id: str) -> bool:
+        """Move a dead job back to pending with a fresh attempt budget."""
+        requeued = await self._db(self._requeue, job_id)
+        if requeued and self._wakeup is not None:
+            self._wakeup.set()
+        return requeued
+
+    def stats(self) -> dict:
+        alive = sum(1 for task in self._workers if not task.done())
+        return {
+            "workers": alive,
+            "workers_expected": self._expected_workers,
+            "healthy": alive == self._expected_workers,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "loop_errors": self.loop_errors,
+            "crashed_workers": self.crashed_workers,
+            "last_loop_error": self.last_loop_error,
+        }
+
+    # -- workers ---------------------------------------------------------
+
+    async def start(self, workers: int = JOB_WORKERS) -> None:
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        await self._db(lambda: None)  # create the journal before the first request
+        self._expected_workers = workers
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(workers)]
+        for task in self._workers:
+            task.add_done_callback(self._worker_done)
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Stop the workers; jobs still running are released back to pending."""
+        workers, self._workers = self._workers, []
+        self._expected_workers = 0
+        for task in workers:
+            task.cancel()
+        if workers:
+            await asyncio.wait(workers, timeout=timeout)
+
+    def _worker_done(self, task: asyncio.Task) -> None:
+        # Only cancellation should end a worker; anything else is reported by stats()
+        if task.cancelled():
+            return
+        self.crashed_workers += 1
+        logger.error("❌ Worker de trabajos terminó inesperadamente", exc_info=task.exception())
+
+    async def _worker_loop(self) -> None:
+        failures = 0
+        while True:
+            try:
+                # Cleared before claiming so an enqueue in between is not missed
+                self._wakeup.clear()
+                job = await self._db(self._claim)
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run(job)
+                failures = 0
+            except Exception as e:
+                # The journal is unavailable (locked, disk full...): keep the
+                # worker alive and back off. A job whose outcome could not be
+                # recorded stays running and is handed out again when its lease expires.
+                failures += 1
+                self.loop_errors += 1
+                self.last_loop_error = f"{type(e).__name__}: {e}"
+                delay = min(JOB_BACKOFF_MAX, JOB_POLL_INTERVAL * 2 ** (failures - 1))
+                logger.exception(f"⚠️ Error en el worker de trabajos, reintento en {delay:.1f}s")
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def _run(self, job: dict) -> None:
+        handler = self._handlers.get(job["name"])
+        try:
+            if handler is None:
+                raise LookupError(f"No hay handler registrado para el trabajo '{job['name']}'")
+            await handler(json.loads(job["payload"]))
+        except asyncio.CancelledError:
+            await asyncio.shield(self._db(self._release, job["id"]))
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if handler is None or job["attempts"] >= job["max_attempts"]:
+                logger.error(f"❌ Trabajo {job['name']} ({job['id']}) sin más reintentos: {error}")
+                await self._db(self._fail, job["id"], "dead", time.time(), error)
+                self.dead += 1
+            else:
+                delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** (job["attempts"] - 1))
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"⚠️ Trabajo {job['name']} ({job['id']}) falló, reintento en {delay:.0f}s: {error}")
+                await self._db(self._fail, job["id"], "pending", time.time() + delay, error)
+                self.retried += 1
+        else:
+            # Counted once the outcome is in the journal
+            await self._db(self._complete, job["id"])
+            self.completed += 1
+
+
+job_queue = JobQueue()
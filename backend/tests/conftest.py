@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings read at import time; the tests never reach Supabase
+os.environ.setdefault("SUPABASE_URL", "https://tests.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "tests-service-key")
+os.environ.setdefault("SECRET_KEY", "tests-secret-key")
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(tempfile.mkdtemp(prefix="tests-jobs-"), "jobs.sqlite3"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from database.memory import MemoryClient  # noqa: E402
+
+ADMIN = {"id": "00000000-0000-0000-0000-000000000001", "email": "admin@test.cl", "role": "admin"}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def memory():
+    return MemoryClient()
+
+
+@pytest.fixture
+async def api(memory):
+    """HTTP client for the app, backed by ``memory`` and logged in as an admin."""
+    from auth.middleware import get_current_user
+    from database.catalog_cache import invalidate_public_catalog
+    from database.connection import close_supabase_client, get_supabase_client, use_supabase_client
+    from main import app
+    from ratelimit import middleware as ratelimit
+    from ratelimit.buckets import MemoryBucketStore
+
+    # Fresh buckets and catalog per test (both live as long as the app)
+    for limiter in ratelimit._registry:
+        limiter.store = MemoryBucketStore()
+    invalidate_public_catalog()
+    # Routes that call get_supabase_client() directly get it from the registry
+    use_supabase_client(memory)
+    app.dependency_overrides[get_supabase_client] = lambda: memory
+    app.dependency_overrides[get_current_user] = lambda: ADMIN
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        close_supabase_client()
@@ -0,0 +1,23 @@
+def solicitud_payload(**overrides) -> dict:
+    """A valid body for POST /api/solicitud."""
+    return {
+        "nombre": "Ana Pérez",
+        "telefono": "+56 9 1234 5678",
+        "email": "ana@test.cl",
+        "direccion": "Calle Falsa 123, Santiago",
+        "tipo_servicio": "curacion",
+        "comentarios": None,
+        **overrides,
+    }
+
+
+def profesional_row(nombre: str, orden: int = 0, **overrides) -> dict:
+    """A profesionales row as stored in the database."""
+    return {
+        "nombre": nombre,
+        "especialidad": "Enfermería general",
+        "experiencia": 5,
+        "descripcion": "Profesional con experiencia en atención domiciliaria",
+        "orden": orden,
+        **overrides,
+    }
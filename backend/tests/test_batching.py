@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+from database.batching import InsertBatcher, is_row_error, uniform_rows
+from database.memory import MemoryAPIError, MemoryQuery
+
+pytestmark = pytest.mark.anyio
+
+
+def row(nombre: str, **extra) -> dict:
+    return {"nombre": nombre, "fecha": "2024-05-01T10:00:00+00:00", **extra}
+
+
+async def insert_all(batcher: InsertBatcher, supabase, rows) -> list:
+    return await asyncio.gather(*(batcher.insert(supabase, r) for r in rows), return_exceptions=True)
+
+
+def test_uniform_rows_fills_missing_keys():
+    assert uniform_rows([{"a": 1}, {"b": 2}]) == [{"a": 1, "b": None}, {"a": None, "b": 2}]
+
+
+def test_only_postgrest_rejections_are_row_errors():
+    assert is_row_error(MemoryAPIError("null value", code="23502"))
+    assert is_row_error(MemoryAPIError("All object keys must match", code="PGRST102"))
+    assert not is_row_error(MemoryAPIError("canceling statement due to statement timeout", code="57014"))
+    assert not is_row_error(httpx.ReadTimeout("timed out"))
+    assert not is_row_error(RuntimeError("boom"))
+
+
+async def test_concurrent_inserts_share_one_statement(memory):
+    batcher = InsertBatcher("solicitudes", max_size=10, max_delay=0.01)
+    rows = [row("a"), row("b", hora_sugerida="10:00"), row("c")]
+
+    inserted = await insert_all(batcher, memory, rows)
+
+    assert [r["nombre"] for r in inserted] == ["a", "b", "c"]
+    assert inserted[1]["hora_sugerida"] == "10:00"
+    assert memory.calls["solicitudes.insert"] == 1
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["fallbacks"] == 0
+
+
+async def test_rejected_batch_isolates_the_invalid_row(memory):
+    batcher = InsertBatcher("solicitudes", max_size=3, max_delay=1)
+    rows = [row("a"), row("b", fecha=None), row("c")]
+
+    results = await insert_all(batcher, memory, rows)
+
+    assert results[0]["nombre"] == "a" and results[2]["nombre"] == "c"
+    assert isinstance(results[1], MemoryAPIError) and results[1].code == "23502"
+    assert sorted(r["nombre"] for r in memory.tables["solicitudes"]) == ["a", "c"]
+    assert batcher.fallbacks == 1 and batcher.failures == 0
+
+
+async def test_transport_error_fails_the_batch_without_retrying(memory, monkeypatch):
+    # The server commits the INSERT but the response never arrives
+    execute = MemoryQuery.execute
+
+    def commit_then_time_out(query):
+        execute(query)
+        raise httpx.ReadTimeout("timed out")
+
+    monkeypatch.setattr(MemoryQuery, "execute", commit_then_time_out)
+    batcher = InsertBatcher("solicitudes", max_size=3, max_delay=1)
+
+    results = await insert_all(batcher, memory, [row("a"), row("b"), row("c")])
+
+    assert all(isinstance(result, httpx.ReadTimeout) for result in results)
+    assert memory.calls["solicitudes.insert"] == 1
+    assert len(memory.tables["solicitudes"]) == 3
+    assert batcher.fallbacks == 0 and batcher.failures == 1
+
+
+async def test_close_flushes_pending_rows(memory):
+    batcher = InsertBatcher("solicitudes", max_size=10, max_delay=60)
+    pending = asyncio.ensure_future(batcher.insert(memory, row("a")))
+    await asyncio.sleep(0)
+    assert batcher.stats()["pending"] == 1
+
+    await batcher.close()
+
+    assert (await pending)["nombre"] == "a"
+    # Once closed, inserts go straight to the database
+    assert (await batcher.insert(memory, row("b")))["nombre"] == "b"
+    assert batcher.batches == 1
@@ -0,0 +1,76 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks import bench_api
+from database.memory import MemoryClient
+from database.rollups import REBUILD_RPC
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def memory():
+    client = MemoryClient(bench_api.seed_tables(300, 12, seed=1))
+    client.rpc(REBUILD_RPC, {}).execute()
+    return client
+
+
+def test_seed_is_deterministic():
+    first = bench_api.seed_tables(50, 5, seed=7)
+    assert first == bench_api.seed_tables(50, 5, seed=7)
+    assert first != bench_api.seed_tables(50, 5, seed=8)
+    assert len(first["solicitudes"]) == 50 and len(first["profesionales"]) == 5
+
+
+def test_percentile():
+    values = [i / 1000 for i in range(1, 101)]
+    assert bench_api.percentile(values, 50) == 50.0
+    assert bench_api.percentile(values, 99) == 99.0
+    assert bench_api.percentile([], 50) is None
+
+
+@pytest.mark.parametrize("mix", sorted(bench_api.MIXES))
+def test_mixes_only_name_known_operations(mix):
+    assert {name for _, name in bench_api.MIXES[mix]} <= set(bench_api.OPERATIONS)
+
+
+async def test_every_operation_succeeds_against_the_seeded_app(api):
+    login = await api.post("/api/auth/login", json={"username": "admin", "password": "admin"})
+    ctx = bench_api.Context(login.json()["access_token"], seed=1)
+    for name, operation in bench_api.OPERATIONS.items():
+        # Twice: the second catalog read revalidates and cursors move on
+        for _ in range(2):
+            response = await operation(api, ctx)
+            assert response.status_code in (200, 304), f"{name}: {response.status_code} {response.text}"
+    assert ctx.cursor is not None
+
+
+def test_compare_reports_relative_changes(tmp_path, capsys):
+    run = {"mix": "admin", "concurrency": 10, "rps": 100.0, "latency_ms": {"p99": 20.0}, "rss_mb": 80.0}
+    previous = tmp_path / "anterior.json"
+    previous.write_text(json.dumps({"commit": "abc123", "runs": [run]}))
+
+    bench_api.compare(str(previous), [{**run, "rps": 125.0, "latency_ms": {"p99": 15.0}, "rss_mb": None}])
+
+    line = capsys.readouterr().out.splitlines()[-1]
+    assert line.split("|")[2:] == ["    +25.0% ", "    -25.0% ", "         -"]
+
+
+def test_end_to_end_run_writes_a_report(tmp_path):
+    output = tmp_path / "resultado.json"
+    subprocess.run(
+        [
+            sys.executable, str(Path(bench_api.__file__)), "--mix", "mixto", "--concurrency", "2",
+            "--duration", "0.5", "--warmup", "0", "--seed-solicitudes", "200", "--output", str(output),
+        ],
+        check=True, capture_output=True, timeout=120,
+    )
+    report = json.loads(output.read_text())
+    (run,) = report["runs"]
+    assert run["requests"] > 0
+    assert run["errors"] == 0
+    assert report["config"]["seed_solicitudes"] == 200
@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+
+from models.solicitud import SOLICITUDES_BULK_MAX
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+URL = "/api/admin/solicitudes/bulk"
+
+
+@pytest.fixture
+def ids(memory):
+    rows = memory.insert_rows("solicitudes", [solicitud_payload(comentarios_admin="previo") for _ in range(4)])
+    return [row["id"] for row in rows]
+
+
+async def test_one_update_for_every_row(api, memory, ids):
+    response = await api.patch(URL, json={"ids": ids[:3], "estado": "confirmada"})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["updated"] == 3
+    assert memory.calls["solicitudes.update"] == 1
+    estados = {row["id"]: row["estado"] for row in memory.tables["solicitudes"]}
+    assert [estados[i] for i in ids] == ["confirmada"] * 3 + ["pendiente"]
+
+
+async def test_each_id_gets_a_result(api, ids):
+    missing = str(uuid.uuid4())
+    body = {"ids": [ids[0], missing, "no-es-uuid", ids[0]], "estado": "completada"}
+    data = (await api.patch(URL, json=body)).json()["data"]
+
+    assert data["results"] == [
+        {"id": ids[0], "resultado": "updated"},
+        {"id": missing, "resultado": "not_found"},
+        {"id": "no-es-uuid", "resultado": "invalid"},
+    ]
+    assert (data["updated"], data["not_found"], data["invalid"]) == (1, 1, 1)
+
+
+async def test_comment_only_update_keeps_estado(api, memory, ids):
+    await api.patch(URL, json={"ids": ids[:1], "estado": "cancelada"})
+    await api.patch(URL, json={"ids": ids[:1], "comentarios_admin": "llamar mañana"})
+
+    row = next(row for row in memory.tables["solicitudes"] if row["id"] == ids[0])
+    assert row["estado"] == "cancelada" and row["cancelled_at"] is not None
+    assert row["comentarios_admin"] == "llamar mañana"
+
+
+@pytest.mark.parametrize("body", [
+    {"ids": [], "estado": "confirmada"},
+    {"ids": ["x"] * (SOLICITUDES_BULK_MAX + 1), "estado": "confirmada"},
+    {"ids": ["x"], "estado": "archivada"},
+    {"ids": ["x"]},
+])
+async def test_invalid_requests_are_rejected(api, memory, body):
+    response = await api.patch(URL, json=body)
+    assert response.status_code == 422
+    assert memory.calls["solicitudes.update"] == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from database.rollups import ROLLUP_TABLE
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def solicitud(memory):
+    return memory.insert_rows("solicitudes", [solicitud_payload()])[0]
+
+
+def row(memory, solicitud_id: str) -> dict:
+    return next(row for row in memory.tables["solicitudes"] if row["id"] == solicitud_id)
+
+
+async def test_delete_cancels_with_a_timestamp(api, memory, solicitud):
+    response = await api.delete(f"/api/admin/solicitudes/{solicitud['id']}")
+
+    assert response.json()["message"] == "Solicitud cancelada exitosamente"
+    cancelled = row(memory, solicitud["id"])
+    assert cancelled["estado"] == "cancelada" and cancelled["cancelled_at"] is not None
+    assert cancelled["comentarios"] is None
+
+    again = await api.delete(f"/api/admin/solicitudes/{solicitud['id']}")
+    assert again.json()["message"] == "La solicitud ya estaba cancelada"
+    assert row(memory, solicitud["id"])["cancelled_at"] == cancelled["cancelled_at"]
+
+
+async def test_reopening_clears_cancelled_at(api, memory, solicitud):
+    await api.delete(f"/api/admin/solicitudes/{solicitud['id']}")
+    await api.put(f"/api/admin/solicitudes/{solicitud['id']}", json={"estado": "pendiente"})
+    assert row(memory, solicitud["id"])["cancelled_at"] is None
+
+
+async def test_delete_unknown_solicitud(api):
+    response = await api.delete("/api/admin/solicitudes/00000000-0000-0000-0000-00000000abcd")
+    assert response.status_code == 404
+
+
+async def test_legacy_markers_are_migrated_in_batches(memory):
+    import migrate_cancelaciones
+    from database.connection import close_supabase_client, use_supabase_client
+
+    legacy = [
+        solicitud_payload(estado="pendiente", comentarios="[CANCELADA] por teléfono\nTocar timbre"),
+        solicitud_payload(estado="cancelada", cancelled_at=None),
+        solicitud_payload(estado=None),
+        solicitud_payload(estado="confirmada"),
+    ]
+    ids = [r["id"] for r in memory.insert_rows("solicitudes", legacy)]
+    use_supabase_client(memory)
+    try:
+        await migrate_cancelaciones.migrar(batch_size=2, pause=0, dry_run=False)
+    finally:
+        close_supabase_client()
+
+    rows = [row(memory, solicitud_id) for solicitud_id in ids]
+    assert [r["estado"] for r in rows] == ["cancelada", "cancelada", "pendiente", "confirmada"]
+    assert rows[0]["comentarios"] == "Tocar timbre" and rows[0]["cancelled_at"] is not None
+    assert rows[1]["cancelled_at"] is not None and rows[2]["cancelled_at"] is None
+    assert memory.calls["rpc.migrate_legacy_cancelaciones"] == 3
+    counts = {(r["dimension"], r["clave"]): r["cantidad"] for r in memory.tables[ROLLUP_TABLE]}
+    assert counts[("estado", "cancelada")] == 2
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from database.catalog_cache import CachedBody, CatalogCache
+from database.memory import MemoryClient
+from tests.helpers import profesional_row
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_misses_load_once():
+    cache = CatalogCache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    entries = await asyncio.gather(*(cache.get(loader) for _ in range(10)))
+    assert calls == 1
+    assert {entry.etag for entry in entries} == {entries[0].etag}
+    assert (cache.misses, cache.hits) == (1, 9)
+
+
+async def test_invalidation_during_load_discards_the_stale_body():
+    cache = CatalogCache()
+    started, release = asyncio.Event(), asyncio.Event()
+    bodies = iter([b'["antes"]', b'["despues"]'])
+
+    async def loader():
+        started.set()
+        await release.wait()
+        return next(bodies)
+
+    pending = asyncio.ensure_future(cache.get(loader))
+    await started.wait()
+    # A profesional is updated while the old catalog is being read
+    cache.invalidate()
+    release.set()
+
+    # The request that started the load still gets its body...
+    assert (await pending).body == b'["antes"]'
+    # ...but it is not cached, so the next request reloads
+    assert (await cache.get(loader)).body == b'["despues"]'
+    assert cache.misses == 2
+
+
+async def test_expired_entry_is_reloaded():
+    cache = CatalogCache()
+    first = await cache.get(lambda: asyncio.sleep(0, b"[1]"))
+    first.expires_at = 0
+    assert (await cache.get(lambda: asyncio.sleep(0, b"[2]"))).body == b"[2]"
+
+
+def test_if_none_match():
+    body = CachedBody(b"[]")
+    assert body.matches(body.etag)
+    assert body.matches(f'"otro", W/{body.etag}')
+    assert body.matches("*")
+    assert not body.matches('"otro"')
+    assert not body.matches(None)
+
+
+@pytest.fixture
+def memory():
+    return MemoryClient({"profesionales": [profesional_row("Ana Pérez"), profesional_row("Berta Soto", activo=False)]})
+
+
+async def test_public_catalog_etag_and_invalidation(api, memory):
+    first = await api.get("/api/profesionales/public/activos")
+    assert first.status_code == 200
+    assert [p["nombre"] for p in first.json()] == ["Ana Pérez"]
+    etag = first.headers["etag"]
+
+    cached = await api.get("/api/profesionales/public/activos", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert memory.calls["profesionales.select"] == 1
+
+    berta = next(row for row in memory.tables["profesionales"] if row["nombre"] == "Berta Soto")
+    updated = await api.put(f"/api/admin/profesionales/{berta['id']}", json={"activo": True})
+    assert updated.status_code == 200, updated.text
+
+    fresh = await api.get("/api/profesionales/public/activos", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert [p["nombre"] for p in fresh.json()] == ["Ana Pérez", "Berta Soto"]
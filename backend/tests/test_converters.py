@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from database.memory import MemoryClient
+from models.converters import solicitud_json, solicitudes_from_rows, solicitudes_json
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+ROWS = [
+    {**solicitud_payload(), "id": "a", "estado": None, "fecha": "2026-03-01T10:00:00+00:00",
+     "fecha_sugerida": "2026-03-05", "hora_sugerida": "09:30:00", "updated_at": "2026-03-02T08:00:00Z"},
+    {**solicitud_payload(comentarios="Tocar timbre"), "id": "b", "estado": "cancelada",
+     "fecha": "2026-03-01T11:00:00+00:00", "updated_at": None, "cancelled_at": "2026-03-03T12:00:00+00:00", "hora_sugerida": "25:00:00"},
+]
+
+
+def test_json_matches_validated_models():
+    expected = jsonable_encoder(solicitudes_from_rows(ROWS, trusted=False))
+    assert json.loads(solicitudes_json(ROWS)) == expected
+    assert json.loads(solicitud_json(ROWS[0])) == expected[0]
+
+
+def test_missing_creation_date_fails_loudly():
+    with pytest.raises(ValueError):
+        solicitudes_json([{**ROWS[0], "fecha": None}])
+
+
+@pytest.fixture
+def memory():
+    return MemoryClient({"solicitudes": [dict(row) for row in ROWS]})
+
+
+async def test_endpoints_serve_the_same_json(api):
+    expected = jsonable_encoder(solicitudes_from_rows(ROWS, trusted=False))
+    by_id = {s["id"]: s for s in expected}
+
+    listing = await api.get("/api/admin/solicitudes", params={"limit": 1})
+    assert listing.json() == [by_id["b"]]
+    assert listing.headers["content-type"] == "application/json"
+    assert listing.headers["x-next-cursor"]
+
+    detail = await api.get("/api/admin/solicitudes/a")
+    assert detail.json() == by_id["a"]
+
+    pendientes = await api.get("/api/admin/solicitudes-pendientes")
+    assert pendientes.json() == []
+    assert "x-next-cursor" not in pendientes.headers
+
+
+async def test_openapi_keeps_the_response_schema(api):
+    schema = (await api.get("/openapi.json")).json()
+    response = schema["paths"]["/api/admin/solicitudes"]["get"]["responses"]["200"]
+    assert response["content"]["application/json"]["schema"]["items"]["$ref"].endswith("/SolicitudResponse")
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from database.memory import MemoryClient
+from models.solicitud import ESTADOS_SOLICITUD, SolicitudUpdate
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def memory():
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # One pending row in four: a filter applied after paging would return short pages
+    return MemoryClient({"solicitudes": [
+        solicitud_payload(
+            estado="pendiente" if i % 4 == 0 else "completada",
+            fecha=(base + timedelta(hours=i)).isoformat(),
+        )
+        for i in range(40)
+    ]})
+
+
+async def test_estado_is_filtered_before_paging(api, memory):
+    response = await api.get("/api/admin/solicitudes", params={"estado": "pendiente", "limit": 4})
+
+    assert response.status_code == 200
+    assert [s["estado"] for s in response.json()] == ["pendiente"] * 4
+    assert memory.calls["solicitudes.select"] == 1
+
+
+async def test_unknown_estado_is_rejected(api, memory):
+    response = await api.get("/api/admin/solicitudes", params={"estado": "en_proceso"})
+    assert response.status_code == 400
+    assert memory.calls["solicitudes.select"] == 0
+
+
+async def test_pending_queue_is_paged_with_a_cursor(api, memory):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = await api.get("/api/admin/solicitudes-pendientes", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    expected = [
+        row["id"] for row in memory.ordered("solicitudes", (("fecha", True), ("id", True)))
+        if row["estado"] == "pendiente"
+    ]
+    assert [s["id"] for s in seen] == expected
+    assert len(expected) == 10
+    assert memory.calls["solicitudes.select"] == 4
+
+
+@pytest.mark.parametrize("estado", ESTADOS_SOLICITUD)
+def test_update_accepts_every_column_estado(estado):
+    assert SolicitudUpdate(estado=estado).estado == estado
+
+
+def test_update_rejects_estados_outside_the_check():
+    with pytest.raises(ValidationError):
+        SolicitudUpdate(estado="en_proceso")
@@ -0,0 +1,120 @@
+import asyncio
+import uuid
+
+import pytest
+
+from database.idempotency import IdempotencyConflict, IdempotencyStore, request_fingerprint
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_requests_share_one_execution():
+    store = IdempotencyStore()
+    calls = 0
+
+    async def handler():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": calls}
+
+    results = await asyncio.gather(*(store.run("k", "f", handler) for _ in range(5)))
+    assert calls == 1
+    assert [response for response, _ in results] == [{"id": 1}] * 5
+    assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+
+
+async def test_key_reused_with_another_body_conflicts():
+    store = IdempotencyStore()
+    await store.run("k", "f1", lambda: asyncio.sleep(0, "ok"))
+    with pytest.raises(IdempotencyConflict):
+        await store.run("k", "f2", lambda: asyncio.sleep(0, "otro"))
+    assert store.conflicts == 1
+
+
+async def test_failed_execution_is_not_stored_and_waiters_run_again():
+    store = IdempotencyStore()
+    started = asyncio.Event()
+
+    async def failing():
+        started.set()
+        await asyncio.sleep(0.01)
+        raise RuntimeError("timeout")
+
+    first = asyncio.ensure_future(store.run("k", "f", failing))
+    await started.wait()
+    # A retry arrives while the first attempt is still running, then the first fails
+    retry = asyncio.ensure_future(store.run("k", "f", lambda: asyncio.sleep(0, "creada")))
+
+    with pytest.raises(RuntimeError):
+        await first
+    assert await retry == ("creada", False)
+    assert await store.run("k", "f", failing) == ("creada", True)
+
+
+async def test_cancelled_waiter_does_not_cancel_the_execution():
+    store = IdempotencyStore()
+    release = asyncio.Event()
+
+    async def handler():
+        await release.wait()
+        return "creada"
+
+    first = asyncio.ensure_future(store.run("k", "f", handler))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(store.run("k", "f", handler))
+    await asyncio.sleep(0)
+    # The retrying client disconnects
+    waiter.cancel()
+    release.set()
+    assert await first == ("creada", False)
+    assert waiter.cancelled()
+
+
+async def test_expired_and_excess_keys_are_evicted():
+    store = IdempotencyStore(ttl=0, max_keys=100)
+    await store.run("viejo", "f", lambda: asyncio.sleep(0, 1))
+    await store.run("nuevo", "f", lambda: asyncio.sleep(0, 2))
+    assert store.stats()["keys"] == 1
+
+    store = IdempotencyStore(ttl=60, max_keys=2)
+    for key in ("a", "b", "c"):
+        await store.run(key, "f", lambda: asyncio.sleep(0, key))
+    assert store.stats()["keys"] == 2
+    assert await store.run("a", "f", lambda: asyncio.sleep(0, "otra vez")) == ("otra vez", False)
+
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({"a": 1, "b": 2}) == request_fingerprint({"b": 2, "a": 1})
+    assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
+
+
+async def test_post_retry_returns_the_original_solicitud(api, memory):
+    key = str(uuid.uuid4())
+    first, retry = await asyncio.gather(
+        api.post("/api/solicitud", json=solicitud_payload(), headers={"Idempotency-Key": key}),
+        api.post("/api/solicitud", json=solicitud_payload(), headers={"Idempotency-Key": key}),
+    )
+    assert first.status_code == retry.status_code == 200
+    assert first.json()["data"]["id"] == retry.json()["data"]["id"]
+    assert sorted(r.headers.get("idempotent-replayed", "") for r in (first, retry)) == ["", "true"]
+    assert len(memory.tables["solicitudes"]) == 1
+
+    other = await api.post(
+        "/api/solicitud", json=solicitud_payload(nombre="Otra Persona"), headers={"Idempotency-Key": key}
+    )
+    assert other.status_code == 422
+
+
+async def test_resubmitted_form_without_key_is_detected_as_duplicate(api, memory):
+    first = await api.post("/api/solicitud", json=solicitud_payload())
+    # Same person and service, phone typed differently
+    again = await api.post("/api/solicitud", json=solicitud_payload(telefono="+56912345678", email="ANA@test.cl"))
+    assert again.json()["duplicada"] is True
+    assert again.json()["data"]["id"] == first.json()["data"]["id"]
+    assert len(memory.tables["solicitudes"]) == 1
+
+    otro_servicio = await api.post("/api/solicitud", json=solicitud_payload(tipo_servicio="inyecciones"))
+    assert "duplicada" not in otro_servicio.json()
+    assert len(memory.tables["solicitudes"]) == 2
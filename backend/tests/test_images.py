@@ -0,0 +1,107 @@
+import io
+
+import pytest
+
+from storage import images
+from storage.images import ImageProcessingError, render_variants, sanitize_image, variant_filename
+
+Image = pytest.importorskip("PIL.Image")
+
+pytestmark = pytest.mark.anyio
+
+ORIENTATION = 0x0112
+MAKE = 0x010F
+
+
+def jpeg(path, width: int = 1200, height: int = 800, orientation: int = 1) -> str:
+    exif = Image.Exif()
+    exif[ORIENTATION] = orientation
+    exif[MAKE] = "Cámara de prueba"
+    Image.new("RGB", (width, height), (200, 30, 30)).save(path, "JPEG", exif=exif)
+    return str(path)
+
+
+@pytest.fixture
+def stored(memory, monkeypatch):
+    """A profesional whose photo is in the memory bucket; the pool runs inline."""
+    from database.connection import close_supabase_client, use_supabase_client
+
+    async def inline(func, *args):
+        return func(*args)
+
+    monkeypatch.setattr("tasks.handlers.run_in_image_pool", inline)
+    monkeypatch.setattr("tasks.handlers.variants_available", lambda: True)
+    use_supabase_client(memory)
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 400), (0, 90, 200)).save(buffer, "PNG")
+    bucket = memory.storage.from_("profesionales-fotos")
+    bucket.upload("profesional_1.png", buffer.getvalue(), {"content-type": "image/png"})
+    row = memory.insert_rows("profesionales", [{
+        "nombre": "Ana", "orden": 0, "foto_url": bucket.get_public_url("profesional_1.png"),
+    }])[0]
+    yield row
+    close_supabase_client()
+
+
+def test_sanitize_strips_metadata_and_applies_orientation(tmp_path):
+    source = jpeg(tmp_path / "in.jpg", 1200, 800, orientation=6)
+    width, height = sanitize_image(source, str(tmp_path / "out.jpg"), "image/jpeg")
+
+    assert (width, height) == (800, 1200)
+    with Image.open(tmp_path / "out.jpg") as sanitized:
+        assert sanitized.size == (800, 1200)
+        assert dict(sanitized.getexif()) == {}
+
+
+def test_undecodable_file_is_an_image_error(tmp_path):
+    path = tmp_path / "roto.jpg"
+    path.write_bytes(b"\xff\xd8\xff" + b"\x00" * 64)
+    with pytest.raises(ImageProcessingError):
+        sanitize_image(str(path), str(tmp_path / "out.jpg"), "image/jpeg")
+
+
+def test_renditions_never_upscale(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "VARIANT_WIDTHS", (320, 640, 1024))
+    rendered = render_variants(jpeg(tmp_path / "in.jpg", 700, 350))
+
+    assert (rendered["width"], rendered["height"]) == (700, 350)
+    assert sorted({width for _, width, _ in rendered["renditions"]}) == [320, 640]
+    for fmt, width, content in rendered["renditions"]:
+        with Image.open(io.BytesIO(content)) as rendition:
+            assert rendition.format == fmt.upper()
+            assert rendition.size == (width, width // 2)
+    assert rendered["placeholder"].startswith("data:image/webp;base64,")
+
+
+def test_small_image_gets_one_rendition_at_its_own_width(tmp_path):
+    rendered = render_variants(jpeg(tmp_path / "in.jpg", 100, 100))
+    assert {width for _, width, _ in rendered["renditions"]} == {100}
+
+
+def test_variant_filename():
+    assert variant_filename("profesional_1.jpg", "webp", 640) == "profesional_1_w640.webp"
+
+
+async def test_job_uploads_renditions_and_records_them(memory, stored):
+    from tasks.handlers import generate_foto_variantes
+
+    await generate_foto_variantes({"profesional_id": stored["id"], "foto_url": stored["foto_url"]})
+
+    variantes = memory.tables["profesionales"][0]["foto_variantes"]
+    assert (variantes["width"], variantes["height"]) == (800, 400)
+    objects = memory.storage.buckets["profesionales-fotos"]
+    for width, url in variantes["webp"].items():
+        assert url.endswith(f"profesional_1_w{width}.webp")
+        assert objects[f"profesional_1_w{width}.webp"]["mimetype"] == "image/webp"
+
+    # Idempotent: a retried job overwrites its own uploads
+    await generate_foto_variantes({"profesional_id": stored["id"], "foto_url": stored["foto_url"]})
+
+
+async def test_job_does_not_overwrite_a_replaced_photo(memory, stored):
+    from tasks.handlers import generate_foto_variantes
+
+    memory.tables["profesionales"][0]["foto_url"] = "https://memory.supabase.co/otra.png"
+    await generate_foto_variantes({"profesional_id": stored["id"], "foto_url": stored["foto_url"]})
+    assert memory.tables["profesionales"][0].get("foto_variantes") is None
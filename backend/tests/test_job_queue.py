@@ -0,0 +1,139 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from tasks import queue as queue_module
+from tasks.queue import JobQueue
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def queue(tmp_path, monkeypatch):
+    # Fast polling and retries, so the tests don't wait on the production delays
+    monkeypatch.setattr(queue_module, "JOB_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(queue_module, "JOB_BACKOFF_BASE", 0.01)
+    job_queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    yield job_queue
+    await job_queue.stop()
+
+
+async def eventually(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_job_runs_and_leaves_the_journal(queue):
+    seen = []
+
+    @queue.register("echo")
+    async def echo(payload):
+        seen.append(payload)
+
+    await queue.start(workers=1)
+    await queue.enqueue("echo", {"n": 1})
+    await eventually(lambda: queue.completed == 1)
+    assert seen == [{"n": 1}]
+    assert await queue.counts() == {"pending": 0, "running": 0, "dead": 0}
+
+
+async def test_failed_job_is_retried_then_dead_lettered(queue):
+    attempts = []
+
+    @queue.register("flaky")
+    async def flaky(payload):
+        attempts.append(payload)
+        raise RuntimeError("Supabase no responde")
+
+    await queue.start(workers=1)
+    job_id = await queue.enqueue("flaky", {}, max_attempts=3)
+    await eventually(lambda: queue.dead == 1)
+    assert len(attempts) == 3
+    assert queue.retried == 2
+
+    [dead] = await queue.list_jobs("dead")
+    assert dead["id"] == job_id
+    assert dead["last_error"] == "RuntimeError: Supabase no responde"
+
+    assert await queue.retry(job_id)
+    await eventually(lambda: queue.dead == 2)
+    assert len(attempts) == 6
+
+
+async def test_expired_lease_is_claimed_again(queue):
+    queue.register("echo")(lambda payload: asyncio.sleep(0))
+    job_id = await queue.enqueue("echo", {})
+
+    first = await queue._db(queue._claim)
+    assert first["id"] == job_id
+    # Still leased: nobody else gets it
+    assert await queue._db(queue._claim) is None
+
+    # The worker that claimed it died; its lease runs out
+    with sqlite3.connect(queue.path) as conn:
+        conn.execute("UPDATE jobs SET locked_until = ? WHERE id = ?", (time.time() - 1, job_id))
+    second = await queue._db(queue._claim)
+    assert second["id"] == job_id
+    assert second["attempts"] == 2
+
+
+async def test_worker_survives_journal_errors(queue, monkeypatch):
+    @queue.register("echo")
+    async def echo(payload):
+        pass
+
+    claim, failures = queue._claim, []
+
+    def locked_claim():
+        if len(failures) < 3:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return claim()
+
+    monkeypatch.setattr(queue, "_claim", locked_claim)
+    await queue.start(workers=1)
+    await queue.enqueue("echo", {})
+    await eventually(lambda: queue.completed == 1)
+
+    stats = queue.stats()
+    assert stats["loop_errors"] == 3
+    assert stats["last_loop_error"] == "OperationalError: database is locked"
+    assert stats["workers"] == 1 and stats["healthy"]
+
+
+async def test_outcome_write_failure_keeps_the_worker(queue, monkeypatch):
+    @queue.register("echo")
+    async def echo(payload):
+        pass
+
+    complete, failures = queue._complete, []
+
+    def full_disk(job_id):
+        if not failures:
+            failures.append(job_id)
+            raise sqlite3.OperationalError("database or disk is full")
+        complete(job_id)
+
+    monkeypatch.setattr(queue, "_complete", full_disk)
+    await queue.start(workers=1)
+    await queue.enqueue("echo", {})
+    await queue.enqueue("echo", {})
+    # The first outcome is lost (its lease will hand it out again); the worker keeps going
+    await eventually(lambda: queue.completed == 1 and queue.loop_errors == 1)
+    assert (await queue.counts())["running"] == 1
+    assert queue.stats()["healthy"]
+
+
+async def test_stats_report_missing_workers(queue):
+    await queue.start(workers=2)
+    assert queue.stats()["healthy"]
+
+    queue._workers[0].cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    stats = queue.stats()
+    assert (stats["workers"], stats["workers_expected"], stats["healthy"]) == (1, 2, False)
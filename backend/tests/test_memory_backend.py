@@ -0,0 +1,178 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from database import connection, memory as memory_backend
+from database.memory import LatencyModel, MemoryAPIError, MemoryClient
+
+
+@pytest.fixture
+def memory():
+    return MemoryClient({"items": [
+        {"id": "a", "n": 3, "nombre": "Ana", "activo": True},
+        {"id": "b", "n": 1, "nombre": 'dijo "hola", adiós', "activo": False},
+        {"id": "c", "n": None, "nombre": "Carla", "activo": True},
+        {"id": "d", "n": 2, "nombre": "Dora", "activo": None},
+    ]})
+
+
+def ids(response) -> list:
+    return [row["id"] for row in response.data]
+
+
+def test_column_filters(memory):
+    assert ids(memory.table("items").select("*").eq("activo", True).execute()) == ["a", "c"]
+    assert ids(memory.table("items").select("*").gte("n", 2).execute()) == ["a", "d"]
+    assert ids(memory.table("items").select("*").in_("id", ["b", "d", "z"]).execute()) == ["b", "d"]
+    assert ids(memory.table("items").select("*").is_("n", "null").execute()) == ["c"]
+    # NULL never matches a comparison
+    assert ids(memory.table("items").select("*").lt("n", 10).execute()) == ["a", "b", "d"]
+
+
+def test_logic_trees_in_params(memory):
+    query = memory.table("items").select("id")
+    query.params = query.params.add("or", '(n.gt.2,and(n.eq.1,nombre.eq."dijo \\"hola\\", adiós"),activo.is.null)')
+    assert ids(query.execute()) == ["a", "b", "d"]
+
+
+def test_unsupported_filters_are_rejected(memory):
+    query = memory.table("items").select("*")
+    with pytest.raises(MemoryAPIError):
+        query.params.add("or", "(nombre.ilike.*ana*)")
+    with pytest.raises(MemoryAPIError):
+        query.params.add("select", "id")
+
+
+def test_order_sorts_nulls_last_and_pages(memory):
+    assert ids(memory.table("items").select("*").order("n").execute()) == ["b", "d", "a", "c"]
+    assert ids(memory.table("items").select("*").order("n", desc=True).execute()) == ["c", "a", "d", "b"]
+
+    page = memory.table("items").select("id", count="exact").order("n").range(1, 2).execute()
+    assert ids(page) == ["d", "a"]
+    assert page.count == 4
+    assert memory.table("items").select("id").order("n").limit(2).offset(1).execute().data == [{"id": "d"}, {"id": "a"}]
+
+
+def test_sorted_views_are_dropped_on_write(memory):
+    assert ids(memory.table("items").select("*").order("n").limit(1).execute()) == ["b"]
+    memory.table("items").update({"n": 0}).eq("id", "c").execute()
+    assert ids(memory.table("items").select("*").order("n").limit(1).execute()) == ["c"]
+
+
+def test_results_are_copies(memory):
+    row = memory.table("items").select("*").eq("id", "a").execute().data[0]
+    row["n"] = 99
+    assert memory.tables["items"][0]["n"] == 3
+
+
+def test_insert_applies_defaults_and_constraints():
+    client = MemoryClient()
+    (row,) = client.table("profesionales").insert({"nombre": "Ana"}).execute().data
+    assert row["activo"] is True and row["orden"] == 0 and row["id"]
+
+    with pytest.raises(MemoryAPIError) as error:
+        client.table("profesionales").insert([{"nombre": "Bea"}, {"nombre": None}]).execute()
+    assert error.value.code == "23502"
+    # One statement: nothing from the failed batch was stored
+    assert len(client.tables["profesionales"]) == 1
+
+    with pytest.raises(MemoryAPIError) as error:
+        client.table("profesionales").insert([{"nombre": "Bea"}, {"nombre": "Cris", "orden": 1}]).execute()
+    assert error.value.code == "PGRST102"
+
+
+def test_delete_counts_rows(memory):
+    response = memory.table("items").delete(count="exact").eq("activo", True).execute()
+    assert response.count == 2
+    assert [row["id"] for row in memory.tables["items"]] == ["b", "d"]
+    assert memory.calls["items.delete"] == 1
+
+
+def test_rpc_errors_like_postgrest(memory):
+    with pytest.raises(MemoryAPIError) as error:
+        memory.rpc("no_existe", {}).execute()
+    assert error.value.code == "PGRST202"
+
+    # RETURNS JSON (an object in the body) fails validation, as with the real client
+    memory.rpcs["como_objeto"] = lambda client, params: {"total": 1}
+    with pytest.raises(ValidationError):
+        memory.rpc("como_objeto", {}).execute()
+    memory.rpcs["sin_resultado"] = lambda client, params: None
+    assert memory.rpc("sin_resultado", {}).execute().data == []
+
+
+def test_latency_is_reproducible_with_a_seed():
+    first = LatencyModel(base_ms=5, jitter_ms=10, row_cost_ms=1, seed=42)
+    second = LatencyModel(base_ms=5, jitter_ms=10, row_cost_ms=1, seed=42)
+    delays = [first.delay(rows) for rows in range(5)]
+
+    assert delays == [second.delay(rows) for rows in range(5)]
+    assert delays != [LatencyModel(base_ms=5, jitter_ms=10, row_cost_ms=1, seed=43).delay(r) for r in range(5)]
+    assert all(0.005 + rows / 1000 <= delay <= 0.015 + rows / 1000 for rows, delay in enumerate(delays))
+    assert first.round_trips == 5 and first.waited == pytest.approx(sum(delays))
+
+
+def test_every_round_trip_is_counted(memory):
+    memory.table("items").select("*").execute()
+    memory.storage.from_("profesionales-fotos").list()
+    stats = memory.stats()
+    assert stats["round_trips"] == 2
+    assert stats["calls"] == {"items.select": 1, "storage.list": 1}
+    assert stats["rows"] == {"items": 4}
+
+
+def test_storage_round_trip():
+    client = MemoryClient()
+    bucket = client.storage.from_("profesionales-fotos")
+    bucket.upload("fotos/a.jpg", b"uno", {"content-type": "image/jpeg"})
+    bucket.upload("fotos/b.jpg", b"dos")
+    bucket.upload("raiz.jpg", b"tres")
+
+    with pytest.raises(MemoryAPIError):
+        bucket.upload("fotos/a.jpg", b"otra")
+    bucket.upload("fotos/a.jpg", b"nueva", {"x-upsert": "true", "content-type": "image/jpeg"})
+    assert bucket.download("fotos/a.jpg") == b"nueva"
+
+    listed = bucket.list("fotos", {"sortBy": {"column": "name", "order": "desc"}})
+    assert [entry["name"] for entry in listed] == ["b.jpg", "a.jpg"]
+    assert listed[1]["metadata"]["size"] == 5 and listed[1]["metadata"]["mimetype"] == "image/jpeg"
+    assert [entry["name"] for entry in bucket.list()] == ["raiz.jpg"]
+
+    removed = bucket.remove(["fotos/a.jpg", "fotos/no-existe.jpg"])
+    assert [entry["name"] for entry in removed] == ["fotos/a.jpg"]
+    with pytest.raises(MemoryAPIError):
+        bucket.download("fotos/a.jpg")
+    assert "supabase.co/storage/v1/object/public/profesionales-fotos/raiz.jpg" in bucket.get_public_url("raiz.jpg")
+
+
+def test_unknown_bucket_is_an_error():
+    with pytest.raises(MemoryAPIError):
+        MemoryClient().storage.from_("otro").list()
+
+
+def test_from_env_loads_the_data_file(tmp_path, monkeypatch):
+    data = tmp_path / "datos.json"
+    data.write_text(json.dumps({"items": [{"id": "x", "n": 1}]}))
+    monkeypatch.setattr(memory_backend, "MEMORY_DATA_PATH", str(data))
+    monkeypatch.setattr(memory_backend, "MEMORY_LATENCY_MS", 3.0)
+
+    client = MemoryClient.from_env()
+    assert client.tables["items"] == [{"id": "x", "n": 1}]
+    assert client.latency.base_ms == 3.0
+
+
+def test_backend_is_chosen_by_name(monkeypatch):
+    sentinel = object()
+    # setitem first so the registration is undone after the test
+    monkeypatch.setitem(connection.BACKENDS, "prueba", lambda: sentinel)
+    connection.register_backend("prueba", lambda: sentinel)
+    monkeypatch.setattr(connection, "SUPABASE_BACKEND", "prueba")
+    assert connection._create_client() is sentinel
+
+    monkeypatch.setattr(connection, "SUPABASE_BACKEND", "memory")
+    assert isinstance(connection._create_client(), MemoryClient)
+
+    monkeypatch.setattr(connection, "SUPABASE_BACKEND", "oracle")
+    with pytest.raises(ValueError, match="memory"):
+        connection._create_client()
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from observability.metrics import Counter, Histogram, Registry
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of the series ``name`` whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.match(rf"{name}{{(.*)}} (\S+)$", line)
+        if match and all(f'{key}="{value}"' in match.group(1) for key, value in labels.items()):
+            return float(match.group(2))
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latencia", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 3):
+        latency.observe(value, ("/x",))
+
+    text = registry.render()
+    assert sample(text, "latency_seconds_bucket", route="/x", le="0.1") == 1
+    assert sample(text, "latency_seconds_bucket", route="/x", le="1.0") == 3
+    assert sample(text, "latency_seconds_bucket", route="/x", le="+Inf") == 4
+    assert sample(text, "latency_seconds_count", route="/x") == 4
+    assert sample(text, "latency_seconds_sum", route="/x") == pytest.approx(4.05)
+    assert "# TYPE latency_seconds histogram" in text
+
+
+def test_labels_are_escaped_and_carry_the_worker():
+    registry = Registry()
+    registry.register(Counter("errores_total", "Errores", ("detalle",))).inc(('dijo "hola"\n',))
+    text = registry.render()
+    assert 'detalle="dijo \\"hola\\"\\n"' in text
+    assert re.search(r'worker="\d+"', text)
+
+
+def test_a_failing_collector_does_not_break_the_scrape():
+    registry = Registry()
+    registry.register(Counter("ok_total", "Ok")).inc()
+
+    def broken():
+        raise RuntimeError("sin datos")
+
+    registry.register_collector(broken)
+    assert "ok_total" in registry.render()
+
+
+async def test_requests_are_labelled_by_route_template(api, memory):
+    row = memory.insert_rows("solicitudes", [solicitud_payload()])[0]
+    route = "/api/admin/solicitudes/{solicitud_id}"
+    before = sample((await api.get("/metrics")).text, "http_requests_total", method="GET", route=route, status="200")
+
+    await api.get(f"/api/admin/solicitudes/{row['id']}")
+    await api.get("/api/no-existe")
+    text = (await api.get("/metrics")).text
+
+    assert sample(text, "http_requests_total", method="GET", route=route, status="200") == before + 1
+    assert sample(text, "http_requests_total", route="unrouted", status="404") >= 1
+    assert row["id"] not in text
+    assert sample(text, "db_calls_total", table="solicitudes", operation="select", outcome="ok") >= 1
+    # Counters kept by other modules are read at scrape time
+    assert "# TYPE db_calls_in_flight gauge" in text
+
+
+async def test_metrics_token_is_required_when_set(api, monkeypatch):
+    monkeypatch.setattr("main.METRICS_TOKEN", "secreto")
+    assert (await api.get("/metrics")).status_code == 401
+    assert (await api.get("/metrics", headers={"Authorization": "Bearer otro"})).status_code == 401
+    response = await api.get("/metrics", headers={"Authorization": "Bearer secreto"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
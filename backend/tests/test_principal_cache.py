@@ -0,0 +1,93 @@
+import pytest
+
+from auth import principal_cache as principal_module
+from auth.jwt_handler import create_access_token
+from auth.principal_cache import PrincipalCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(principal_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+async def auth_api(api, memory, monkeypatch):
+    """``api`` going through the real get_current_user, with an empty cache."""
+    from auth.middleware import get_current_user
+    from main import app
+
+    monkeypatch.setattr(principal_module, "principal_cache", PrincipalCache(ttl=60, max_size=8))
+    monkeypatch.setattr("auth.middleware.principal_cache", principal_module.principal_cache)
+    app.dependency_overrides.pop(get_current_user)
+    memory.insert_rows("users", [{
+        "username": "ana", "email": "ana@test.cl", "full_name": "Ana", "role": "admin", "is_active": True,
+    }])
+    return api
+
+
+def bearer(username: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = PrincipalCache(ttl=60, max_size=8)
+    cache.set("ana", {"role": "admin"})
+    clock[0] += 59
+    assert cache.get("ana") == {"role": "admin"}
+    clock[0] += 2
+    assert cache.get("ana") is None
+    assert cache.stats()["size"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = PrincipalCache(ttl=60, max_size=2)
+    cache.set("a", {})
+    cache.set("b", {})
+    cache.get("a")
+    cache.set("c", {})
+    assert cache.get("b") is None
+    assert cache.get("a") == {} and cache.get("c") == {}
+    assert cache.evictions == 1
+
+
+def test_cached_users_are_copies(clock):
+    cache = PrincipalCache(ttl=60, max_size=2)
+    user = {"role": "admin"}
+    cache.set("ana", user)
+    user["role"] = "manager"
+    cache.get("ana")["role"] = "viewer"
+    assert cache.get("ana") == {"role": "admin"}
+
+
+def test_zero_ttl_disables_the_cache(clock):
+    cache = PrincipalCache(ttl=0, max_size=2)
+    cache.set("ana", {})
+    assert cache.get("ana") is None
+
+
+async def test_authenticated_requests_read_the_user_once(auth_api, memory):
+    for _ in range(3):
+        response = await auth_api.get("/api/auth/me", headers=bearer("ana"))
+        assert response.status_code == 200
+        assert response.json()["username"] == "ana"
+    assert memory.calls["users.select"] == 1
+
+
+async def test_login_drops_the_cached_user(auth_api, memory):
+    await auth_api.get("/api/auth/me", headers=bearer("ana"))
+    memory.tables["users"][0]["is_active"] = False
+
+    assert (await auth_api.get("/api/auth/me", headers=bearer("ana"))).status_code == 200
+    await auth_api.post("/api/auth/login", json={"username": "ana", "password": "x"})
+    assert (await auth_api.get("/api/auth/me", headers=bearer("ana"))).status_code == 401
+
+
+async def test_invalid_token_is_rejected_without_a_lookup(auth_api, memory):
+    response = await auth_api.get("/api/auth/me", headers={"Authorization": "Bearer no-es-un-jwt"})
+    assert response.status_code == 401
+    assert memory.calls["users.select"] == 0
@@ -0,0 +1,64 @@
+import pytest
+from postgrest import SyncPostgrestClient
+
+from database.memory import MemoryClient
+from database.pagination import count_option
+from tests.helpers import profesional_row
+
+pytestmark = pytest.mark.anyio
+
+PATHS = ["/api/profesionales", "/api/admin/profesionales"]
+
+
+@pytest.fixture
+def memory():
+    return MemoryClient({
+        "profesionales": [profesional_row(f"Profesional {i:02d}", orden=i, activo=i % 3 != 0) for i in range(12)],
+    })
+
+
+def test_count_modes():
+    assert count_option("exact") == "exact"
+    assert count_option("planned") == "planned"
+    assert count_option("none") is None
+    with pytest.raises(ValueError, match="Modo de conteo inválido"):
+        count_option("todos")
+
+
+def test_count_is_requested_in_the_page_query():
+    # PostgREST answers the total in Content-Range of the same response
+    query = SyncPostgrestClient("https://tests.supabase.co/rest/v1").table("profesionales")
+    query = query.select("*", count=count_option("planned")).limit(5)
+    assert "count=planned" in query.headers["prefer"]
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_page_and_total_in_one_round_trip(api, memory, path):
+    response = await api.get(path, params={"limit": 5, "activo": True})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert len(body["profesionales"]) == 5
+    assert body["total"] == 8
+    assert memory.calls["profesionales.select"] == 1
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_total_after_a_cursor_counts_the_remaining_rows(api, memory, path):
+    first = (await api.get(path, params={"limit": 5})).json()
+    second = (await api.get(path, params={"limit": 5, "cursor": first["next_cursor"]})).json()
+    assert first["total"] == 12
+    assert second["total"] == 7
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_count_none_skips_the_total(api, path):
+    response = await api.get(path, params={"count": "none"})
+    assert response.status_code == 200
+    assert response.json()["total"] is None
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_unknown_count_mode_is_rejected(api, path):
+    response = await api.get(path, params={"count": "todos"})
+    assert response.status_code == 400
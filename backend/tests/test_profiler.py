@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+
+from observability.profiler import Profiler, ProfilerBusy, StackSampler
+
+pytestmark = pytest.mark.anyio
+
+
+def busy_work(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+@pytest.fixture
+def burner():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_work, args=(stop,), name="burner")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    profiler = Profiler()
+    monkeypatch.setattr("routers.admin.profiler", profiler)
+    return profiler
+
+
+@pytest.mark.parametrize("clock", ["cpu", "wall"])
+async def test_sampler_sees_every_thread(burner, clock):
+    sampler = StackSampler(0.005)
+    sampler.clock = clock
+    await sampler.run(0.3)
+
+    assert sampler.samples > 0
+    burner_stacks = [line for line in sampler.collapsed().splitlines() if line.startswith("burner;")]
+    assert any("busy_work (tests/test_profiler.py:" in line for line in burner_stacks)
+    for line in sampler.collapsed().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack
+
+
+async def test_one_profile_at_a_time():
+    profiler = Profiler()
+    running = asyncio.ensure_future(profiler.sample_cpu(0.2, 10))
+    await asyncio.sleep(0.01)
+    with pytest.raises(ProfilerBusy):
+        await profiler.allocations(0.1, 5)
+    await running
+    # Released once the first one finished
+    assert (await profiler.allocations(0.01, 5))["segundos"] == 0.01
+
+
+async def test_profile_is_disabled_by_default(api):
+    response = await api.get("/api/admin/_profile", params={"seconds": 0.1})
+    assert response.status_code == 404
+
+
+async def test_cpu_profile_endpoint(api, enabled, burner):
+    response = await api.get("/api/admin/_profile", params={"seconds": 0.2, "interval_ms": 5})
+
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert response.headers["Content-Disposition"].endswith('.collapsed"')
+    assert "busy_work" in response.text
+
+
+async def test_memory_profile_reports_the_growing_line(api, enabled):
+    retained = []
+
+    async def allocate():
+        await asyncio.sleep(0.02)
+        retained.append([bytearray(1024) for _ in range(2000)])
+
+    allocation = asyncio.ensure_future(allocate())
+    response = await api.get("/api/admin/_profile", params={"mode": "memory", "seconds": 0.2, "top": 3})
+    await allocation
+
+    data = response.json()["data"]
+    assert data["growth_kb"] > 1000
+    assert data["top"][0]["archivo"] == "tests/test_profiler.py"
+
+
+async def test_concurrent_profile_is_rejected(api, enabled):
+    first = asyncio.ensure_future(api.get("/api/admin/_profile", params={"mode": "memory", "seconds": 0.2}))
+    await asyncio.sleep(0.05)
+    second = await api.get("/api/admin/_profile", params={"mode": "memory", "seconds": 0.1})
+    assert second.status_code == 409
+    assert (await first).status_code == 200
+
+
+@pytest.mark.parametrize("params", [{"seconds": 0}, {"seconds": 1000}, {"mode": "gpu"}])
+async def test_invalid_profile_requests(api, enabled, params):
+    assert (await api.get("/api/admin/_profile", params=params)).status_code == 422
@@ -0,0 +1,84 @@
+import pytest
+
+from ratelimit import buckets
+from ratelimit.buckets import MemoryBucketStore, RateRule, SQLiteBucketStore
+from ratelimit.middleware import client_ip, parse_networks
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+TRUSTED = parse_networks("10.0.0.0/8,127.0.0.1")
+
+
+def scope(peer: str, *forwarded: str) -> dict:
+    return {"client": (peer, 5000), "headers": [(b"x-forwarded-for", value.encode()) for value in forwarded]}
+
+
+def test_rule_parsing():
+    rule = RateRule.parse("solicitud", "5/60")
+    assert (rule.capacity, rule.period) == (5, 60)
+    for spec in ("5", "0/60", "cinco/60"):
+        with pytest.raises(ValueError):
+            RateRule.parse("solicitud", spec)
+
+
+@pytest.mark.parametrize("store_factory", [
+    lambda tmp_path: MemoryBucketStore(),
+    lambda tmp_path: SQLiteBucketStore(str(tmp_path / "ratelimit.sqlite3")),
+])
+async def test_bucket_empties_then_refills(store_factory, tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(buckets.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(buckets.time, "time", lambda: clock[0])
+    store, rule = store_factory(tmp_path), RateRule("solicitud", 2, 60)
+
+    assert [(await store.take("ip", rule))[0] for _ in range(3)] == [True, True, False]
+    allowed, _, retry_after = await store.take("ip", rule)
+    assert not allowed and retry_after == pytest.approx(30)
+    # Other clients have their own bucket
+    assert (await store.take("otra-ip", rule))[0]
+
+    clock[0] += 30
+    assert (await store.take("ip", rule))[0]
+    assert not (await store.take("ip", rule))[0]
+
+
+@pytest.mark.parametrize("request_scope, expected", [
+    # Direct connection: the socket peer, whatever the header says
+    (scope("203.0.113.7", "1.2.3.4"), "203.0.113.7"),
+    # Through the ingress: the hop it appended
+    (scope("10.1.0.5", "203.0.113.7"), "203.0.113.7"),
+    # Spoofed entries sit left of the one the ingress appended
+    (scope("10.1.0.5", "1.2.3.4, 5.6.7.8, 203.0.113.7"), "203.0.113.7"),
+    (scope("10.1.0.5", "1.2.3.4", "203.0.113.7, 10.2.0.9"), "203.0.113.7"),
+    # Garbage in the header is never taken for a proxy
+    (scope("10.1.0.5", "203.0.113.7, no-es-ip"), "no-es-ip"),
+    # Only proxies: the farthest one
+    (scope("127.0.0.1", "10.3.0.1, 10.2.0.9"), "10.3.0.1"),
+    (scope("127.0.0.1"), "127.0.0.1"),
+])
+def test_client_ip_is_the_rightmost_untrusted_hop(request_scope, expected):
+    assert client_ip(request_scope, TRUSTED) == expected
+
+
+def test_invalid_trusted_proxies_fail_at_startup():
+    with pytest.raises(ValueError):
+        parse_networks("10.0.0.0/8,proxy.interno")
+
+
+async def test_spoofed_forwarded_for_does_not_reset_the_bucket(api):
+    # The test client connects from 127.0.0.1, a trusted proxy like the ingress
+    statuses = []
+    for i in range(6):
+        response = await api.post(
+            "/api/solicitud",
+            json=solicitud_payload(nombre=f"Visitante {i}", tipo_servicio="otros", email=f"v{i}@test.cl"),
+            headers={"X-Forwarded-For": f"198.51.100.{i}, 203.0.113.7"},
+        )
+        statuses.append(response.status_code)
+    assert statuses == [200] * 5 + [429]
+
+    other_visitor = await api.post(
+        "/api/solicitud", json=solicitud_payload(), headers={"X-Forwarded-For": "198.51.100.1, 203.0.113.8"}
+    )
+    assert other_visitor.status_code == 200
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import anyio
+import pytest
+
+from database import repository
+from observability.metrics import DB_CALLS
+
+pytestmark = pytest.mark.anyio
+
+
+class BlockingQuery:
+    """Query builder whose ``execute()`` blocks like the sync PostgREST client."""
+
+    path = "/solicitudes"
+    http_method = "GET"
+
+    def __init__(self, seconds: float = 0.05, error: Exception = None):
+        self.seconds = seconds
+        self.error = error
+        self.thread = None
+
+    def execute(self):
+        self.thread = threading.get_ident()
+        time.sleep(self.seconds)
+        if self.error is not None:
+            raise self.error
+        return "ok"
+
+
+@pytest.fixture
+async def limiter(monkeypatch):
+    # Created inside the test's event loop, like _get_limiter() does
+    limiter = anyio.CapacityLimiter(2)
+    monkeypatch.setattr(repository, "_limiter", limiter)
+    return limiter
+
+
+async def test_execute_runs_off_the_event_loop(limiter):
+    query = BlockingQuery(seconds=0.1)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await anyio.sleep(0.01)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(tick)
+        assert await repository.execute(query) == "ok"
+        tg.cancel_scope.cancel()
+
+    assert query.thread != threading.get_ident()
+    assert ticks >= 5
+
+
+async def test_concurrent_calls_are_bounded_by_the_limiter(limiter):
+    active = peak = 0
+    lock = threading.Lock()
+
+    class CountingQuery(BlockingQuery):
+        def execute(self):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                return super().execute()
+            finally:
+                with lock:
+                    active -= 1
+
+    async def stats_while_busy():
+        await anyio.sleep(0.02)
+        return repository.get_repository_stats()
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(6):
+            tg.start_soon(repository.execute, CountingQuery())
+        stats = await stats_while_busy()
+
+    assert peak == 2
+    assert stats["in_flight"] == 2 and stats["waiting"] == 4
+
+
+async def test_errors_propagate_and_are_counted(limiter):
+    labels = ("solicitudes", "select", "error")
+    before = DB_CALLS._values.get(labels, 0)
+    with pytest.raises(RuntimeError, match="caído"):
+        await repository.execute(BlockingQuery(seconds=0, error=RuntimeError("caído")))
+    assert DB_CALLS._values.get(labels, 0) == before + 1
+
+
+async def test_run_sync_passes_arguments(limiter):
+    assert await repository.run_sync(lambda a, b=0: a + b, 1, b=2) == 3
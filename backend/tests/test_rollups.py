@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from database.rollups import ROLLUP_TABLE, reconcile_rollups
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+
+def _counts(memory) -> dict:
+    return {(row["dimension"], row["clave"]): row["cantidad"] for row in memory.tables.get(ROLLUP_TABLE, [])}
+
+
+async def test_trigger_counts_every_write(memory):
+    rows = memory.table("solicitudes").insert([solicitud_payload(), solicitud_payload(tipo_servicio="otros")]).execute().data
+    assert _counts(memory)[("total", "total")] == 2
+    assert _counts(memory)[("estado", "pendiente")] == 2
+
+    memory.table("solicitudes").update({"estado": "cancelada"}).eq("id", rows[0]["id"]).execute()
+    memory.table("solicitudes").update({"comentarios_admin": "llamar"}).eq("id", rows[1]["id"]).execute()
+    assert _counts(memory)[("estado", "pendiente")] == 1
+    assert _counts(memory)[("estado", "cancelada")] == 1
+
+    memory.table("solicitudes").delete().eq("id", rows[1]["id"]).execute()
+    assert _counts(memory)[("total", "total")] == 1
+    assert _counts(memory)[("tipo_servicio", "otros")] == 0
+    assert (await reconcile_rollups(memory))["drift_count"] == 0
+
+
+async def test_concurrent_admin_updates_do_not_drift(api, memory):
+    ids = [row["id"] for row in memory.table("solicitudes").insert([solicitud_payload() for _ in range(6)]).execute().data]
+
+    # Two admins racing on the same rows: with client-side deltas both applied -1/+1
+    await asyncio.gather(
+        api.patch("/api/admin/solicitudes/bulk", json={"ids": ids, "estado": "completada"}),
+        api.patch("/api/admin/solicitudes/bulk", json={"ids": ids, "estado": "completada"}),
+        *(api.put(f"/api/admin/solicitudes/{solicitud_id}", json={"estado": "confirmada"}) for solicitud_id in ids[:3]),
+        *(api.delete(f"/api/admin/solicitudes/{solicitud_id}") for solicitud_id in ids[3:]),
+    )
+
+    reconcile = await api.post("/api/admin/estadisticas/reconcile")
+    assert reconcile.status_code == 200
+    assert reconcile.json()["data"]["drift"] == []
+
+    stats = (await api.get("/api/admin/estadisticas")).json()
+    assert stats["total"] == 6
+    assert stats["pendientes"] == 0
+    assert stats["confirmadas"] + stats["completadas"] + stats["canceladas"] == 6
+
+
+async def test_public_insert_is_counted(api, memory):
+    response = await api.post("/api/solicitud", json=solicitud_payload())
+    assert response.status_code == 200, response.text
+    assert _counts(memory)[("total", "total")] == 1
+    assert _counts(memory)[("estado", "pendiente")] == 1
@@ -0,0 +1,53 @@
+import pytest
+
+from database.memory import MemoryClient
+from tests.helpers import solicitud_payload
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def memory():
+    return MemoryClient({"solicitudes": [
+        solicitud_payload(id="1", nombre="María José Núñez", fecha="2024-05-01T10:00:00"),
+        solicitud_payload(id="2", nombre="Mario Rojas", email="mrojas@test.cl", fecha="2024-05-02T10:00:00"),
+        solicitud_payload(id="3", nombre="Pedro Soto", direccion="Av. María Luisa 500, Temuco",
+                          estado="completada", fecha="2024-05-03T10:00:00"),
+        solicitud_payload(id="4", nombre="Ana 50% Díaz", tipo_servicio="otros", fecha="2024-05-04T10:00:00"),
+    ]})
+
+
+async def search(api, **params):
+    response = await api.get("/api/admin/solicitudes/search", params=params)
+    assert response.status_code == 200, response.text
+    return [s["id"] for s in response.json()]
+
+
+async def test_search_ignores_case_and_accents(api, memory):
+    assert await search(api, q="maria") == ["3", "1"]
+    assert await search(api, q="NUÑEZ") == ["1"]
+    assert memory.calls["rpc.search_solicitudes"] == 2
+    assert memory.calls["solicitudes.select"] == 0
+
+
+async def test_search_covers_email_and_address(api):
+    assert await search(api, q="mrojas@") == ["2"]
+    assert await search(api, q="temuco") == ["3"]
+
+
+async def test_search_applies_filters_and_pages(api):
+    assert await search(api, q="mari", estado="completada") == ["3"]
+    assert await search(api, q="test.cl", tipo_servicio="otros") == ["4"]
+    assert await search(api, q="test.cl", limit=2) == ["4", "3"]
+    assert await search(api, q="test.cl", limit=2, offset=2) == ["2", "1"]
+
+
+async def test_wildcards_in_the_term_are_literal(api):
+    assert await search(api, q="50%") == ["4"]
+    assert await search(api, q="%%") == []
+
+
+@pytest.mark.parametrize("params", [{"q": "a"}, {"q": "x" * 101}, {"q": "maria", "limit": 101}])
+async def test_invalid_search_is_rejected(api, params):
+    response = await api.get("/api/admin/solicitudes/search", params=params)
+    assert response.status_code == 422
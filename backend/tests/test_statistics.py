@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+
+from database.memory import MemoryClient
+from database.statistics import (
+    STATS_RPC,
+    aggregate_counts,
+    aggregate_rows,
+    build_stats,
+    count_rows,
+    effective_estado,
+    month_keys,
+)
+
+pytestmark = pytest.mark.anyio
+
+ROWS = [
+    {"estado": "pendiente", "tipo_servicio": "gasfiteria", "fecha": "2024-05-03T10:00:00"},
+    {"estado": "completada", "tipo_servicio": "gasfiteria", "fecha": "2024-05-20T10:00:00"},
+    {"estado": "cancelada", "tipo_servicio": None, "fecha": "2024-04-01T10:00:00"},
+    {"estado": "desconocido", "tipo_servicio": "electricidad", "fecha": None},
+]
+
+
+@pytest.fixture
+def seeded():
+    # Seeded without triggers, so the rollup table stays empty; fecha is NOT NULL
+    rows = [dict(row, id=str(i), fecha=row["fecha"] or "2024-03-01T10:00:00") for i, row in enumerate(ROWS)]
+    return MemoryClient({"solicitudes": rows})
+
+
+def test_unknown_estados_count_as_pending():
+    assert effective_estado({"estado": "confirmada"}) == "confirmada"
+    assert effective_estado({"estado": "desconocido"}) == "pendiente"
+    assert effective_estado({}) == "pendiente"
+
+
+def test_aggregate_rows_groups_every_dimension():
+    aggregate = aggregate_rows(ROWS)
+    assert aggregate == {
+        "total": 4,
+        "por_estado": {"pendiente": 2, "completada": 1, "cancelada": 1},
+        "por_tipo_servicio": {"gasfiteria": 2, "otros": 1, "electricidad": 1},
+        "por_mes": {"2024-05": 2, "2024-04": 1},
+    }
+
+
+def test_count_rows_round_trips_through_aggregate_counts():
+    aggregate = aggregate_rows(ROWS)
+    assert aggregate_counts(count_rows(aggregate)) == aggregate
+
+
+def test_missing_total_row_is_reported_as_none():
+    assert aggregate_counts([{"dimension": "estado", "clave": "pendiente", "cantidad": 1}])["total"] is None
+
+
+def test_build_stats_fills_the_last_twelve_months():
+    stats = build_stats(aggregate_rows(ROWS), datetime(2024, 5, 15))
+    assert list(stats["por_mes"]) == month_keys(datetime(2024, 5, 15))
+    assert list(stats["por_mes"])[::11] == ["2024-05", "2023-06"]
+    assert stats["por_mes"]["2024-05"] == 2 and stats["por_mes"]["2024-03"] == 0
+    assert (stats["total"], stats["pendientes"], stats["completadas"], stats["canceladas"]) == (4, 2, 1, 1)
+
+
+async def test_endpoint_aggregates_in_the_database(api, seeded):
+    from database.connection import get_supabase_client
+    from main import app
+
+    app.dependency_overrides[get_supabase_client] = lambda: seeded
+    response = await api.get("/api/admin/estadisticas")
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 4
+    assert response.json()["por_tipo_servicio"] == {"gasfiteria": 2, "otros": 1, "electricidad": 1}
+    assert seeded.calls[f"rpc.{STATS_RPC}"] == 1
+    assert seeded.calls["solicitudes.select"] == 0
+
+
+async def test_endpoint_falls_back_to_python_without_the_rpc(api, seeded):
+    from database.connection import get_supabase_client
+    from main import app
+
+    del seeded.rpcs[STATS_RPC]
+    app.dependency_overrides[get_supabase_client] = lambda: seeded
+    response = await api.get("/api/admin/estadisticas")
+
+    assert response.status_code == 200
+    assert response.json()["pendientes"] == 2
+    assert seeded.calls["solicitudes.select"] == 1
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from storage import gc
+
+pytestmark = pytest.mark.anyio
+
+BUCKET = "profesionales-fotos"
+
+
+@pytest.fixture
+def bucket(memory, monkeypatch):
+    """Referenced photo + rendition, three old orphans and a fresh upload."""
+    monkeypatch.setattr(gc, "GC_LIST_PAGE_SIZE", 2)
+    monkeypatch.setattr(gc, "GC_DELETE_BATCH_SIZE", 2)
+    storage = memory.storage.from_(BUCKET)
+    for name in ("activa.jpg", "activa_w320.webp", "vieja_1.jpg", "vieja_2.jpg", "vieja_3.png", "nueva.jpg"):
+        storage.upload(name, b"x" * 10, {"content-type": "image/jpeg"})
+    old = (datetime.now(timezone.utc) - timedelta(days=3)).isoformat()
+    for name, stored in memory.storage.buckets[BUCKET].items():
+        if name != "nueva.jpg":
+            stored["created_at"] = old
+    memory.insert_rows("profesionales", [{
+        "nombre": "Ana", "orden": 0,
+        "foto_url": storage.get_public_url("activa.jpg"),
+        "foto_variantes": {"webp": {"320": storage.get_public_url("activa_w320.webp")}},
+    }])
+    return memory.storage.buckets[BUCKET]
+
+
+async def test_dry_run_only_reports(memory, bucket):
+    report = await gc.collect_orphaned_photos(memory, dry_run=True)
+
+    assert (report["scanned"], report["referenced"], report["too_recent"]) == (6, 2, 1)
+    assert sorted(report["sample"]) == ["vieja_1.jpg", "vieja_2.jpg", "vieja_3.png"]
+    assert report["orphan_bytes"] == 30
+    assert report["metrics"]["list_pages"] == 4
+    assert len(bucket) == 6
+
+
+async def test_orphans_are_deleted_in_batches(memory, bucket):
+    report = await gc.collect_orphaned_photos(memory, dry_run=False)
+
+    assert report["deleted"] == 3
+    assert report["metrics"]["delete_batches"] == 2
+    assert sorted(bucket) == ["activa.jpg", "activa_w320.webp", "nueva.jpg"]
+
+
+async def test_photo_adopted_during_the_scan_is_kept(memory, bucket, monkeypatch):
+    scans = iter([{"activa.jpg", "activa_w320.webp"}, {"activa.jpg", "activa_w320.webp", "vieja_2.jpg"}])
+
+    async def referenced(supabase):
+        return next(scans)
+
+    monkeypatch.setattr(gc, "referenced_filenames", referenced)
+    report = await gc.collect_orphaned_photos(memory, dry_run=False)
+
+    assert report["deleted"] == 2
+    assert "vieja_2.jpg" in bucket
+
+
+async def test_endpoint_defaults_to_a_dry_run(api, bucket):
+    response = await api.post("/api/admin/storage/gc")
+    assert response.status_code == 200
+    assert response.json()["message"] == "3 archivos huérfanos encontrados"
+    assert len(bucket) == 6
+
+    response = await api.post("/api/admin/storage/gc", params={"dry_run": False, "min_age_hours": 0})
+    assert response.json()["data"]["deleted"] == 4
+    assert sorted(bucket) == ["activa.jpg", "activa_w320.webp"]
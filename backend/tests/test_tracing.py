@@ -0,0 +1,121 @@
+import json
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from database.repository import execute
+from observability import tracing
+from observability.tracing import FileSpanExporter, Span, Trace, TracingMiddleware, server_timing, span, to_otlp
+
+pytestmark = pytest.mark.anyio
+
+
+def exported_spans(path: str) -> list:
+    spans = []
+    for line in open(path).read().splitlines():
+        spans.extend(json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"])
+    return spans
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    exporter = FileSpanExporter(str(tmp_path / "traces" / "traces.jsonl"))
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    yield exporter
+    exporter.close()
+
+
+@pytest.fixture
+async def traced(memory, exporter, monkeypatch):
+    """A small app with TracedRoute routes behind TracingMiddleware."""
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    router = APIRouter(route_class=tracing.TracedRoute)
+
+    @router.get("/items/{item_id}")
+    async def item(item_id: str):
+        with span("auth.decode"):
+            pass
+        await execute(memory.table("solicitudes").select("*"))
+        await execute(memory.table("solicitudes").select("*"))
+        return {"id": item_id}
+
+    @router.get("/boom")
+    async def boom():
+        with span("convert.rows"):
+            raise ValueError("fila inválida")
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(TracingMiddleware, enabled=True, sample_rate=1.0)
+    async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+        yield client
+
+
+def test_span_is_a_no_op_outside_a_request():
+    with span("db.select solicitudes") as current:
+        assert current is None
+
+
+def test_server_timing_groups_phases_by_name():
+    trace = Trace()
+    root = Span("GET", None, {})
+    for name, ms in (("db.select solicitudes", 2), ("db.select profesionales", 3), ("auth.decode", 1)):
+        child = Span(name, root.span_id, {})
+        child.end_ns = child.start_ns + ms * 1_000_000
+        trace.spans.append(child)
+
+    header = server_timing(trace, 9.5)
+    assert 'db.select;dur=5.0;desc="2 calls"' in header
+    assert "auth.decode;dur=1.0" in header
+    assert header.endswith(f'total;dur=9.5, trace;desc="{trace.trace_id}"')
+
+
+async def test_request_spans_are_returned_and_exported(traced, exporter):
+    response = await traced.get("/items/42")
+
+    timing = response.headers["server-timing"]
+    assert 'db.select;dur=' in timing and 'desc="2 calls"' in timing
+    assert "auth.decode" in timing and "endpoint" in timing and "serialize" in timing
+    exporter.close()
+    spans = exported_spans(exporter.path)
+    root = next(s for s in spans if "parentSpanId" not in s)
+    assert root["name"] == "GET /items/{item_id}" and root["kind"] == 2
+    endpoint = next(s for s in spans if s["name"] == "endpoint")
+    assert endpoint["parentSpanId"] == root["spanId"]
+    db = [s for s in spans if s["name"] == "db.select solicitudes"]
+    assert len(db) == 2 and all(s["parentSpanId"] == endpoint["spanId"] for s in db)
+    assert {s["traceId"] for s in spans} == {root["traceId"]}
+
+
+async def test_failed_spans_are_marked(traced, exporter):
+    with pytest.raises(ValueError):
+        await traced.get("/boom")
+    exporter.close()
+    spans = exported_spans(exporter.path)
+    failed = next(s for s in spans if s["name"] == "convert.rows")
+    assert failed["status"] == {"code": 2}
+    assert {"key": "error", "value": {"stringValue": "ValueError"}} in failed["attributes"]
+
+
+async def test_unsampled_requests_carry_no_header(exporter):
+    app = FastAPI()
+    app.get("/ping")(lambda: {"ok": True})
+    app.add_middleware(TracingMiddleware, enabled=True, sample_rate=0.0)
+    async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+        response = await client.get("/ping")
+    assert "server-timing" not in response.headers
+    assert exporter.exported == 0
+
+
+def test_otlp_attribute_types():
+    trace = Trace()
+    root = Span("GET", None, {"ok": True, "rows": 3, "ms": 1.5, "table": "solicitudes"})
+    trace.spans.append(root)
+    attributes = to_otlp(trace)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["attributes"]
+    assert attributes == [
+        {"key": "ok", "value": {"boolValue": True}},
+        {"key": "rows", "value": {"intValue": "3"}},
+        {"key": "ms", "value": {"doubleValue": 1.5}},
+        {"key": "table", "value": {"stringValue": "solicitudes"}},
+    ]
@@ -0,0 +1,91 @@
+import pytest
+
+from storage.streaming import MULTIPART_OVERHEAD, sniff_image_type
+
+pytestmark = pytest.mark.anyio
+
+URL = "/api/upload/profesional-foto"
+BOUNDARY = "testboundary"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 200
+LIMIT = 5 * 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def no_sanitizing(monkeypatch):
+    # The streaming path only; re-encoding is covered by test_images.py
+    monkeypatch.setattr("routers.upload.variants_available", lambda: False)
+
+
+def multipart(content: bytes, field: str = "file", filename: str = "foto.png") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def headers() -> dict:
+    return {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+
+@pytest.mark.parametrize("head, expected", [
+    (b"\xff\xd8\xff\xe0" + b"\x00" * 8, ("image/jpeg", ".jpg")),
+    (b"\x89PNG\r\n\x1a\n\x00\x00\x00\x00", ("image/png", ".png")),
+    (b"RIFF\x00\x00\x00\x00WEBP", ("image/webp", ".webp")),
+    (b"RIFF\x00\x00\x00\x00WAVE", None),
+    (b"GIF89a\x00\x00\x00\x00\x00\x00", None),
+])
+def test_sniff_image_type(head, expected):
+    assert sniff_image_type(head) == expected
+
+
+async def test_upload_is_stored_with_the_detected_type(api, memory):
+    # The declared name and Content-Type are ignored: the bytes say PNG
+    response = await api.post(URL, content=multipart(PNG, filename="foto.jpg"), headers=headers())
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert data["filename"].endswith(".png")
+    assert data["content_type"] == "image/png" and data["size"] == len(PNG)
+    stored = memory.storage.buckets["profesionales-fotos"][data["filename"]]
+    assert stored["content"] == PNG and stored["mimetype"] == "image/png"
+
+
+async def test_non_image_is_rejected(api, memory):
+    response = await api.post(URL, content=multipart(b"%PDF-1.7" + b"\x00" * 64), headers=headers())
+    assert response.status_code == 400
+    assert memory.storage.buckets["profesionales-fotos"] == {}
+
+
+async def test_declared_oversize_body_is_rejected_before_reading(api):
+    body = multipart(PNG + b"\x00" * LIMIT)
+    response = await api.post(URL, content=body, headers=headers())
+    assert response.status_code == 413
+
+
+async def test_oversize_stream_is_cut_off_while_reading(api, memory):
+    sent = 0
+
+    async def body():
+        # Chunked: no Content-Length to check up front
+        nonlocal sent
+        chunks = [multipart(PNG)[:-len(f"\r\n--{BOUNDARY}--\r\n")]] + [b"\x00" * 65_536] * 200
+        for chunk in chunks:
+            sent += len(chunk)
+            yield chunk
+
+    response = await api.post(URL, content=body(), headers=headers())
+
+    assert response.status_code == 413
+    assert sent <= LIMIT + MULTIPART_OVERHEAD + 2 * 65_536
+    assert memory.storage.buckets["profesionales-fotos"] == {}
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (multipart(PNG, field="foto"), f"multipart/form-data; boundary={BOUNDARY}"),
+    (multipart(PNG), "application/json"),
+    (b"--otro\r\nbasura", f"multipart/form-data; boundary={BOUNDARY}"),
+])
+async def test_malformed_forms_are_rejected(api, body, content_type):
+    response = await api.post(URL, content=body, headers={"Content-Type": content_type})
+    assert response.status_code == 400
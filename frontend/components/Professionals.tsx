@@ -14,12 +14,23 @@ interface Profesional {
   email?: string
   imagen_url?: string
   foto_url?: string
+  foto_variantes?: {
+    placeholder?: string
+    webp?: Record<string, string>
+    avif?: Record<string, string>
+  }
   activo: boolean
   orden: number
   created_at: string
   updated_at?: string
 }
 
+// Variantes de la foto por ancho -> atributo srcset ("url 320w, url 640w")
+const toSrcSet = (variantes: Record<string, string>) =>
+  Object.entries(variantes)
+    .map(([width, url]) => `${url} ${width}w`)
+    .join(', ')
+
 const ESPECIALIDADES = [
   { value: 'enfermeria_general', label: 'Enfermería General' },
   { value: 'enfermeria_geriatrica', label: 'Enfermería Geriátrica' },
@@ -91,12 +102,21 @@ export default function Professionals() {
                 <div key={profesional.id} className="bg-white rounded-2xl shadow-lg p-8 text-center hover:shadow-xl transition-shadow duration-300">
                   <div className="w-28 h-28 mx-auto mb-6">
                     {(profesional.foto_url || profesional.imagen_url) ? (
-                      <img
-                        src={profesional.foto_url || profesional.imagen_url}
-                        alt={profesional.nombre}
-                        className="w-full h-full object-cover rounded-full border-4 border-white shadow"
-                        loading="lazy"
-                      />
+                      <picture className="block w-full h-full">
+                        {profesional.foto_variantes?.avif && (
+                          <source type="image/avif" sizes="112px" srcSet={toSrcSet(profesional.foto_variantes.avif)} />
+                        )}
+                        {profesional.foto_variantes?.webp && (
+                          <source type="image/webp" sizes="112px" srcSet={toSrcSet(profesional.foto_variantes.webp)} />
+                        )}
+                        <img
+                          src={profesional.foto_url || profesional.imagen_url}
+                          alt={profesional.nombre}
+                          className="w-full h-full object-cover rounded-full border-4 border-white shadow bg-cover bg-center"
+                          style={profesional.foto_variantes?.placeholder ? { backgroundImage: `url(${profesional.foto_variantes.placeholder})` } : undefined}
+                          loading="lazy"
+                        />
+                      </picture>
                     ) : (
                       <div className="w-full h-full bg-gray-200 rounded-full border-4 border-white shadow flex items-center justify-center">
                         <span className="text-2xl font-bold text-gray-600">
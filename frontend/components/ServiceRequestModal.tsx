@@ -11,6 +11,8 @@ export default function ServiceRequestModal({ isOpen, onClose }: ServiceRequestM
   const [isSubmitting, setIsSubmitting] = useState(false)
   const [submitMessage, setSubmitMessage] = useState('')
   const formRef = useRef<HTMLFormElement>(null)
+  // Misma clave para los reintentos de un mismo envío; cambia si cambian los datos
+  const idempotencyRef = useRef<{ key: string; body: string } | null>(null)
 
   useEffect(() => {
     const onEsc = (e: KeyboardEvent) => {
@@ -39,13 +41,19 @@ export default function ServiceRequestModal({ isOpen, onClose }: ServiceRequestM
     
     console.log('Sending data to backend:', data) // Debug log
 
+    const body = JSON.stringify(data)
+    if (!idempotencyRef.current || idempotencyRef.current.body !== body) {
+      idempotencyRef.current = { key: crypto.randomUUID(), body }
+    }
+
     try {
       const response = await fetch('http://localhost:8000/api/solicitud', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyRef.current.key,
         },
-        body: JSON.stringify(data)
+        body
       })
 
       // Check if the response is ok (status 200-299)
@@ -73,6 +81,7 @@ export default function ServiceRequestModal({ isOpen, onClose }: ServiceRequestM
 
       if (result.success) {
         setSubmitMessage('¡Solicitud enviada exitosamente! Te contactaremos pronto.')
+        idempotencyRef.current = null
         // Reset form safely
         if (formRef.current) {
           formRef.current.reset()
@@ -30,6 +30,7 @@ interface Solicitud {
   estado: string | null
   fecha: string
   updated_at?: string
+  cancelled_at?: string | null
 }
 
 const ESTADOS = [
@@ -68,20 +69,22 @@ export default function SolicitudesTable() {
   const [solicitudToDelete, setSolicitudToDelete] = useState<Solicitud | null>(null)
   const [showStatusModal, setShowStatusModal] = useState(false)
   const [solicitudToUpdate, setSolicitudToUpdate] = useState<Solicitud | null>(null)
+  const [selectedIds, setSelectedIds] = useState<Set<string>>(new Set())
+  const [bulkEstado, setBulkEstado] = useState('')
   
   const { token } = useAuth()
 
   // Función para detectar si una solicitud está cancelada
   const isSolicitudCancelada = (solicitud: Solicitud) => {
-    return solicitud.comentarios?.includes('[CANCELADA]') || false
+    return solicitud.estado === 'cancelada'
   }
 
-  // Cargar todas las solicitudes una sola vez
+  // Cargar las solicitudes; el filtro por estado se aplica en el servidor
   useEffect(() => {
     if (token) {
       loadSolicitudes()
     }
-  }, [token])
+  }, [token, filtros.estado])
 
   // Filtrado local en tiempo real
   useEffect(() => {
@@ -114,8 +117,11 @@ export default function SolicitudesTable() {
   const loadSolicitudes = async () => {
     try {
       setLoading(true)
-      // Cargar todas las solicitudes sin filtros para filtrado local
-      const data = await adminAPI.getSolicitudes(token!, { limit: 100 })
+      // La búsqueda y el tipo de servicio se filtran localmente
+      const data = await adminAPI.getSolicitudes(token!, {
+        limit: 100,
+        estado: filtros.estado || undefined
+      })
       setSolicitudes(data)
       setFilteredSolicitudes(data) // Inicializar con todos los datos
     } catch (error) {
@@ -153,6 +159,58 @@ export default function SolicitudesTable() {
     }
   }
 
+  const toggleSelected = (id: string) => {
+    setSelectedIds(prev => {
+      const next = new Set(prev)
+      if (next.has(id)) {
+        next.delete(id)
+      } else {
+        next.add(id)
+      }
+      return next
+    })
+  }
+
+  const allFilteredSelected = filteredSolicitudes.length > 0 &&
+    filteredSolicitudes.every(s => selectedIds.has(s.id))
+
+  const toggleSelectAll = () => {
+    setSelectedIds(allFilteredSelected ? new Set() : new Set(filteredSolicitudes.map(s => s.id)))
+  }
+
+  const handleBulkUpdate = async () => {
+    if (!bulkEstado || selectedIds.size === 0) return
+
+    try {
+      setUpdating(true)
+      // Una sola llamada para todo el lote en lugar de un PUT por solicitud
+      const response = await adminAPI.bulkUpdateSolicitudes({
+        ids: Array.from(selectedIds),
+        estado: bulkEstado
+      }, token!)
+
+      const actualizadas = new Set(
+        response.data.results.filter(r => r.resultado === 'updated').map(r => r.id)
+      )
+      setSolicitudes(prev => prev.map(s => 
+        actualizadas.has(s.id) ? { ...s, estado: bulkEstado } : s
+      ))
+      setFilteredSolicitudes(prev => prev.map(s => 
+        actualizadas.has(s.id) ? { ...s, estado: bulkEstado } : s
+      ))
+      setSelectedIds(new Set())
+      setBulkEstado('')
+      if (actualizadas.size < selectedIds.size) {
+        setError(response.message)
+      }
+    } catch (error) {
+      setError('Error al actualizar las solicitudes seleccionadas')
+      console.error('Error bulk updating status:', error)
+    } finally {
+      setUpdating(false)
+    }
+  }
+
   const handleDeleteClick = (solicitud: Solicitud) => {
     setSolicitudToDelete(solicitud)
     setShowDeleteModal(true)
@@ -167,12 +225,12 @@ export default function SolicitudesTable() {
       // Actualizar el estado local marcando como cancelada
       setSolicitudes(prev => prev.map(s => 
         s.id === solicitudToDelete.id 
-          ? { ...s, comentarios: `[CANCELADA] Solicitud cancelada por el administrador\n${s.comentarios || ''}` }
+          ? { ...s, estado: 'cancelada', cancelled_at: new Date().toISOString() }
           : s
       ))
       setFilteredSolicitudes(prev => prev.map(s => 
         s.id === solicitudToDelete.id 
-          ? { ...s, comentarios: `[CANCELADA] Solicitud cancelada por el administrador\n${s.comentarios || ''}` }
+          ? { ...s, estado: 'cancelada', cancelled_at: new Date().toISOString() }
           : s
       ))
       
@@ -362,6 +420,39 @@ export default function SolicitudesTable() {
             </div>
           )}
 
+          {selectedIds.size > 0 && (
+            <div className="flex flex-wrap items-center gap-3 bg-gray-50 border border-gray-200 rounded-md p-3 mb-4">
+              <span className="text-sm font-medium text-gray-700">
+                {selectedIds.size} seleccionada{selectedIds.size !== 1 ? 's' : ''}
+              </span>
+              <select
+                value={bulkEstado}
+                onChange={(e) => setBulkEstado(e.target.value)}
+                className="px-3 py-2 border border-gray-300 rounded-lg text-sm bg-white focus:outline-none focus:ring-2 focus:ring-primary-green/20 focus:border-primary-green"
+              >
+                <option value="">Cambiar estado a...</option>
+                {ESTADOS.filter(estado => estado.value).map(estado => (
+                  <option key={estado.value} value={estado.value}>
+                    {estado.label}
+                  </option>
+                ))}
+              </select>
+              <button
+                onClick={handleBulkUpdate}
+                disabled={!bulkEstado || updating}
+                className="px-4 py-2 bg-primary-green text-white text-sm font-medium rounded-lg hover:bg-primary-green/90 disabled:opacity-50"
+              >
+                {updating ? 'Aplicando...' : 'Aplicar'}
+              </button>
+              <button
+                onClick={() => setSelectedIds(new Set())}
+                className="text-sm text-gray-500 hover:text-gray-700"
+              >
+                Limpiar selección
+              </button>
+            </div>
+          )}
+
           {filteredSolicitudes.length === 0 ? (
             <div className="text-center py-12">
               <FileText className="mx-auto h-12 w-12 text-gray-400" />
@@ -377,6 +468,15 @@ export default function SolicitudesTable() {
               <table className="min-w-full divide-y divide-gray-200">
                 <thead className="bg-gray-50">
                   <tr>
+                    <th className="px-4 py-3">
+                      <input
+                        type="checkbox"
+                        checked={allFilteredSelected}
+                        onChange={toggleSelectAll}
+                        className="h-4 w-4 rounded border-gray-300 text-primary-green focus:ring-primary-green"
+                        title="Seleccionar todas"
+                      />
+                    </th>
                     <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                       Cliente
                     </th>
@@ -399,6 +499,14 @@ export default function SolicitudesTable() {
                     const isCancelada = isSolicitudCancelada(solicitud)
                     return (
                     <tr key={solicitud.id} className={`hover:bg-gray-50 ${isCancelada ? 'bg-red-50 opacity-75' : ''}`}>
+                      <td className="px-4 py-4">
+                        <input
+                          type="checkbox"
+                          checked={selectedIds.has(solicitud.id)}
+                          onChange={() => toggleSelected(solicitud.id)}
+                          className="h-4 w-4 rounded border-gray-300 text-primary-green focus:ring-primary-green"
+                        />
+                      </td>
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div>
                           <div className="text-sm font-medium text-gray-900">
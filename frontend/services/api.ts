@@ -22,6 +22,7 @@ interface Solicitud {
   estado: string
   fecha: string
   updated_at?: string
+  cancelled_at?: string | null
 }
 
 interface Profesional {
@@ -34,6 +35,7 @@ interface Profesional {
   email?: string
   imagen_url?: string
   foto_url?: string
+  foto_variantes?: Record<string, any>
   activo: boolean
   orden: number
   created_at: string
@@ -209,14 +211,42 @@ export const adminAPI = {
     }, token)
   },
 
+  bulkUpdateSolicitudes: async (updateData: {
+    ids: string[]
+    estado?: string
+    comentarios_admin?: string
+  }, token: string) => {
+    return apiRequest<{
+      success: boolean
+      message: string
+      data: {
+        updated: number
+        not_found: number
+        invalid: number
+        results: { id: string; resultado: 'updated' | 'not_found' | 'invalid' }[]
+      }
+    }>('/admin/solicitudes/bulk', {
+      method: 'PATCH',
+      body: JSON.stringify(updateData),
+    }, token)
+  },
+
   getStatistics: async (token: string) => {
     return apiRequest<SolicitudStats>('/admin/estadisticas', {
       method: 'GET',
     }, token)
   },
 
-  getPendingSolicitudes: async (token: string) => {
-    return apiRequest<Solicitud[]>('/admin/solicitudes-pendientes', {
+  getPendingSolicitudes: async (token: string, params?: {
+    limit?: number
+    cursor?: string
+  }) => {
+    const queryParams = new URLSearchParams()
+    if (params?.limit) queryParams.append('limit', params.limit.toString())
+    if (params?.cursor) queryParams.append('cursor', params.cursor)
+
+    const queryString = queryParams.toString()
+    return apiRequest<Solicitud[]>(`/admin/solicitudes-pendientes${queryString ? `?${queryString}` : ''}`, {
       method: 'GET',
     }, token)
   },
@@ -307,14 +337,16 @@ export const publicAPI = {
     fecha_sugerida?: string
     hora_sugerida?: string
     comentarios?: string
-  }) => {
+  }, idempotencyKey?: string) => {
     return apiRequest<{
       success: boolean
       message: string
       data: Solicitud
+      duplicada?: boolean
     }>('/solicitud', {
       method: 'POST',
       body: JSON.stringify(solicitudData),
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
     })
   },
 